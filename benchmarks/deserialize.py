@@ -0,0 +1,132 @@
+"""
+Measures deserialization of large API responses into models, comparing
+ApiClient.deserialize with the previous implementation, which parsed type
+names with regular expressions and resolved classes with eval() for every
+value.
+
+The payload is a synthetic `get_experiments` response: series with child
+experiments, each with a few jobs that have child jobs, with every field
+of the models filled in.
+
+    python benchmarks/deserialize.py [-n RUNS] [-e EXPERIMENTS]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from riseml.client import ApiClient, models
+
+
+class Response(object):
+
+    def __init__(self, data):
+        self.data = data
+
+
+def legacy_deserialize(data, klass):
+    # reference: ApiClient.__deserialize before deserializers were compiled
+    if data is None:
+        return None
+    if klass.startswith('list['):
+        sub_kls = re.match(r'list\[(.*)\]', klass).group(1)
+        return [legacy_deserialize(sub_data, sub_kls) for sub_data in data]
+    if klass.startswith('dict('):
+        sub_kls = re.match(r'dict\(([^,]*), (.*)\)', klass).group(2)
+        return {k: legacy_deserialize(v, sub_kls) for k, v in data.items()}
+    if klass in ['int', 'float', 'str', 'bool', 'object']:
+        klass = eval(klass)
+    else:
+        klass = eval('models.' + klass)
+    if klass in (int, float, str, bool):
+        try:
+            return klass(data)
+        except TypeError:
+            return data
+    elif klass == object:
+        return data
+    instance = klass()
+    if not instance.swagger_types:
+        return data
+    for attr, attr_type in instance.swagger_types.items():
+        if data is not None and instance.attribute_map[attr] in data \
+                and isinstance(data, (list, dict)):
+            value = data[instance.attribute_map[attr]]
+            setattr(instance, attr, legacy_deserialize(value, attr_type))
+    return instance
+
+
+def sample(klass, i, children=0):
+    # a dict with every field of the model set
+    if klass.startswith('list['):
+        item = klass[len('list['):-1]
+        return [sample(item, i * 10 + j) for j in range(children)]
+    if klass in ('int', 'float'):
+        return i
+    if klass == 'str':
+        return 'value-%d' % i
+    if klass == 'bool':
+        return i % 2 == 0
+    if klass == 'object':
+        return {'tensorboard': True}
+    instance = getattr(models, klass)()
+    data = {}
+    for attr, attr_type in instance.swagger_types.items():
+        n = children if attr == 'children' else 2
+        data[instance.attribute_map[attr]] = sample(attr_type, i, n)
+    return data
+
+
+def payload(experiments):
+    series = []
+    for i in range(experiments // 5):
+        experiment = sample('Experiment', i)
+        experiment['children'] = [sample('Experiment', i * 10 + j) for j in range(4)]
+        for child in [experiment] + experiment['children']:
+            child['jobs'] = [sample('Job', j, children=2) for j in range(3)]
+        series.append(experiment)
+    return json.dumps(series)
+
+
+def measure(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--runs', type=int, default=3)
+    parser.add_argument('-e', '--experiments', type=int, default=1000,
+                        help="number of experiments in the response")
+    args = parser.parse_args()
+
+    data = payload(args.experiments)
+    print('payload: %d experiments, %.1f MB' % (args.experiments, len(data) / 1e6))
+
+    client = ApiClient()
+    current, current_times = measure(
+        lambda: client.deserialize(Response(data), 'list[Experiment]'), args.runs)
+    legacy, legacy_times = measure(
+        lambda: legacy_deserialize(json.loads(data), 'list[Experiment]'), args.runs)
+    assert [e.to_dict() for e in current] == [e.to_dict() for e in legacy]
+
+    for name, times in (('legacy', legacy_times), ('compiled', current_times)):
+        print('%-9s median %8.1f ms  min %8.1f ms' % (
+            name, statistics.median(times) * 1000, min(times) * 1000))
+    print('speedup   %.2fx' % (statistics.median(legacy_times) / statistics.median(current_times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures the throughput of LogPrinter: synthetic websocket messages of a
+chatty distributed job (plain lines, colored lines and tqdm-style progress
+bars) are passed to LogPrinter._on_message with stdout redirected to
+/dev/null, as fast as they can be rendered. With --grep, only lines
+matching the pattern are printed. Progress bars are printed in full
+unless --progress sampled is given; --output ndjson prints JSON lines.
+
+    python benchmarks/logs.py [-n RUNS] [-m MESSAGES] [--grep PATTERN] [--progress MODE]
+                              [--output FORMAT]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from riseml import ansi
+from riseml.stream import LogPrinter, LogFilter
+
+JOBS = {'job-%d' % i: '12.train.%d' % i for i in range(8)}
+
+
+def messages(count):
+    job_ids = sorted(JOBS)
+    start = 1500000000
+    for i in range(count):
+        job_id = job_ids[i % len(job_ids)]
+        if i % 10 == 0:
+            line = '\r'.join('epoch 3: %3d%%|%s| %d/100' % (p, '#' * (p // 10), p)
+                             for p in range(0, 100, 10))
+        elif i % 10 == 1:
+            line = '\x1b[32mINFO\x1b[0m step %d: checkpoint saved' % i
+        else:
+            line = 'step %d: loss=%.5f accuracy=%.4f' % (i, 1.0 / (i + 1), i % 100 / 100.0)
+        yield json.dumps({'type': 'log', 'job_id': job_id,
+                          'time': start + i // 1000, 'line': line})
+
+
+def run(printer, data):
+    start = time.perf_counter()
+    for message in data:
+        printer._on_message(None, message)
+    if hasattr(printer, 'output'):
+        printer.output.flush()
+    sys.stdout.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-m', '--messages', type=int, default=200000)
+    parser.add_argument('--grep', help="e.g. checkpoint")
+    parser.add_argument('--progress', choices=('all', 'sampled'), default='all')
+    parser.add_argument('--output', choices=('text', 'ndjson'), default='text')
+    args = parser.parse_args()
+
+    data = list(messages(args.messages))
+    ansi.COLORS_DISABLED = False
+    stdout = sys.stdout
+    log_filter = LogFilter(grep=[args.grep]) if args.grep else None
+    times = []
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(args.runs):
+            sys.stdout = devnull
+            try:
+                times.append(run(LogPrinter('ws://localhost', JOBS, log_filter=log_filter,
+                                          progress=args.progress, output_format=args.output), data))
+            finally:
+                sys.stdout = stdout
+    print('%d messages: median %.0f lines/s  best %.0f lines/s' % (
+        args.messages, args.messages / statistics.median(times), args.messages / min(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures the memory held by deserialized models with tracemalloc: a large
+synthetic `get_experiments` response (see deserialize.py) is deserialized
+and the memory retained by the resulting models is compared with the
+memory of the parsed JSON alone.
+
+    python benchmarks/memory.py [-e EXPERIMENTS]
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from deserialize import Response, payload
+from riseml.client import ApiClient
+
+
+def traced(fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def count_models(value):
+    if isinstance(value, list):
+        return sum(count_models(item) for item in value)
+    if hasattr(value, 'swagger_types'):
+        return 1 + sum(count_models(getattr(value, attr)) for attr in value.swagger_types)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-e', '--experiments', type=int, default=5000,
+                        help="number of experiments in the response")
+    args = parser.parse_args()
+
+    data = payload(args.experiments)
+    client = ApiClient()
+    # compile the deserializers outside of the measurement
+    client.deserialize(Response('[]'), 'list[Experiment]')
+
+    parsed, parsed_bytes, _ = traced(lambda: json.loads(data))
+    del parsed
+    models, model_bytes, model_peak = traced(
+        lambda: client.deserialize(Response(data), 'list[Experiment]'))
+
+    n_models = count_models(models)
+    print('payload:  %d experiments, %d model instances' % (args.experiments, n_models))
+    print('json:     %8.1f MB' % (parsed_bytes / 1e6))
+    print('models:   %8.1f MB (peak %.1f MB), %.0f bytes per instance' % (
+        model_bytes / 1e6, model_peak / 1e6, model_bytes / float(n_models)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures CLI startup: wall time per command and the slowest imports
+reported by `python -X importtime`.
+
+Every command is run with `-h`, which builds the command's parser (and so
+imports its module) without talking to the API server. HOME points to an
+empty directory so that no local client configuration is picked up.
+
+    python benchmarks/startup.py [-n RUNS] [-t TOP] [command ...]
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from riseml.commands import COMMANDS
+
+
+def command_argv(command):
+    if command == '--version':
+        return ['--version']
+    return [command, '-h']
+
+
+def run_cli(argv, env, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-m', 'riseml'] + argv
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return time.perf_counter() - start, proc.returncode, proc.stderr.decode('utf8', 'replace')
+
+
+def top_level_imports(stderr):
+    # lines look like "import time: <self us> | <cumulative us> | <package>",
+    # with nested imports indented below the module importing them
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.startswith(' ') and not name.startswith('  '):
+            imports.append((int(cumulative_us), name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('commands', nargs='*', default=['--version'] + list(COMMANDS))
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-t', '--top', type=int, default=5, help="number of imports to show")
+    args = parser.parse_args()
+
+    env = dict(os.environ, HOME=tempfile.mkdtemp(), PYTHONPATH=ROOT)
+    for command in args.commands:
+        argv = command_argv(command)
+        times = []
+        for _ in range(args.runs):
+            elapsed, returncode, stderr = run_cli(argv, env)
+            times.append(elapsed)
+        print('riseml %-22s median %6.1f ms  min %6.1f ms%s' % (
+            ' '.join(argv), statistics.median(times) * 1000, min(times) * 1000,
+            '  (exit code %d)' % returncode if returncode else ''))
+        _, _, stderr = run_cli(argv, env, importtime=True)
+        for cumulative_us, name in top_level_imports(stderr)[:args.top]:
+            print('    %8.1f ms  %s' % (cumulative_us / 1000.0, name))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ import sys
 import os.path
 import platform
 import config_parser
+from PyInstaller.utils.hooks import collect_submodules
 
 
 def get_os():
@@ -14,12 +15,15 @@ def get_os():
 
 
 cfg_parser_loc = os.path.dirname(sys.modules['config_parser'].__file__)
+# riseml must be importable to collect its submodules
+sys.path.insert(0, SPECPATH)
 
 a = Analysis(['riseml/__main__.py'],
              pathex=[],
              binaries=[('rsync/rsync', 'bin')],
              datas=[(os.path.join(cfg_parser_loc, 'schemas/*'), 'config_parser/schemas')],
-             hiddenimports=[],
+             # command modules are imported by name (see riseml/commands/__init__.py)
+             hiddenimports=collect_submodules('riseml.commands'),
              hookspath=[],
              runtime_hooks=[],
              excludes=['win32com'],
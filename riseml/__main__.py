@@ -3,11 +3,9 @@ import sys
 import os
 import argparse
 import builtins
-import rollbar
 
-from urllib3.exceptions import HTTPError
-
-from riseml.commands import *
+from riseml import agent
+from riseml.commands import add_command_parsers, get_command
 from riseml.client_config import get_api_url, get_stream_url, get_sync_url, get_git_url, get_environment, get_cluster_id, get_rollbar_endpoint
 from riseml.consts import VERSION
 from riseml.errors import handle_error
@@ -18,27 +16,10 @@ logging.getLogger('urllib3.connectionpool').setLevel(logging.ERROR)
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('-v', help="show endpoints", action='store_const', const=True)
+    parser.add_argument('-v', help="show endpoints and connection usage", action='store_const', const=True)
     parser.add_argument('--version', '-V', help="show version", action='version', version='RiseML CLI {}'.format(VERSION))
     subparsers = parser.add_subparsers()
-
-    # user ops
-    add_whoami_parser(subparsers)
-    add_user_parser(subparsers)
-
-    # system ops
-    add_system_parser(subparsers)
-    add_account_parser(subparsers)
-
-    # worklow ops
-    add_init_parser(subparsers)
-    add_train_parser(subparsers)
-    #add_exec_parser(subparsers)
-    add_monitor_parser(subparsers)
-    #add_deploy_parser(subparsers)
-    add_logs_parser(subparsers)
-    add_kill_parser(subparsers)
-    add_status_parser(subparsers)
+    add_command_parsers(subparsers, get_command(sys.argv[1:]))
 
     args = parser.parse_args(sys.argv[1:])
 
@@ -49,6 +30,7 @@ def main():
         print('git_url: %s' % get_git_url())
 
     if hasattr(args, 'run'):
+        from urllib3.exceptions import HTTPError
         try:
             args.run(args)
         except HTTPError as e:
@@ -56,9 +38,21 @@ def main():
             handle_error(str(e))
         except KeyboardInterrupt:
             print('\nAborting...')
+        if args.v:
+            show_connection_stats()
     else:
         parser.print_usage()
     
+
+def show_connection_stats():
+    # only report if the command used the API
+    if 'riseml.api' in sys.modules:
+        from riseml.api import get_connection_stats, format_connection_stats
+        stats = get_connection_stats()
+        if stats is not None:
+            print('connections: %s' % format_connection_stats(stats))
+
+
 def safely_encoded_print(print_func):
     def convert_to_ascii(arg):
         if isinstance(arg, str):
@@ -78,20 +72,34 @@ def safely_encoded_print(print_func):
 
     return wrapped_print_func
 
+def report_exception():
+    # rollbar (and requests with it) is only imported once there is
+    # something to report
+    import rollbar
+    cluster_id = get_cluster_id()
+    rollbar.init(
+        cluster_id if cluster_id else '00000000-0000-0000-0000-000000000000',
+        get_environment(),
+        endpoint=get_rollbar_endpoint(),
+        root=os.path.dirname(os.path.realpath(__file__)))
+    rollbar.report_exc_info()
+
+
 def entrypoint():
+    if get_command(sys.argv[1:]) != 'agent' and agent.is_agent_enabled():
+        exit_code = agent.forward(sys.argv[1:])
+        if exit_code is not None:
+            sys.exit(exit_code)
+    run()
+
+
+def run():
     builtins.print = safely_encoded_print(print)
     if get_environment() not in ['development', 'test']:
-        cluster_id = get_cluster_id()
-        rollbar.init(
-            cluster_id if cluster_id else '00000000-0000-0000-0000-000000000000',
-            get_environment(),
-            endpoint=get_rollbar_endpoint(),
-            root=os.path.dirname(os.path.realpath(__file__)))
         try:
-
             main()
         except Exception:
-            rollbar.report_exc_info()
+            report_exception()
             handle_error("An unexpected error occured.")
     else:
         main()
@@ -0,0 +1,643 @@
+"""
+Background agent that runs CLI commands in a warm interpreter.
+
+The agent listens on a Unix socket in ~/.riseml. For every command a fork
+server, forked from the agent before it starts any threads, forks a child
+that already has all modules imported and the client configuration parsed. The child is handed the stdin/stdout/stderr of the calling `riseml`
+process, which only forwards signals and waits for the exit code. API
+requests of the child are relayed back to the agent, which keeps the HTTP
+connections to the API server alive across commands.
+
+The agent is opt-in: set `agent: true` in the current context of the client
+configuration or RISEML_AGENT=1 in the environment.
+"""
+from __future__ import print_function
+
+import array
+import base64
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import riseml
+from riseml.consts import VERSION, IS_BUNDLE
+from riseml.client_config import get_config_file, get_agent_enabled
+
+AGENT_SOCKET = 'agent.sock'
+# held while the socket is probed, replaced or removed
+AGENT_LOCK = 'agent.lock'
+AGENT_LOG = 'agent.log'
+# the agent exits when it didn't receive a command for this many seconds
+AGENT_IDLE_TIMEOUT = 60 * 60
+AGENT_START_TIMEOUT = 5
+FORWARDED_SIGNALS = ('SIGINT', 'SIGTERM', 'SIGHUP', 'SIGWINCH')
+
+
+def is_agent_supported():
+    return hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork')
+
+
+def is_agent_enabled():
+    if not is_agent_supported():
+        return False
+    enabled = os.environ.get('RISEML_AGENT')
+    if enabled is not None:
+        return enabled == '1'
+    return get_agent_enabled()
+
+
+def get_agent_socket():
+    return os.path.join(os.path.dirname(get_config_file()), AGENT_SOCKET)
+
+
+class AgentLock(object):
+    """Exclusive lock on the agent's socket, so that agents don't replace each other's."""
+
+    def __init__(self, socket_path):
+        self.path = os.path.join(os.path.dirname(socket_path), AGENT_LOCK)
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        # closing the file releases the lock
+        self._file.close()
+
+
+def get_agent_id():
+    # an agent may only run commands for the code it was started from
+    return {'version': VERSION, 'path': os.path.dirname(riseml.__file__)}
+
+
+def send_message(sock, message, fds=None):
+    data = json.dumps(message).encode('utf8')
+    data = struct.pack('!I', len(data)) + data
+    if fds:
+        sent = sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                                      array.array('i', fds))])
+        data = data[sent:]
+    sock.sendall(data)
+
+
+def _recv_exactly(sock, size, max_fds=0, fds=None):
+    data = b''
+    while len(data) < size:
+        if max_fds:
+            chunk, ancdata, _, _ = sock.recvmsg(size - len(data),
+                                                socket.CMSG_SPACE(max_fds * 4))
+            for level, kind, fd_data in ancdata:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    fds.extend(array.array('i', fd_data[:len(fd_data) - len(fd_data) % 4]))
+        else:
+            chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def recv_message(sock, max_fds=0):
+    """
+    Returns the next message and the file descriptors sent with it;
+    the message is None if the connection was closed.
+    """
+    fds = []
+    header = _recv_exactly(sock, 4, max_fds, fds)
+    if header is None:
+        return None, fds
+    data = _recv_exactly(sock, struct.unpack('!I', header)[0])
+    if data is None:
+        return None, fds
+    return json.loads(data.decode('utf8')), fds
+
+
+def connect(socket_path=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or get_agent_socket())
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def start_agent():
+    """Starts the agent in the background and returns a connection to it."""
+    import subprocess
+    if IS_BUNDLE:
+        cmd = [sys.executable, 'agent', 'serve']
+    else:
+        cmd = [sys.executable, '-m', 'riseml', 'agent', 'serve']
+    log_file = os.path.join(os.path.dirname(get_config_file()), AGENT_LOG)
+    with open(log_file, 'a') as log:
+        subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                         env=dict(os.environ, RISEML_AGENT='0'),
+                         cwd='/', start_new_session=True)
+    deadline = time.time() + AGENT_START_TIMEOUT
+    while time.time() < deadline:
+        sock = connect()
+        if sock is not None:
+            return sock
+        time.sleep(0.05)
+
+
+def forward(argv):
+    """
+    Runs a command in the agent, starting the agent if necessary.
+    Returns the command's exit code or None if the command could not be
+    passed to an agent.
+    """
+    sock = connect() or start_agent()
+    if sock is None:
+        return None
+    with sock:
+        message = {'type': 'run', 'argv': argv, 'cwd': os.getcwd(),
+                   'env': dict(os.environ)}
+        message.update(get_agent_id())
+        send_message(sock, message, fds=[0, 1, 2])
+
+        def forward_signal(signum, frame):
+            try:
+                send_message(sock, {'type': 'signal', 'signum': signum})
+            except OSError:
+                pass
+
+        for name in FORWARDED_SIGNALS:
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), forward_signal)
+        reply, _ = recv_message(sock)
+    if reply is None:
+        # the command may have run already, so it must not be run again
+        print('ERROR: lost connection to agent', file=sys.stderr)
+        return 1
+    if reply['type'] != 'exit':
+        return None
+    return reply['code']
+
+
+def stop_agent():
+    sock = connect()
+    if sock is None:
+        return False
+    with sock:
+        send_message(sock, {'type': 'stop'})
+        recv_message(sock)
+    return True
+
+
+def get_agent_status():
+    sock = connect()
+    if sock is None:
+        return None
+    with sock:
+        send_message(sock, {'type': 'status'})
+        status, _ = recv_message(sock)
+    return status
+
+
+class AgentResponse(object):
+    """Response of a relayed request, quacks like urllib3.HTTPResponse."""
+
+    def __init__(self, status, reason, headers, data):
+        import io
+        self.status = status
+        self.reason = reason
+        self.headers = dict(headers)
+        self.data = data
+        self._fp = io.BytesIO(data)
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        for key, value in self.headers.items():
+            if key.lower() == name.lower():
+                return value
+        return default
+
+    def read(self, amt=None):
+        return self._fp.read(amt)
+
+    def stream(self, amt=2 ** 16):
+        while True:
+            chunk = self._fp.read(amt)
+            if not chunk:
+                break
+            yield chunk
+
+    def release_conn(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class AgentPoolManager(object):
+    """
+    Stands in for the urllib3.PoolManager of the REST client in commands run
+    by the agent and sends their requests through the agent's pool.
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+
+    def request(self, method, url, fields=None, headers=None, body=None,
+                encode_multipart=True, preload_content=True, **kwargs):
+        import urllib3
+        if isinstance(fields, dict):
+            fields = list(fields.items())
+        message = {'type': 'http', 'method': method, 'url': url,
+                   'fields': fields, 'headers': headers, 'body': body,
+                   'encode_multipart': encode_multipart}
+        sock = connect(self.socket_path)
+        if sock is None:
+            raise urllib3.exceptions.HTTPError('Lost connection to agent')
+        with sock:
+            send_message(sock, message)
+            reply, _ = recv_message(sock)
+        if reply is None:
+            raise urllib3.exceptions.HTTPError('Lost connection to agent')
+        if 'error' in reply:
+            raise _relayed_error(reply, url)
+        return AgentResponse(reply['status'], reply['reason'], reply['headers'],
+                             base64.b64decode(reply['data']))
+
+
+def _relayed_error(reply, url):
+    import urllib3
+    exc_type = getattr(urllib3.exceptions, reply['error'], None)
+    if not isinstance(exc_type, type) or not issubclass(exc_type, urllib3.exceptions.HTTPError):
+        exc_type = urllib3.exceptions.HTTPError
+    try:
+        if issubclass(exc_type, urllib3.exceptions.RequestError):
+            # the CLI reports the host and port of the pool
+            return exc_type(urllib3.connection_from_url(url), url, reply['message'])
+        return exc_type(reply['message'])
+    except TypeError:
+        return urllib3.exceptions.HTTPError(reply['message'])
+
+
+def relay_request(conn, message, pool_manager):
+    import urllib3
+    kwargs = {'headers': message['headers'], 'preload_content': True}
+    if message['fields'] is not None:
+        kwargs['fields'] = [tuple(field) for field in message['fields']]
+        if message['method'] not in ('GET', 'HEAD', 'DELETE', 'OPTIONS'):
+            kwargs['encode_multipart'] = message['encode_multipart']
+    if message['body'] is not None:
+        kwargs['body'] = message['body']
+    try:
+        r = pool_manager.request(message['method'], message['url'], **kwargs)
+        reply = {'status': r.status, 'reason': r.reason,
+                 'headers': list(r.headers.items()),
+                 'data': base64.b64encode(r.data).decode('ascii')}
+    except urllib3.exceptions.HTTPError as e:
+        reply = {'error': type(e).__name__, 'message': str(e)}
+    with conn:
+        send_message(conn, reply)
+
+
+def run_child(argv, cwd, env, socket_path):
+    # runs in the forked child, with the caller's stdin/stdout/stderr on 0-2
+    import traceback
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(env)
+    sys.argv = ['riseml'] + argv
+    sys.stdin = open(0, 'r', closefd=False)
+    sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = open(2, 'w', buffering=1, closefd=False)
+
+    from riseml import ansi
+    ansi.COLORS_DISABLED = not sys.stdout.isatty()
+
+    code = 0
+    try:
+        from riseml.client import Configuration
+        from riseml.client_config import get_api_url, get_api_key
+        from riseml.__main__ import run
+        # the configuration may have changed since the agent was started
+        config = Configuration()
+        config.host = get_api_url()
+        config.api_key['api_key'] = get_api_key()
+        config.pool_manager = AgentPoolManager(socket_path)
+        run()
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        # output written to the streams inherited from the agent, which
+        # are on the same file descriptors now, would be lost by _exit
+        for f in (sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__):
+            try:
+                f.flush()
+            except Exception:
+                pass
+    os._exit(code)
+
+
+def get_exit_code(status):
+    if os.WIFEXITED(status):
+        return os.WEXITSTATUS(status)
+    return 128 + os.WTERMSIG(status)
+
+
+def serve_forks(sock, socket_path):
+    """
+    Runs in the fork server: forks a child for every command received on
+    `sock` and reports its pid and exit code. It has a single thread, so
+    children can't inherit locks held by other threads of the agent.
+    """
+    import select
+    # SIGCHLD wakes up select
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    # dict from pid -> command id
+    commands = {}
+    while True:
+        readable, _, _ = select.select([sock, wakeup_r], [], [])
+        if wakeup_r in readable:
+            os.read(wakeup_r, 4096)
+            while commands:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                send_message(sock, {'type': 'exit', 'id': commands.pop(pid),
+                                    'code': get_exit_code(status)})
+        if sock not in readable:
+            continue
+        message, fds = recv_message(sock, max_fds=3)
+        if message is None:
+            # the agent exited, running commands finish on their own
+            return
+        pid = os.fork()
+        if pid == 0:
+            try:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                for fd in (wakeup_r, wakeup_w):
+                    os.close(fd)
+                sock.close()
+                for target, fd in zip((0, 1, 2), fds):
+                    os.dup2(fd, target)
+                    os.close(fd)
+                run_child(message['argv'], message['cwd'],
+                          message['env'], socket_path)
+            finally:
+                os._exit(1)
+        for fd in fds:
+            os.close(fd)
+        commands[pid] = message['id']
+        send_message(sock, {'type': 'started', 'id': message['id'], 'pid': pid})
+
+
+class Command(object):
+
+    def __init__(self, id):
+        import threading
+        self.id = id
+        self.pid = None
+        self.code = None
+        self.started = threading.Event()
+        self.exited = threading.Event()
+
+
+class ForkServer(object):
+    """
+    The agent's end of the fork server. Create it before starting any
+    threads; `start` then reads its replies in a thread.
+    """
+
+    def __init__(self, socket_path, close_fds=()):
+        import threading
+        self._sock, fork_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.pid = os.fork()
+        if self.pid == 0:
+            try:
+                self._sock.close()
+                for fd in close_fds:
+                    os.close(fd)
+                serve_forks(fork_sock, socket_path)
+            finally:
+                os._exit(0)
+        fork_sock.close()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # dict from command id -> Command, of commands that didn't exit yet
+        self._commands = {}
+
+    def start(self):
+        import threading
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+    def _read_replies(self):
+        while True:
+            try:
+                reply, _ = recv_message(self._sock)
+            except OSError:
+                reply = None
+            if reply is None:
+                break
+            with self._lock:
+                command = self._commands.get(reply['id'])
+                if reply['type'] == 'exit':
+                    self._commands.pop(reply['id'], None)
+            if command is None:
+                continue
+            if reply['type'] == 'started':
+                command.pid = reply['pid']
+                command.started.set()
+            elif reply['type'] == 'exit':
+                command.code = reply['code']
+                command.exited.set()
+        # the fork server is gone, its commands can't be waited for
+        with self._lock:
+            commands, self._commands = self._commands, {}
+        for command in commands.values():
+            command.code = 1
+            command.started.set()
+            command.exited.set()
+
+    def run(self, message, fds):
+        """Runs a command in a new child, returns the Command once it started."""
+        with self._lock:
+            self._next_id += 1
+            command = Command(self._next_id)
+            self._commands[command.id] = command
+            send_message(self._sock, dict(message, id=command.id), fds=fds)
+        command.started.wait()
+        return command
+
+    def close(self):
+        # unlike close, shutdown also ends the recv of the reader thread
+        self._sock.shutdown(socket.SHUT_RDWR)
+        os.waitpid(self.pid, 0)
+        self._sock.close()
+
+
+def supervise(conn, command, children):
+    import threading
+
+    def forward_signals():
+        while True:
+            try:
+                message, _ = recv_message(conn)
+            except OSError:
+                message = None
+            if command.exited.is_set():
+                return
+            if message is None:
+                # the caller is gone, hang up like a closed terminal would
+                os.kill(command.pid, signal.SIGHUP)
+                return
+            if message['type'] == 'signal':
+                os.kill(command.pid, message['signum'])
+
+    threading.Thread(target=forward_signals, daemon=True).start()
+    command.exited.wait()
+    children.discard(command.id)
+    with conn:
+        try:
+            send_message(conn, {'type': 'exit', 'code': command.code})
+        except OSError:
+            pass
+
+
+def warm_up():
+    from riseml.commands import COMMANDS, load_parser
+    from riseml.client_config import get_client_config
+    import riseml.__main__
+    for command in COMMANDS:
+        try:
+            load_parser(command)
+        except ImportError:
+            pass
+    try:
+        get_client_config()
+    except SystemExit:
+        pass
+
+
+def serve():
+    import threading
+    from riseml.api import get_pool_manager, get_connection_stats
+    socket_path = get_agent_socket()
+    with AgentLock(socket_path):
+        if connect(socket_path) is not None:
+            print('agent is already running')
+            return
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(socket_path)
+        finally:
+            os.umask(old_umask)
+        # callers connecting while the agent warms up wait in the backlog
+        server.listen(64)
+    warm_up()
+    pool_manager = get_pool_manager()
+    agent_id = get_agent_id()
+    server.settimeout(AGENT_IDLE_TIMEOUT)
+    print('agent %d listening on %s' % (os.getpid(), socket_path))
+    # the fork server must not write out the agent's buffered output
+    sys.stdout.flush()
+    sys.stderr.flush()
+    fork_server = ForkServer(socket_path, close_fds=[server.fileno()])
+    fork_server.start()
+
+    # ids of running commands, their API requests still go through the
+    # agent so it only exits when they are done
+    children = set()
+    supervisors = []
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                if children:
+                    continue
+                break
+            try:
+                conn.settimeout(5)
+                message, fds = recv_message(conn, max_fds=3)
+                conn.settimeout(None)
+            except OSError:
+                conn.close()
+                continue
+            if message is None:
+                conn.close()
+            elif message['type'] == 'http':
+                threading.Thread(target=relay_request, daemon=True,
+                                 args=(conn, message, pool_manager)).start()
+            elif message['type'] == 'run':
+                if any(message.get(k) != v for k, v in agent_id.items()):
+                    # the CLI was updated, the caller runs the command itself
+                    for fd in fds:
+                        os.close(fd)
+                    with conn:
+                        send_message(conn, {'type': 'restart'})
+                    break
+                try:
+                    command = fork_server.run(message, fds)
+                except OSError:
+                    # the fork server is gone, the caller runs the command itself
+                    command = None
+                for fd in fds:
+                    os.close(fd)
+                if command is None:
+                    with conn:
+                        send_message(conn, {'type': 'restart'})
+                    break
+                children.add(command.id)
+                supervisor = threading.Thread(target=supervise, daemon=True,
+                                              args=(conn, command, children))
+                supervisor.start()
+                supervisors.append(supervisor)
+            elif message['type'] == 'status':
+                with conn:
+                    status = {'pid': os.getpid(), 'socket': socket_path,
+                              'connections': get_connection_stats()}
+                    status.update(agent_id)
+                    send_message(conn, status)
+            elif message['type'] == 'stop':
+                with conn:
+                    send_message(conn, {'type': 'stopped'})
+                break
+            else:
+                conn.close()
+    finally:
+        # a new agent may only replace the socket once this one is removed
+        with AgentLock(socket_path):
+            os.unlink(socket_path)
+            server.close()
+    # let running commands report their exit code
+    for supervisor in supervisors:
+        supervisor.join()
+    fork_server.close()
@@ -0,0 +1,149 @@
+"""
+A minimal websocket client for asyncio: enough of RFC 6455 to read
+text messages from a stream. Many connections can share one event loop,
+where websocket-client needs a thread per connection.
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import ssl
+import struct
+from urllib.parse import urlparse
+
+GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xa
+
+CLOSE_NORMAL = 1000
+
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+class WebSocketError(Exception):
+    pass
+
+
+def encode_frame(opcode, payload=b''):
+    """Returns a final client frame; client frames are masked."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+    mask = os.urandom(4)
+    return header + mask + mask_payload(mask, payload)
+
+
+def mask_payload(mask, payload):
+    # xor with the repeated mask, as one big integer
+    if not payload:
+        return payload
+    mask = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    masked = int.from_bytes(payload, 'big') ^ int.from_bytes(mask, 'big')
+    return masked.to_bytes(len(payload), 'big')
+
+
+class WebSocket(object):
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self.closed = False
+        # status code of the close frame received from the server, if any
+        self.close_status = None
+
+    async def _read_frame(self):
+        first, second = await self._reader.readexactly(2)
+        length = second & 0x7f
+        if length == 126:
+            length, = struct.unpack('!H', await self._reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack('!Q', await self._reader.readexactly(8))
+        if length > MAX_MESSAGE_SIZE:
+            raise WebSocketError('Frame of %d bytes is too large' % length)
+        mask = await self._reader.readexactly(4) if second & 0x80 else None
+        payload = await self._reader.readexactly(length)
+        if mask is not None:
+            payload = mask_payload(mask, payload)
+        return bool(first & 0x80), first & 0x0f, payload
+
+    async def recv(self):
+        """Returns the next text message, or None once the connection is closed."""
+        fragments = []
+        while not self.closed:
+            try:
+                final, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self._close_transport()
+                return None
+            if opcode == OPCODE_PING:
+                await self._send(OPCODE_PONG, payload)
+            elif opcode == OPCODE_CLOSE:
+                if len(payload) >= 2:
+                    self.close_status, = struct.unpack('!H', payload[:2])
+                await self.close(payload[:2])
+                return None
+            elif opcode in (OPCODE_TEXT, OPCODE_BINARY, OPCODE_CONTINUATION):
+                fragments.append(payload)
+                if final:
+                    return b''.join(fragments).decode('utf8')
+        return None
+
+    async def _send(self, opcode, payload=b''):
+        self._writer.write(encode_frame(opcode, payload))
+        await self._writer.drain()
+
+    async def close(self, status=struct.pack('!H', CLOSE_NORMAL)):
+        if self.closed:
+            return
+        try:
+            await self._send(OPCODE_CLOSE, status)
+        except ConnectionError:
+            pass
+        self._close_transport()
+
+    def _close_transport(self):
+        self.closed = True
+        self._writer.close()
+
+
+async def connect(url, headers=None, timeout=10):
+    """Opens a websocket to a ws:// or wss:// url."""
+    url = urlparse(url)
+    secure = url.scheme == 'wss'
+    port = url.port or (443 if secure else 80)
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(url.hostname, port,
+                                ssl=ssl.create_default_context() if secure else None),
+        timeout)
+    key = base64.b64encode(os.urandom(16))
+    request = ['GET %s HTTP/1.1' % ((url.path or '/') + ('?' + url.query if url.query else '')),
+               'Host: %s:%d' % (url.hostname, port),
+               'Upgrade: websocket',
+               'Connection: Upgrade',
+               'Sec-WebSocket-Key: %s' % key.decode('ascii'),
+               'Sec-WebSocket-Version: 13']
+    request += ['%s: %s' % header for header in (headers or {}).items()]
+    writer.write(('\r\n'.join(request) + '\r\n\r\n').encode('latin-1'))
+    try:
+        response = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        writer.close()
+        raise WebSocketError('Invalid handshake response')
+    lines = response.decode('latin-1').split('\r\n')
+    status = lines[0].split(' ')
+    fields = dict((name.strip().lower(), value.strip())
+                  for name, _, value in (line.partition(':') for line in lines[1:] if line))
+    accept = base64.b64encode(hashlib.sha1(key + GUID).digest()).decode('ascii')
+    if len(status) < 2 or status[1] != '101' or fields.get('sec-websocket-accept') != accept:
+        writer.close()
+        raise WebSocketError('Handshake failed: %s' % lines[0])
+    return WebSocket(reader, writer)
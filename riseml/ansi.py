@@ -48,6 +48,23 @@ def strip_color(s):
     return re.sub('\x1b\\[(K|.*?m)', '', s)
 
 
+ANSI_SEQUENCE_REGEX = re.compile('(\x1b\\[[0-9;]*[A-Za-z])')
+
+
+def truncate(s, width):
+    """Truncates `s` to `width` visible characters, keeping ANSI sequences."""
+    if '\x1b' not in s:
+        return s[:width]
+    parts = []
+    for i, part in enumerate(ANSI_SEQUENCE_REGEX.split(s)):
+        if i % 2:
+            parts.append(part)
+        elif width > 0:
+            parts.append(part[:width])
+            width -= len(part)
+    return ''.join(parts)
+
+
 def color_string(s, color=None, ansi_code=None):
     assert color is not None or ansi_code is not None, "You need to supply `color` or `ansi_code` param."
     assert not (color is not None and ansi_code is not None), "You need to supply either `color` or `ansi_code`"
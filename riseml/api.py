@@ -0,0 +1,137 @@
+"""
+Process-wide API client.
+
+All commands and helpers share one ApiClient and one urllib3 pool manager,
+so connections to the API server are kept alive and reused for all requests
+of a command. The pool is configured by the `connections` section of the
+current context in the client configuration.
+"""
+import threading
+from queue import Queue
+
+from riseml.client import ApiClient, Configuration
+from riseml.client.rest import RESTClientObject
+from riseml.client_config import get_connection_config
+
+_lock = threading.Lock()
+_api_client = None
+
+
+def configure_connections():
+    config = Configuration()
+    if config.pool_manager is not None:
+        # e.g. requests are relayed through the agent
+        return
+    connection_config = get_connection_config()
+    config.connection_pool_maxsize = connection_config['maxsize']
+    config.connection_pool_block = connection_config['block']
+    config.pool_manager = RESTClientObject(pools_size=connection_config['pools']).pool_manager
+
+
+def get_pool_manager():
+    with _lock:
+        if Configuration().pool_manager is None:
+            configure_connections()
+        return Configuration().pool_manager
+
+
+def reserve_connections(count):
+    """
+    Lets the shared pool keep up to `count` connections per host open, e.g.
+    for requests sent from several threads. Only affects pools created after
+    the call.
+    """
+    pool_manager = get_pool_manager()
+    pool_kw = getattr(pool_manager, 'connection_pool_kw', None)
+    if pool_kw is not None:
+        pool_kw['maxsize'] = max(pool_kw.get('maxsize') or 1, count)
+
+
+def get_api_client():
+    global _api_client
+    with _lock:
+        if _api_client is None:
+            configure_connections()
+            _api_client = ApiClient()
+            if not get_connection_config()['keep-alive']:
+                _api_client.set_default_header('Connection', 'close')
+            Configuration().api_client = _api_client
+        return _api_client
+
+
+# item types of the list operations that can be streamed
+STREAMING_OPERATIONS = {
+    'get_experiments': 'list[Experiment]',
+    'get_jobs': 'list[Job]',
+    'get_project_jobs': 'list[Job]',
+    'get_users': 'list[User]',
+    'get_nodes': 'list[Node]',
+}
+
+
+def iter_items(operation, *args, **kwargs):
+    """
+    Calls a list operation of DefaultApi or AdminApi, e.g.
+    `iter_items(client.get_experiments, count=0)`, and returns a generator
+    of its models that are deserialized while the response is downloaded.
+
+    Errors of the request are raised by the call itself, so it can be used
+    with util.call_api.
+    """
+    response_type = STREAMING_OPERATIONS[operation.__name__]
+    response = operation(*args, _preload_content=False, **kwargs)
+    api_client = operation.__self__.api_client
+    return api_client.deserialize_stream(response, response_type)
+
+
+def prefetch(items, size=256):
+    """
+    Consumes an iterable in a background thread, keeping up to `size` items
+    ahead of the caller, e.g. to download while rows are printed.
+
+    Exceptions raised by the iterable are re-raised to the caller.
+    """
+    queue = Queue(maxsize=size)
+    done = object()
+
+    def produce():
+        try:
+            for item in items:
+                queue.put((item, None))
+        except BaseException as e:
+            queue.put((done, e))
+        else:
+            queue.put((done, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item, error = queue.get()
+        if item is done:
+            if error is not None:
+                raise error
+            return
+        yield item
+
+
+def get_connection_stats():
+    """
+    Returns the number of requests sent and connections opened by the shared
+    pool manager, or None if it has no urllib3 connection pools.
+    """
+    pool_manager = Configuration().pool_manager
+    pools = getattr(pool_manager, 'pools', None)
+    if pools is None:
+        return None
+    stats = {'requests': 0, 'connections': 0}
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is not None:
+            stats['requests'] += pool.num_requests
+            stats['connections'] += pool.num_connections
+    return stats
+
+
+def format_connection_stats(stats):
+    reused = stats['requests'] - stats['connections']
+    return '%d requests over %d connections (%d reused)' % (
+        stats['requests'], stats['connections'], max(reused, 0))
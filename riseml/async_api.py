@@ -0,0 +1,82 @@
+"""
+asyncio interface to the RiseML API.
+
+AsyncDefaultApi and AsyncAdminApi offer the operations of the generated
+DefaultApi and AdminApi as coroutines, e.g.
+
+    api = AsyncDefaultApi(max_concurrency=64)
+    jobs = await asyncio.gather(*[api.get_job(job_id) for job_id in job_ids])
+    api.close()
+
+Requests are sent by a bounded pool of worker threads through the shared
+ApiClient and connection pool of riseml.api, so responses are deserialized
+into the usual models. At most `max_concurrency` requests are in flight per
+instance; further calls wait for a free slot.
+"""
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from riseml.api import get_api_client, reserve_connections
+from riseml.client import AdminApi, DefaultApi
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+
+def _async_operation(name, operation):
+    @functools.wraps(operation)
+    async def call(self, *args, **kwargs):
+        if 'callback' in kwargs:
+            raise TypeError("%s() does not take a callback, await it instead" % name)
+        bound = getattr(self.api, name)
+        async with self._get_semaphore():
+            return await asyncio.get_event_loop().run_in_executor(
+                self._executor, functools.partial(bound, *args, **kwargs))
+    return call
+
+
+def _async_api(api_class):
+    def decorate(cls):
+        cls.api_class = api_class
+        for name, operation in inspect.getmembers(api_class, inspect.isfunction):
+            if not name.startswith('_'):
+                setattr(cls, name, _async_operation(name, operation))
+        return cls
+    return decorate
+
+
+class AsyncApi(object):
+    api_class = None
+
+    def __init__(self, api_client=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        reserve_connections(max_concurrency)
+        self.api = self.api_class(api_client or get_api_client())
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = None
+
+    def _get_semaphore(self):
+        # created on first use so that it belongs to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+@_async_api(DefaultApi)
+class AsyncDefaultApi(AsyncApi):
+    pass
+
+
+@_async_api(AdminApi)
+class AsyncAdminApi(AsyncApi):
+    pass
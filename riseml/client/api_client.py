@@ -27,6 +27,7 @@ from .rest import ApiException
 import os
 import re
 import json
+import codecs
 import mimetypes
 import tempfile
 import threading
@@ -58,6 +59,14 @@ class ApiClient(object):
     :param header_name: a header to pass when making calls to the API.
     :param header_value: a header value to pass when making calls to the API.
     """
+
+    PRIMITIVE_TYPES = {
+        'int': int,
+        'long': int if PY3 else long,
+        'float': float,
+        'str': str,
+        'bool': bool,
+    }
     def __init__(self, host=None, header_name=None, header_value=None, cookie=None):
 
         """
@@ -72,6 +81,11 @@ class ApiClient(object):
         else:
             self.host = host
         self.cookie = cookie
+        # compiled deserializers by type name, see __get_deserializer
+        self._deserializers = {}
+        # deserializers being compiled, published once all are complete
+        self._compiling = {}
+        self._compile_lock = threading.Lock()
         # Set default User-Agent.
         self.user_agent = 'RiseML/1.0.2/python'
 
@@ -230,6 +244,67 @@ class ApiClient(object):
 
         return self.__deserialize(data, response_type)
 
+    def deserialize_stream(self, response, response_type, chunk_size=2 ** 16):
+        """
+        Deserializes a JSON array response item by item while it is read.
+
+        :param response: urllib3.HTTPResponse of a request made with
+            `_preload_content=False`.
+        :param response_type: string of a list class name, e.g. `list[Job]`.
+        :param chunk_size: number of bytes read from the response at once.
+
+        :return: generator of deserialized items.
+        """
+        deserialize_item = self.__get_deserializer(response_type[len('list['):-1])
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf8')()
+        chunks = response.stream(chunk_size)
+        buf = ''
+        pos = 0
+        started = done = finished = False
+        try:
+            while not finished:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    buf += utf8.decode(b'', final=True)
+                    done = True
+                else:
+                    buf += utf8.decode(chunk)
+                while True:
+                    while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                        pos += 1
+                    if pos == len(buf):
+                        break
+                    if not started:
+                        if buf[pos] != '[':
+                            raise ValueError("Expected a JSON array")
+                        started = True
+                        pos += 1
+                        continue
+                    if buf[pos] == ']':
+                        finished = True
+                        break
+                    try:
+                        item, end = decoder.raw_decode(buf, pos)
+                    except ValueError:
+                        if done:
+                            raise
+                        break
+                    if end == len(buf) and not done:
+                        # e.g. a number that continues in the next chunk
+                        break
+                    pos = end
+                    yield None if item is None else deserialize_item(item)
+                if done and not finished:
+                    raise ValueError("Incomplete JSON array")
+                buf = buf[pos:]
+                pos = 0
+        finally:
+            if finished:
+                response.release_conn()
+            else:
+                response.close()
+
     def __deserialize(self, data, klass):
         """
         Deserializes dict, list, str into an object.
@@ -243,26 +318,7 @@ class ApiClient(object):
             return None
 
         if type(klass) == str:
-            if klass.startswith('list['):
-                sub_kls = re.match('list\[(.*)\]', klass).group(1)
-                return [self.__deserialize(sub_data, sub_kls)
-                        for sub_data in data]
-
-            if klass.startswith('dict('):
-                sub_kls = re.match('dict\(([^,]*), (.*)\)', klass).group(2)
-                return {k: self.__deserialize(v, sub_kls)
-                        for k, v in iteritems(data)}
-
-            # convert str to class
-            # for native types
-            if klass in ['int', 'float', 'str', 'bool',
-                         "date", 'datetime', "object"]:
-                klass = eval(klass)
-            elif klass == 'long':
-                klass = int if PY3 else long
-            # for model types
-            else:
-                klass = eval('models.' + klass)
+            return self.__get_deserializer(klass)(data)
 
         if klass in integer_types or klass in (float, str, bool):
             return self.__deserialize_primitive(data, klass)
@@ -275,6 +331,103 @@ class ApiClient(object):
         else:
             return self.__deserialize_model(data, klass)
 
+    def __get_deserializer(self, klass):
+        """
+        Returns a function deserializing non-null data of the given type.
+
+        Deserializers are compiled once per type name, so parsing the
+        type name and looking up model classes is not repeated per value.
+
+        :param klass: string of class name, e.g. `list[Job]`.
+        :return: function taking the data and returning the object.
+        """
+        try:
+            return self._deserializers[klass]
+        except KeyError:
+            pass
+
+        # other threads only see deserializers whose fields are complete
+        with self._compile_lock:
+            try:
+                deserializer = self.__compile_deserializer(klass)
+                self._deserializers.update(self._compiling)
+            finally:
+                self._compiling.clear()
+        return deserializer
+
+    def __compile_deserializer(self, klass):
+        """
+        Compiles the deserializer of a type into `self._compiling`, with
+        the deserializers of the types it refers to; called with
+        `self._compile_lock` held.
+        """
+        for compiled in (self._deserializers, self._compiling):
+            if klass in compiled:
+                return compiled[klass]
+
+        if klass.startswith('list['):
+            deserialize_item = self.__compile_deserializer(klass[len('list['):-1])
+            deserializer = lambda data: [
+                None if item is None else deserialize_item(item)
+                for item in data]
+        elif klass.startswith('dict('):
+            deserialize_value = self.__compile_deserializer(
+                klass[len('dict('):-1].split(', ', 1)[1])
+            deserializer = lambda data: {
+                k: None if v is None else deserialize_value(v)
+                for k, v in iteritems(data)}
+        elif klass in self.PRIMITIVE_TYPES:
+            deserializer = self.__primitive_deserializer(
+                self.PRIMITIVE_TYPES[klass])
+        elif klass == 'object':
+            deserializer = self.__deserialize_object
+        elif klass == 'date':
+            deserializer = self.__deserialize_date
+        elif klass == 'datetime':
+            deserializer = self.__deserialize_datatime
+        else:
+            return self.__compile_model_deserializer(klass)
+
+        self._compiling[klass] = deserializer
+        return deserializer
+
+    def __primitive_deserializer(self, klass):
+        deserialize_primitive = self.__deserialize_primitive
+
+        def deserializer(data):
+            if type(data) is klass:
+                return data
+            return deserialize_primitive(data, klass)
+        return deserializer
+
+    def __compile_model_deserializer(self, klass):
+        """
+        Compiles the deserializer of a model class into a list of
+        (attribute, json key, deserializer) fields.
+
+        The deserializer is added to `self._compiling` before its fields
+        are compiled, so that recursive models (e.g. `Job.children`)
+        resolve to it.
+        """
+        model_class = getattr(models, klass)
+        fields = []
+
+        def deserializer(data):
+            instance = model_class()
+            if isinstance(data, dict):
+                for attr, key, deserialize in fields:
+                    if key in data:
+                        value = data[key]
+                        setattr(instance, attr,
+                                None if value is None else deserialize(value))
+            return instance
+
+        self._compiling[klass] = deserializer
+        fields.extend((attr, model_class.attribute_map[attr],
+                       self.__compile_deserializer(attr_type))
+                      for attr, attr_type in iteritems(model_class.swagger_types))
+        return deserializer
+
     def call_api(self, resource_path, method,
                  path_params=None, query_params=None, header_params=None,
                  body=None, post_params=None, files=None,
@@ -88,6 +88,13 @@ class Configuration(object):
         self.cert_file = None
         # client key file
         self.key_file = None
+        # maximum number of connections kept per host by a REST client's pool,
+        # and whether to wait for a free connection once they are all in use
+        self.connection_pool_maxsize = 1
+        self.connection_pool_block = False
+        # pool manager shared by all REST clients instead of creating their own
+        # (anything with the request method of urllib3.PoolManager)
+        self.pool_manager = None
 
         # Version Info
         self.packageVersion = "1.0.2"
@@ -20,29 +20,28 @@ class Account(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'name': 'str',
+        'key': 'str',
+        'cluster_id': 'str',
+        'enabled_features': 'list[str]'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'name': 'name',
+        'key': 'key',
+        'cluster_id': 'cluster_id',
+        'enabled_features': 'enabled_features'
+    }
+
+    __slots__ = ('_name', '_key', '_cluster_id', '_enabled_features',)
+
     def __init__(self, name=None, key=None, cluster_id=None, enabled_features=None):
         """
         Account - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'name': 'str',
-            'key': 'str',
-            'cluster_id': 'str',
-            'enabled_features': 'list[str]'
-        }
-
-        self.attribute_map = {
-            'name': 'name',
-            'key': 'key',
-            'cluster_id': 'cluster_id',
-            'enabled_features': 'enabled_features'
-        }
-
+        """
         self._name = name
         self._key = key
         self._cluster_id = cluster_id
@@ -183,7 +182,10 @@ class Account(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Account):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
@@ -20,25 +20,24 @@ class ClusterInfo(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'key': 'str',
+        'value': 'str'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'key': 'key',
+        'value': 'value'
+    }
+
+    __slots__ = ('_key', '_value',)
+
     def __init__(self, key=None, value=None):
         """
         ClusterInfo - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
         """
-        self.swagger_types = {
-            'key': 'str',
-            'value': 'str'
-        }
-
-        self.attribute_map = {
-            'key': 'key',
-            'value': 'value'
-        }
-
         self._key = key
         self._value = value
 
@@ -131,7 +130,10 @@ class ClusterInfo(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, ClusterInfo):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
@@ -20,23 +20,22 @@ class Error(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'message': 'str'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'message': 'message'
+    }
+
+    __slots__ = ('_message',)
+
     def __init__(self, message=None):
         """
         Error - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
         """
-        self.swagger_types = {
-            'message': 'str'
-        }
-
-        self.attribute_map = {
-            'message': 'message'
-        }
-
         self._message = message
 
 
@@ -105,7 +104,10 @@ class Error(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Error):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
@@ -20,61 +20,60 @@ class Experiment(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'id': 'str',
+        'short_id': 'str',
+        'slug': 'str',
+        'state': 'str',
+        'state_changed_at': 'int',
+        'created_at': 'int',
+        'started_at': 'int',
+        'finished_at': 'int',
+        'framework': 'str',
+        'framework_config': 'object',
+        'image': 'str',
+        'run_commands': 'list[str]',
+        'concurrency': 'int',
+        'params': 'str',
+        'result': 'str',
+        'type': 'str',
+        'jobs': 'list[Job]',
+        'project': 'Project',
+        'user': 'User',
+        'children': 'list[Experiment]'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'id': 'id',
+        'short_id': 'short_id',
+        'slug': 'slug',
+        'state': 'state',
+        'state_changed_at': 'state_changed_at',
+        'created_at': 'created_at',
+        'started_at': 'started_at',
+        'finished_at': 'finished_at',
+        'framework': 'framework',
+        'framework_config': 'framework_config',
+        'image': 'image',
+        'run_commands': 'run_commands',
+        'concurrency': 'concurrency',
+        'params': 'params',
+        'result': 'result',
+        'type': 'type',
+        'jobs': 'jobs',
+        'project': 'project',
+        'user': 'user',
+        'children': 'children'
+    }
+
+    __slots__ = ('_id', '_short_id', '_slug', '_state', '_state_changed_at', '_created_at', '_started_at', '_finished_at', '_framework', '_framework_config', '_image', '_run_commands', '_concurrency', '_params', '_result', '_type', '_jobs', '_project', '_user', '_children',)
+
     def __init__(self, id=None, short_id=None, slug=None, state=None, state_changed_at=None, created_at=None, started_at=None, finished_at=None, framework=None, framework_config=None, image=None, run_commands=None, concurrency=None, params=None, result=None, type=None, jobs=None, project=None, user=None, children=None):
         """
         Experiment - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'id': 'str',
-            'short_id': 'str',
-            'slug': 'str',
-            'state': 'str',
-            'state_changed_at': 'int',
-            'created_at': 'int',
-            'started_at': 'int',
-            'finished_at': 'int',
-            'framework': 'str',
-            'framework_config': 'object',
-            'image': 'str',
-            'run_commands': 'list[str]',
-            'concurrency': 'int',
-            'params': 'str',
-            'result': 'str',
-            'type': 'str',
-            'jobs': 'list[Job]',
-            'project': 'Project',
-            'user': 'User',
-            'children': 'list[Experiment]'
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'short_id': 'short_id',
-            'slug': 'slug',
-            'state': 'state',
-            'state_changed_at': 'state_changed_at',
-            'created_at': 'created_at',
-            'started_at': 'started_at',
-            'finished_at': 'finished_at',
-            'framework': 'framework',
-            'framework_config': 'framework_config',
-            'image': 'image',
-            'run_commands': 'run_commands',
-            'concurrency': 'concurrency',
-            'params': 'params',
-            'result': 'result',
-            'type': 'type',
-            'jobs': 'jobs',
-            'project': 'project',
-            'user': 'user',
-            'children': 'children'
-        }
-
+        """
         self._id = id
         self._short_id = short_id
         self._slug = slug
@@ -599,7 +598,10 @@ class Experiment(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Experiment):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
@@ -20,31 +20,30 @@ class GPU(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'id': 'str',
+        'serial': 'str',
+        'name': 'str',
+        'device': 'str',
+        'mem': 'int'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'id': 'id',
+        'serial': 'serial',
+        'name': 'name',
+        'device': 'device',
+        'mem': 'mem'
+    }
+
+    __slots__ = ('_id', '_serial', '_name', '_device', '_mem',)
+
     def __init__(self, id=None, serial=None, name=None, device=None, mem=None):
         """
         GPU - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'id': 'str',
-            'serial': 'str',
-            'name': 'str',
-            'device': 'str',
-            'mem': 'int'
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'serial': 'serial',
-            'name': 'name',
-            'device': 'device',
-            'mem': 'mem'
-        }
-
+        """
         self._id = id
         self._serial = serial
         self._name = name
@@ -209,7 +208,10 @@ class GPU(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, GPU):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
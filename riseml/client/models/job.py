@@ -20,83 +20,82 @@ class Job(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'id': 'str',
+        'short_id': 'str',
+        'slug': 'str',
+        'experiment_id': 'str',
+        'root': 'str',
+        'parent': 'str',
+        'previous_job': 'str',
+        'name': 'str',
+        'kind': 'str',
+        'role': 'str',
+        'state': 'str',
+        'desired_state': 'str',
+        'reason': 'str',
+        'message': 'str',
+        'exit_code': 'int',
+        'created_at': 'int',
+        'started_at': 'int',
+        'state_changed_at': 'int',
+        'finished_at': 'int',
+        'cpus': 'float',
+        'mem': 'int',
+        'gpus': 'int',
+        'image': 'str',
+        'node_selectors': 'str',
+        'service_name': 'str',
+        'external_service_name': 'str',
+        'service_ports': 'str',
+        'environment': 'str',
+        'commands': 'str',
+        'project': 'Project',
+        'children': 'list[Job]'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'id': 'id',
+        'short_id': 'short_id',
+        'slug': 'slug',
+        'experiment_id': 'experiment_id',
+        'root': 'root',
+        'parent': 'parent',
+        'previous_job': 'previous_job',
+        'name': 'name',
+        'kind': 'kind',
+        'role': 'role',
+        'state': 'state',
+        'desired_state': 'desired_state',
+        'reason': 'reason',
+        'message': 'message',
+        'exit_code': 'exit_code',
+        'created_at': 'created_at',
+        'started_at': 'started_at',
+        'state_changed_at': 'state_changed_at',
+        'finished_at': 'finished_at',
+        'cpus': 'cpus',
+        'mem': 'mem',
+        'gpus': 'gpus',
+        'image': 'image',
+        'node_selectors': 'node_selectors',
+        'service_name': 'service_name',
+        'external_service_name': 'external_service_name',
+        'service_ports': 'service_ports',
+        'environment': 'environment',
+        'commands': 'commands',
+        'project': 'project',
+        'children': 'children'
+    }
+
+    __slots__ = ('_id', '_short_id', '_slug', '_experiment_id', '_root', '_parent', '_previous_job', '_name', '_kind', '_role', '_state', '_desired_state', '_reason', '_message', '_exit_code', '_created_at', '_started_at', '_state_changed_at', '_finished_at', '_cpus', '_mem', '_gpus', '_image', '_node_selectors', '_service_name', '_external_service_name', '_service_ports', '_environment', '_commands', '_project', '_children',)
+
     def __init__(self, id=None, short_id=None, slug=None, experiment_id=None, root=None, parent=None, previous_job=None, name=None, kind=None, role=None, state=None, desired_state=None, reason=None, message=None, exit_code=None, created_at=None, started_at=None, state_changed_at=None, finished_at=None, cpus=None, mem=None, gpus=None, image=None, node_selectors=None, service_name=None, external_service_name=None, service_ports=None, environment=None, commands=None, project=None, children=None):
         """
         Job - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'id': 'str',
-            'short_id': 'str',
-            'slug': 'str',
-            'experiment_id': 'str',
-            'root': 'str',
-            'parent': 'str',
-            'previous_job': 'str',
-            'name': 'str',
-            'kind': 'str',
-            'role': 'str',
-            'state': 'str',
-            'desired_state': 'str',
-            'reason': 'str',
-            'message': 'str',
-            'exit_code': 'int',
-            'created_at': 'int',
-            'started_at': 'int',
-            'state_changed_at': 'int',
-            'finished_at': 'int',
-            'cpus': 'float',
-            'mem': 'int',
-            'gpus': 'int',
-            'image': 'str',
-            'node_selectors': 'str',
-            'service_name': 'str',
-            'external_service_name': 'str',
-            'service_ports': 'str',
-            'environment': 'str',
-            'commands': 'str',
-            'project': 'Project',
-            'children': 'list[Job]'
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'short_id': 'short_id',
-            'slug': 'slug',
-            'experiment_id': 'experiment_id',
-            'root': 'root',
-            'parent': 'parent',
-            'previous_job': 'previous_job',
-            'name': 'name',
-            'kind': 'kind',
-            'role': 'role',
-            'state': 'state',
-            'desired_state': 'desired_state',
-            'reason': 'reason',
-            'message': 'message',
-            'exit_code': 'exit_code',
-            'created_at': 'created_at',
-            'started_at': 'started_at',
-            'state_changed_at': 'state_changed_at',
-            'finished_at': 'finished_at',
-            'cpus': 'cpus',
-            'mem': 'mem',
-            'gpus': 'gpus',
-            'image': 'image',
-            'node_selectors': 'node_selectors',
-            'service_name': 'service_name',
-            'external_service_name': 'external_service_name',
-            'service_ports': 'service_ports',
-            'environment': 'environment',
-            'commands': 'commands',
-            'project': 'project',
-            'children': 'children'
-        }
-
+        """
         self._id = id
         self._short_id = short_id
         self._slug = slug
@@ -885,7 +884,10 @@ class Job(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Job):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
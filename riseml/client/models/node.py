@@ -20,51 +20,50 @@ class Node(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'id': 'str',
+        'hostname': 'str',
+        'name': 'str',
+        'role': 'str',
+        'schedulable': 'bool',
+        'cpu_model': 'str',
+        'os_image': 'str',
+        'kernel_version': 'str',
+        'docker_version': 'str',
+        'kubelet_version': 'str',
+        'nvidia_driver': 'str',
+        'cpus': 'int',
+        'mem': 'int',
+        'gpus_allocatable': 'int',
+        'gpus': 'list[GPU]'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'id': 'id',
+        'hostname': 'hostname',
+        'name': 'name',
+        'role': 'role',
+        'schedulable': 'schedulable',
+        'cpu_model': 'cpu_model',
+        'os_image': 'os_image',
+        'kernel_version': 'kernel_version',
+        'docker_version': 'docker_version',
+        'kubelet_version': 'kubelet_version',
+        'nvidia_driver': 'nvidia_driver',
+        'cpus': 'cpus',
+        'mem': 'mem',
+        'gpus_allocatable': 'gpus_allocatable',
+        'gpus': 'gpus'
+    }
+
+    __slots__ = ('_id', '_hostname', '_name', '_role', '_schedulable', '_cpu_model', '_os_image', '_kernel_version', '_docker_version', '_kubelet_version', '_nvidia_driver', '_cpus', '_mem', '_gpus_allocatable', '_gpus',)
+
     def __init__(self, id=None, hostname=None, name=None, role=None, schedulable=None, cpu_model=None, os_image=None, kernel_version=None, docker_version=None, kubelet_version=None, nvidia_driver=None, cpus=None, mem=None, gpus_allocatable=None, gpus=None):
         """
         Node - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'id': 'str',
-            'hostname': 'str',
-            'name': 'str',
-            'role': 'str',
-            'schedulable': 'bool',
-            'cpu_model': 'str',
-            'os_image': 'str',
-            'kernel_version': 'str',
-            'docker_version': 'str',
-            'kubelet_version': 'str',
-            'nvidia_driver': 'str',
-            'cpus': 'int',
-            'mem': 'int',
-            'gpus_allocatable': 'int',
-            'gpus': 'list[GPU]'
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'hostname': 'hostname',
-            'name': 'name',
-            'role': 'role',
-            'schedulable': 'schedulable',
-            'cpu_model': 'cpu_model',
-            'os_image': 'os_image',
-            'kernel_version': 'kernel_version',
-            'docker_version': 'docker_version',
-            'kubelet_version': 'kubelet_version',
-            'nvidia_driver': 'nvidia_driver',
-            'cpus': 'cpus',
-            'mem': 'mem',
-            'gpus_allocatable': 'gpus_allocatable',
-            'gpus': 'gpus'
-        }
-
+        """
         self._id = id
         self._hostname = hostname
         self._name = name
@@ -469,7 +468,10 @@ class Node(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Node):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
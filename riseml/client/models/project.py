@@ -20,33 +20,32 @@ class Project(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'id': 'str',
+        'name': 'str',
+        'user_id': 'str',
+        'description': 'str',
+        'username': 'str',
+        'full_name': 'str'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'id': 'id',
+        'name': 'name',
+        'user_id': 'user_id',
+        'description': 'description',
+        'username': 'username',
+        'full_name': 'full_name'
+    }
+
+    __slots__ = ('_id', '_name', '_user_id', '_description', '_username', '_full_name',)
+
     def __init__(self, id=None, name=None, user_id=None, description=None, username=None, full_name=None):
         """
         Project - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'id': 'str',
-            'name': 'str',
-            'user_id': 'str',
-            'description': 'str',
-            'username': 'str',
-            'full_name': 'str'
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'name': 'name',
-            'user_id': 'user_id',
-            'description': 'description',
-            'username': 'username',
-            'full_name': 'full_name'
-        }
-
+        """
         self._id = id
         self._name = name
         self._user_id = user_id
@@ -235,7 +234,10 @@ class Project(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Project):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
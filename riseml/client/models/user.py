@@ -20,35 +20,34 @@ class User(object):
     NOTE: This class is auto generated by the swagger code generator program.
     Do not edit the class manually.
     """
+    # The key is attribute name and the value is attribute type.
+    swagger_types = {
+        'id': 'str',
+        'username': 'str',
+        'slug': 'str',
+        'email': 'str',
+        'api_key_plaintext': 'str',
+        'is_admin': 'bool',
+        'is_enabled': 'bool'
+    }
+
+    # The key is attribute name and the value is json key in definition.
+    attribute_map = {
+        'id': 'id',
+        'username': 'username',
+        'slug': 'slug',
+        'email': 'email',
+        'api_key_plaintext': 'api_key_plaintext',
+        'is_admin': 'is_admin',
+        'is_enabled': 'is_enabled'
+    }
+
+    __slots__ = ('_id', '_username', '_slug', '_email', '_api_key_plaintext', '_is_admin', '_is_enabled',)
+
     def __init__(self, id=None, username=None, slug=None, email=None, api_key_plaintext=None, is_admin=None, is_enabled=None):
         """
         User - a model defined in Swagger
-
-        :param dict swaggerTypes: The key is attribute name
-                                  and the value is attribute type.
-        :param dict attributeMap: The key is attribute name
-                                  and the value is json key in definition.
-        """
-        self.swagger_types = {
-            'id': 'str',
-            'username': 'str',
-            'slug': 'str',
-            'email': 'str',
-            'api_key_plaintext': 'str',
-            'is_admin': 'bool',
-            'is_enabled': 'bool'
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'username': 'username',
-            'slug': 'slug',
-            'email': 'email',
-            'api_key_plaintext': 'api_key_plaintext',
-            'is_admin': 'is_admin',
-            'is_enabled': 'is_enabled'
-        }
-
+        """
         self._id = id
         self._username = username
         self._slug = slug
@@ -261,7 +260,10 @@ class User(object):
         """
         Returns true if both objects are equal
         """
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, User):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
 
     def __ne__(self, other):
         """
@@ -64,6 +64,10 @@ class RESTClientObject(object):
         # ca_certs vs cert_file vs key_file
         # http://stackoverflow.com/a/23957365/2985775
 
+        if Configuration().pool_manager is not None:
+            self.pool_manager = Configuration().pool_manager
+            return
+
         # cert_reqs
         if Configuration().verify_ssl:
             cert_reqs = ssl.CERT_REQUIRED
@@ -86,6 +90,8 @@ class RESTClientObject(object):
         # https pool manager
         self.pool_manager = urllib3.PoolManager(
             num_pools=pools_size,
+            maxsize=Configuration().connection_pool_maxsize,
+            block=Configuration().connection_pool_block,
             cert_reqs=cert_reqs,
             ca_certs=ca_certs,
             cert_file=cert_file,
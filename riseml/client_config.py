@@ -3,6 +3,8 @@ import os
 import yaml
 import sys
 import errno
+import tempfile
+from collections import namedtuple
 from .errors import handle_error
 
 try:
@@ -36,6 +38,23 @@ users:
     api-key: ""
 """
 
+CONNECTION_DEFAULTS = {
+    # number of hosts to keep connection pools for
+    'pools': 4,
+    # connections kept open per host
+    'maxsize': 4,
+    # wait for a free connection instead of opening additional ones
+    'block': False,
+    'keep-alive': True,
+}
+
+# resolved current context of a config file, valid as long as the file's
+# mtime doesn't change (mtime is None for a missing config file)
+CachedContext = namedtuple('CachedContext', ['path', 'mtime', 'context'])
+
+_cached_context = None
+
+
 def get_config_file():
     home = str(Path.home())
     return os.path.join(home, CONFIG_PATH, CONFIG_FILE)
@@ -110,9 +129,23 @@ def validate_cluster_config(cluster_config):
     assert_exists('cluster-id', cluster_config)
 
 
+def get_config_mtime(config_file):
+    try:
+        return os.stat(config_file).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
 def get_client_config():
-    config = read_config()
-    return get_current_context(config)
+    global _cached_context
+    config_file = get_config_file()
+    mtime = get_config_mtime(config_file)
+    cached = _cached_context
+    if cached is not None and cached.path == config_file and cached.mtime == mtime:
+        return cached.context
+    context = get_current_context(read_config())
+    _cached_context = CachedContext(config_file, mtime, context)
+    return context
 
 
 def generate_config(api_key, api_host, rsync_host, cluster_id, environment):
@@ -147,15 +180,28 @@ users:
 
 def write_config(api_key, api_host, rsync_host, cluster_id,
                  environment='production'):
+    global _cached_context
+    config_file = get_config_file()
+    config_dir = os.path.dirname(config_file)
     try:
-        os.makedirs(os.path.dirname(get_config_file()))
+        os.makedirs(config_dir)
     except OSError as exc:
         if exc.errno != errno.EEXIST:
             raise
     config = generate_config(api_key, api_host, rsync_host,
                              cluster_id, environment)
-    with open(get_config_file(), 'wt') as f:
-        f.write(config)
+    # write to a temporary file first so that concurrent readers
+    # never see a partially written config
+    fd, tmp_file = tempfile.mkstemp(dir=config_dir, prefix='.config-')
+    try:
+        with os.fdopen(fd, 'wt') as f:
+            f.write(config)
+        os.replace(tmp_file, config_file)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+    context = get_current_context(yaml.safe_load(config))
+    _cached_context = CachedContext(config_file, get_config_mtime(config_file), context)
 
 
 def get_api_server():
@@ -205,4 +251,18 @@ def get_cluster_id():
 
 
 def get_environment():
-    return get_client_config().get('environment', 'production')
\ No newline at end of file
+    return get_client_config().get('environment', 'production')
+
+
+def get_agent_enabled():
+    return bool(get_client_config().get('agent', False))
+
+
+def get_log_cache_enabled():
+    return bool(get_client_config().get('log-cache', True))
+
+
+def get_connection_config():
+    config = dict(CONNECTION_DEFAULTS)
+    config.update(get_client_config().get('connections') or {})
+    return config
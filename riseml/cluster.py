@@ -0,0 +1,328 @@
+"""
+Cluster-wide monitor.
+
+Running experiments of all users are discovered periodically and their
+monitor streams are read concurrently on one asyncio event loop, in a
+single thread next to the one drawing the screen. Dropped streams are
+reconnected with exponential backoff, the stats of streams closed by the
+server are removed. Stats of running jobs are summed up per node, user
+and project, or served to Prometheus.
+"""
+from __future__ import print_function
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from io import StringIO
+
+from urllib3.exceptions import HTTPError
+
+from riseml import aiows
+from riseml.client import AdminApi
+from riseml.client.rest import ApiException
+from riseml.exporter import MetricsExporter, serve_metrics
+from riseml.monitor import JobStats, get_experiment_jobs, experiment_monitor_url, \
+    stats_lock, stats_changed
+from riseml.terminal import Screen, Keyboard
+from riseml.util import bytes_to_gib, mib_to_gib, print_table, JobState
+
+DISCOVERY_INTERVAL = 30
+# seconds, doubled after every failed attempt
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+HOSTNAME_SELECTOR = 'kubernetes.io/hostname'
+# (title, key of ClusterStats.groups)
+GROUPINGS = (('NODE', 'node'), ('USER', 'user'), ('PROJECT', 'project'))
+
+
+def get_selected_hostname(job):
+    for selector in (job.node_selectors or '').splitlines():
+        key, _, value = selector.partition(':')
+        if key.strip() == HOSTNAME_SELECTOR:
+            return value.strip()
+
+
+def get_gpu_nodes(nodes):
+    """Maps the ids of GPUs that are found on exactly one node to its hostname."""
+    counts = Counter(gpu.id for node in nodes for gpu in node.gpus or [])
+    return {gpu.id: node.hostname for node in nodes for gpu in node.gpus or []
+            if counts[gpu.id] == 1}
+
+
+class Aggregate(object):
+
+    def __init__(self):
+        self.jobs = 0
+        self.cpus_used = 0
+        self.cpus_requested = 0
+        self.memory_used = 0
+        self.memory_requested = 0
+        self.gpus_used = 0
+        self.gpus_requested = 0
+        self.gpu_memory_used = 0
+        self.gpu_memory_total = 0
+
+    def add(self, job_stats):
+        job = job_stats.job
+        self.jobs += 1
+        self.cpus_used += (job_stats.get('cpu_percent') or 0) / 100.
+        self.cpus_requested += job.cpus or 0
+        self.memory_used += job_stats.get('memory_used') or 0
+        self.memory_requested += job.mem or 0
+        self.gpus_used += (job_stats.get('gpu_percent') or 0) / 100.
+        self.gpus_requested += job.gpus or 0
+        self.gpu_memory_used += job_stats.get('gpu_memory_used') or 0
+        self.gpu_memory_total += job_stats.get('gpu_memory_total') or 0
+
+
+class ClusterStats(object):
+
+    def __init__(self, gpu_nodes=None):
+        # dict from job id -> JobStats
+        self.jobs_stats = OrderedDict()
+        # dict from job id -> {'user': ..., 'project': ...}
+        self.groups = {}
+        # dict from experiment id (or job id, see add_jobs) -> job ids
+        self.experiments = {}
+        self.gpu_nodes = gpu_nodes or {}
+
+    def add_experiment(self, experiment):
+        self.add_jobs(experiment.id, get_experiment_jobs(experiment), experiment.project.name,
+                      experiment.user.username if experiment.user else '-')
+
+    def add_jobs(self, key, jobs, project, user='-'):
+        """Adds jobs streamed together, removed with remove_experiment(key)."""
+        self.experiments[key] = [job.id for job in jobs]
+        for job in jobs:
+            self.jobs_stats[job.id] = JobStats(job)
+            self.groups[job.id] = {'user': user, 'project': project}
+
+    def remove_experiment(self, experiment_id):
+        for job_id in self.experiments.pop(experiment_id, []):
+            del self.jobs_stats[job_id]
+            del self.groups[job_id]
+
+    def apply(self, msg):
+        """Applies a monitor stream message, returns whether stats changed."""
+        if msg['type'] == 'utilization':
+            job_stats = self.jobs_stats.get(msg['data']['job_id'])
+            if job_stats is not None:
+                job_stats.update(msg['data'])
+                return True
+        elif msg['type'] == 'state':
+            job_stats = self.jobs_stats.get(msg['job_id'])
+            if job_stats is not None:
+                job_stats.update_job_state(msg['state'])
+                return True
+        return False
+
+    def get_node(self, job_stats):
+        hostname = get_selected_hostname(job_stats.job)
+        if hostname:
+            return hostname
+        for gpu_stats in job_stats.gpu_stats.values():
+            hostname = self.gpu_nodes.get(gpu_stats.stats.get('device_bus_id'))
+            if hostname:
+                return hostname
+        return '-'
+
+    def aggregate(self, key):
+        """Returns Aggregates of running jobs by node, user or project, sorted by name."""
+        aggregates = {}
+        for job_id, job_stats in self.jobs_stats.items():
+            if job_stats.job.state != JobState.running:
+                continue
+            name = self.get_node(job_stats) if key == 'node' else self.groups[job_id][key]
+            aggregates.setdefault(name, Aggregate()).add(job_stats)
+        return OrderedDict(sorted(aggregates.items()))
+
+
+def get_cluster_infos(cluster_stats):
+    def format_used(used, requested):
+        return '{:>5.1f}/{:g}'.format(used, round(requested, 1))
+
+    output = StringIO()
+    running = sum(1 for js in cluster_stats.jobs_stats.values() if js.job.state == JobState.running)
+    print('%d experiments, %d jobs running' % (len(cluster_stats.experiments), running), file=output)
+    for title, key in GROUPINGS:
+        rows = [[name, aggregate.jobs,
+                 format_used(aggregate.cpus_used, aggregate.cpus_requested),
+                 format_used(bytes_to_gib(aggregate.memory_used), mib_to_gib(aggregate.memory_requested)),
+                 format_used(aggregate.gpus_used, aggregate.gpus_requested),
+                 format_used(bytes_to_gib(aggregate.gpu_memory_used),
+                             bytes_to_gib(aggregate.gpu_memory_total))]
+                for name, aggregate in cluster_stats.aggregate(key).items()]
+        print(file=output)
+        print_table(
+            header=[title, 'JOBS', 'CPU', 'MEM', 'GPU', 'GPU MEM'],
+            min_widths=[8, 4, 10, 10, 10, 10],
+            rows=rows,
+            file=output,
+            column_spaces=2
+        )
+    return output.getvalue()
+
+
+class ClusterMonitor(object):
+    """Keeps a monitor stream open for every running experiment."""
+
+    def __init__(self, client, cluster_stats, interval=DISCOVERY_INTERVAL):
+        self.client = client
+        self.cluster_stats = cluster_stats
+        self.interval = interval
+        # dict from experiment id -> stream task
+        self._streams = {}
+
+    def _get_running_experiments(self):
+        return self.client.get_experiments(states=JobState.running, all_users=True, count=0)
+
+    async def discover(self):
+        loop = asyncio.get_event_loop()
+        try:
+            experiments = await loop.run_in_executor(None, self._get_running_experiments)
+        except (ApiException, HTTPError):
+            # keep the current streams until the next discovery
+            return
+        running = {e.id for e in experiments if e.state == JobState.running}
+        for experiment_id in set(self._streams) - running:
+            self._streams.pop(experiment_id).cancel()
+            with stats_lock:
+                self.cluster_stats.remove_experiment(experiment_id)
+        new = [experiment_id for experiment_id in running if experiment_id not in self._streams]
+        details = await asyncio.gather(*[loop.run_in_executor(None, self.client.get_experiment, experiment_id)
+                                         for experiment_id in new],
+                                       return_exceptions=True)
+        for experiment in details:
+            if isinstance(experiment, Exception):
+                # retried at the next discovery
+                continue
+            with stats_lock:
+                self.cluster_stats.add_experiment(experiment)
+            self._streams[experiment.id] = loop.create_task(
+                self._stream(experiment.id, experiment_monitor_url(experiment)))
+        stats_changed.set()
+
+    async def _stream(self, key, url):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                ws = await aiows.connect(url)
+                try:
+                    while True:
+                        message = await ws.recv()
+                        if message is None:
+                            break
+                        delay = RECONNECT_DELAY
+                        msg = json.loads(message)
+                        with stats_lock:
+                            changed = self.cluster_stats.apply(msg)
+                        if changed:
+                            stats_changed.set()
+                finally:
+                    await ws.close()
+                if ws.close_status == aiows.CLOSE_NORMAL:
+                    # the experiment is over, or rediscovered if it's still running
+                    self._remove(key)
+                    return
+            except (OSError, asyncio.TimeoutError, aiows.WebSocketError, ValueError):
+                pass
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _remove(self, key):
+        self._streams.pop(key, None)
+        with stats_lock:
+            self.cluster_stats.remove_experiment(key)
+        stats_changed.set()
+
+    async def run(self):
+        while True:
+            await self.discover()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_until_complete, args=(self.run(),), daemon=True)
+        thread.start()
+
+
+class StreamMonitor(ClusterMonitor):
+    """Keeps the monitor streams of given experiments or jobs open until they are closed."""
+
+    def __init__(self, cluster_stats, urls):
+        """`urls` maps the keys of jobs added to `cluster_stats` to their stream."""
+        super(StreamMonitor, self).__init__(None, cluster_stats)
+        self.urls = urls
+        # set once all streams are closed
+        self.closed = threading.Event()
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        for key, url in self.urls.items():
+            self._streams[key] = loop.create_task(self._stream(key, url))
+        try:
+            await asyncio.gather(*self._streams.values())
+        finally:
+            self.closed.set()
+
+
+def start_cluster_monitor(client, interval=DISCOVERY_INTERVAL):
+    """Returns ClusterStats kept up to date in the background, `client` is a DefaultApi."""
+    try:
+        # nodes are listed by the admin API, on the same connection
+        gpu_nodes = get_gpu_nodes(AdminApi(client.api_client).get_nodes())
+    except (ApiException, HTTPError):
+        # jobs are only grouped by their node selectors
+        gpu_nodes = {}
+    cluster_stats = ClusterStats(gpu_nodes)
+    ClusterMonitor(client, cluster_stats, interval).start()
+    return cluster_stats
+
+
+def monitor_cluster(client, interval=DISCOVERY_INTERVAL):
+    cluster_stats = start_cluster_monitor(client, interval)
+
+    quit = threading.Event()
+
+    def on_key(key):
+        if key == 'q':
+            quit.set()
+            stats_changed.set()
+
+    screen = Screen(changed=stats_changed)
+    keyboard = Keyboard(on_key)
+    keyboard.start()
+    try:
+        while not quit.is_set():
+            with stats_lock:
+                text = get_cluster_infos(cluster_stats)
+            screen.render(text.strip())
+            # redraws of bursts of updates are combined
+            time.sleep(0.1)
+            screen.wait(1)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        keyboard.stop()
+
+
+def serve_stats(address, cluster_stats, until=None):
+    """
+    Serves the stats of the jobs in `cluster_stats`, which are kept up to
+    date in the background, to Prometheus at http://<address>/metrics,
+    until the event `until` is set.
+    """
+    def get_jobs_stats():
+        return [(job_stats, cluster_stats.groups[job_id]['project'])
+                for job_id, job_stats in cluster_stats.jobs_stats.items()]
+
+    exporter = MetricsExporter(get_jobs_stats, stats_lock, stats_changed)
+    exporter.start()
+    print('Serving stats at http://%s:%d/metrics' % (address[0] or 'localhost', address[1]))
+    try:
+        serve_metrics(exporter, address, until)
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,49 @@
-from .deploy import add_deploy_parser
-from .execute import add_exec_parser
-from .logs import add_logs_parser
-from .train import add_train_parser
-from .kill import add_kill_parser
-from .system import add_system_parser
-from .account import add_account_parser
-from .status import add_status_parser
-from .whoami import add_whoami_parser
-from .init import add_init_parser
-from .monitor import add_monitor_parser
-from .user import add_user_parser
\ No newline at end of file
+import importlib
+from collections import OrderedDict
+
+# top-level commands in the order they appear in the usage, mapped to
+# (module, parser function, help). A command's module is only imported
+# when that command is run, all other commands get a placeholder parser
+# that is just good enough for `riseml --help`.
+COMMANDS = OrderedDict([
+    # user ops
+    ('whoami', ('.whoami', 'add_whoami_parser', "show currently logged in user")),
+    ('user', ('.user', 'add_user_parser', "modify users")),
+
+    # system ops
+    ('system', ('.system', 'add_system_parser', "system level commands")),
+    ('account', ('.account', 'add_account_parser', "account level commands")),
+
+    # worklow ops
+    ('init', ('.init', 'add_init_parser', "create config file for this directory")),
+    ('train', ('.train', 'add_train_parser', "run new experiment or experiment series")),
+    #('exec', ('.execute', 'add_exec_parser', "execute single command")),
+    ('monitor', ('.monitor', 'add_monitor_parser', "show monitor")),
+    #('deploy', ('.deploy', 'add_deploy_parser', "run new deploy job")),
+    ('logs', ('.logs', 'add_logs_parser', "show logs")),
+    ('kill', ('.kill', 'add_kill_parser', "kill on-going experiment or experiment series")),
+    ('status', ('.status', 'add_status_parser', "show (running) experiments")),
+
+    # client ops
+    ('agent', ('.agent', 'add_agent_parser', "manage background agent")),
+])
+
+
+def get_command(argv):
+    for arg in argv:
+        if not arg.startswith('-'):
+            return arg if arg in COMMANDS else None
+
+
+def load_parser(command):
+    module_name, parser_fn, _ = COMMANDS[command]
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, parser_fn)
+
+
+def add_command_parsers(subparsers, command=None):
+    for name, (_, _, help) in COMMANDS.items():
+        if name == command:
+            load_parser(name)(subparsers)
+        else:
+            subparsers.add_parser(name, help=help)
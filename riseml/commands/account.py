@@ -2,7 +2,8 @@ import webbrowser
 import requests
 import sys
 
-from riseml.client import AdminApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import AdminApi
 from riseml.util import call_api, browser_available, bold, read_yes_no
 from riseml.client_config import get_riseml_url
 
@@ -40,8 +41,7 @@ def add_account_info_parser(subparsers):
 
 
 def run_upgrade(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     account = call_api(lambda: client.get_account_info())
     if account.key is None:
         print('You have not registered with an account. '
@@ -56,8 +56,7 @@ def run_upgrade(args):
 
 
 def run_sync(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     res = call_api(lambda: client.sync_account_info())
     if res.name is None:
         print('You have not registered with an account. '
@@ -72,8 +71,7 @@ def run_info(args):
         names = {'user_management': 'User Management'}
         return [names.get(f, f) for f in features]
 
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     account = call_api(lambda: client.get_account_info())
 
 
@@ -94,8 +92,7 @@ def run_info(args):
 
 
 def run_register(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     account = call_api(lambda: client.get_account_info())
     if account.key is not None:
         print('Note: this cluster is already registered with an account. '
@@ -117,8 +114,7 @@ def run_register(args):
 
 def read_and_register_account_key():
     account_key = input('Please enter your account key: ').strip()
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     res = call_api(lambda: client.update_account(account_key=account_key))
     if res.name is None:
         print('Invalid account key. Please verify that your key is correct '
@@ -0,0 +1,79 @@
+from riseml import agent
+from riseml.api import format_connection_stats
+from riseml.errors import handle_error
+
+
+def add_agent_parser(subparsers):
+    parser = subparsers.add_parser('agent', help="manage background agent")
+    subsubparsers = parser.add_subparsers()
+    add_agent_start_parser(subsubparsers)
+    add_agent_stop_parser(subsubparsers)
+    add_agent_status_parser(subsubparsers)
+    add_agent_serve_parser(subsubparsers)
+    def run(args):
+        parser.print_usage()
+    parser.set_defaults(run=run)
+
+
+def add_agent_start_parser(subparsers):
+    parser = subparsers.add_parser('start', help="start agent in background")
+    parser.set_defaults(run=run_start)
+
+
+def add_agent_stop_parser(subparsers):
+    parser = subparsers.add_parser('stop', help="stop agent")
+    parser.set_defaults(run=run_stop)
+
+
+def add_agent_status_parser(subparsers):
+    parser = subparsers.add_parser('status', help="show agent status")
+    parser.set_defaults(run=run_status)
+
+
+def add_agent_serve_parser(subparsers):
+    parser = subparsers.add_parser('serve', help="run agent in foreground")
+    parser.set_defaults(run=run_serve)
+
+
+def check_supported():
+    if not agent.is_agent_supported():
+        handle_error('The agent is not supported on this platform')
+
+
+def run_start(args):
+    check_supported()
+    status = agent.get_agent_status()
+    if status is None:
+        if agent.start_agent() is None:
+            handle_error('Could not start agent')
+        status = agent.get_agent_status()
+    print('Agent is running (pid %s)' % status['pid'])
+
+
+def run_stop(args):
+    check_supported()
+    if agent.stop_agent():
+        print('Agent stopped')
+    else:
+        print('Agent is not running')
+
+
+def run_status(args):
+    check_supported()
+    status = agent.get_agent_status()
+    if status is None:
+        print('Agent is not running')
+    else:
+        print('Agent is running (pid %s)' % status['pid'])
+        print('socket: %s' % status['socket'])
+        print('version: %s' % status['version'])
+        if status.get('connections'):
+            print('connections: %s' % format_connection_stats(status['connections']))
+    if not agent.is_agent_enabled():
+        print('Commands are not run in the agent, '
+              'set `agent: true` in your client configuration to enable it.')
+
+
+def run_serve(args):
+    check_supported()
+    agent.serve()
@@ -1,27 +1,47 @@
-from riseml.client import DefaultApi, ApiClient
+import random
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from riseml.client_config import get_api_url
-from riseml.errors import handle_error
+from urllib3.exceptions import HTTPError
+
+from riseml.api import get_api_client, reserve_connections
+from riseml.client import DefaultApi
+from riseml.client.rest import ApiException
+
+from riseml.errors import handle_error, get_http_error_message
+
+from riseml.util import call_api, is_experiment_id, select_experiments, unique, ACTIVE_STATES
+
+EXPERIMENT_RANGE_REGEX = re.compile(r'^((?:\.[^\.]+\.)?(?:\d+\.)?)(\d+)-(\d+)$')
+
+# transient failures worth another attempt
+RETRY_STATUSES = (0, 429, 500, 502, 503, 504)
 
-from riseml.util import call_api, is_experiment_id
 
 def add_kill_parser(subparsers):
     parser = subparsers.add_parser('kill', help="kill on-going experiment or experiment series")
-    parser.add_argument('ids', help="experiment/series identifiers (optional)", nargs='*')
-    parser.add_argument('-f', '--force', help="force kill experiment", action="store_const", const=True)    
+    parser.add_argument('ids', help="experiment/series identifiers or ranges like 10-15 (optional)", nargs='*')
+    parser.add_argument('-f', '--force', help="force kill experiment", action="store_const", const=True)
+    parser.add_argument('-p', '--project', help="kill all on-going experiments of a project")
+    parser.add_argument('-s', '--state', help="kill all experiments in this state (can be repeated)",
+                        action='append', type=str.upper, choices=ACTIVE_STATES)
+    parser.add_argument('-j', '--jobs', help="number of experiments to kill in parallel", default=16, type=int)
+    parser.add_argument('--retries', help="retries per experiment on transient errors", default=3, type=int)
     parser.set_defaults(run=run)
 
 
 def run(args):
-    api_client = ApiClient(host=get_api_url())
-    client = DefaultApi(api_client)
+    reserve_connections(max(args.jobs, 1))
+    client = DefaultApi(get_api_client())
 
-    if args.ids:
-        if any(not is_experiment_id(experiment_id) for experiment_id in args.ids):
-            handle_error("Can only kill experiments!")
-        for experiment_id in args.ids:
-            kill_experiment(client, experiment_id, args.force)
-    else:
+    experiment_ids = expand_ids(args.ids)
+    if args.project or args.state:
+        experiment_ids += select_experiments(client, args.project, args.state)
+        if not experiment_ids:
+            handle_error('No experiments to kill!')
+    elif not experiment_ids:
         experiments = call_api(lambda: client.get_experiments())
 
         if not experiments:
@@ -30,13 +50,78 @@ def run(args):
         if experiments[0].state in ('FINISHED', 'FAILED', 'KILLED'):
             handle_error('No experiments to kill!')
 
-        kill_experiment(client, experiments[0].id, args.force)
-        
+        experiment_ids = [experiments[0].id]
+
+    experiment_ids = unique(experiment_ids)
+    if len(experiment_ids) == 1:
+        kill_experiment(client, experiment_ids[0], args.force)
+    else:
+        kill_experiments(client, experiment_ids, args.force, args.jobs, args.retries)
+
+
+def expand_ids(ids):
+    experiment_ids = []
+    for experiment_id in ids:
+        match = EXPERIMENT_RANGE_REGEX.match(experiment_id)
+        if match:
+            prefix, first, last = match.group(1), int(match.group(2)), int(match.group(3))
+            if first > last:
+                handle_error("Invalid range: {}".format(experiment_id))
+            experiment_ids += ['{}{}'.format(prefix, i) for i in range(first, last + 1)]
+        elif is_experiment_id(experiment_id):
+            experiment_ids.append(experiment_id)
+        else:
+            handle_error("Can only kill experiments!")
+    return experiment_ids
+
 
 def kill_experiment(client, experiment_id, force):
     experiment = call_api(lambda: client.kill_experiment(experiment_id, force=force),
                           not_found=lambda: handle_error("Could not find experiment!"))
+    print_killed(experiment)
+
+
+def print_killed(experiment):
     if experiment.children:
         print("killed series {}".format(experiment.short_id))
     else:
-        print("killed experiment {}".format(experiment.short_id))
\ No newline at end of file
+        print("killed experiment {}".format(experiment.short_id))
+
+
+class KillError(Exception):
+    pass
+
+
+def try_kill_experiment(client, experiment_id, force, retries, backoff=0.2):
+    # runs in a worker thread: report errors instead of exiting like call_api
+    for attempt in range(retries + 1):
+        try:
+            return client.kill_experiment(experiment_id, force=force)
+        except ApiException as e:
+            if e.status == 404:
+                raise KillError("could not find experiment")
+            if e.status not in RETRY_STATUSES or attempt == retries:
+                raise KillError(get_http_error_message(e.body) or e.reason)
+        except HTTPError as e:
+            if attempt == retries:
+                raise KillError("could not connect to API ({})".format(e.__class__.__name__))
+        time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def kill_experiments(client, experiment_ids, force, jobs, retries):
+    started_at = time.time()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(experiment_ids)))) as executor:
+        futures = {executor.submit(try_kill_experiment, client, experiment_id, force, retries): experiment_id
+                   for experiment_id in experiment_ids}
+        for future in as_completed(futures):
+            try:
+                print_killed(future.result())
+            except KillError as e:
+                failed += 1
+                print("could not kill {}: {}".format(futures[future], e))
+
+    print("killed {} of {} experiments in {:.1f}s".format(
+        len(experiment_ids) - failed, len(experiment_ids), time.time() - started_at))
+    if failed:
+        sys.exit(1)
@@ -1,29 +1,80 @@
-from riseml.client import DefaultApi, ApiClient
+import re
+from concurrent.futures import ThreadPoolExecutor
 
-from riseml.util import call_api, is_job_id, is_experiment_id
+from riseml.api import get_api_client, reserve_connections
+from riseml.client import DefaultApi
+
+from riseml.util import call_api, is_job_id, is_experiment_id, parse_since, select_experiments, unique, \
+    JobState, ACTIVE_STATES
 from riseml.errors import handle_error
-from riseml.stream import stream_experiment_log, stream_job_log
+from riseml.stream import stream_experiment_log, stream_experiment_logs, stream_job_log, LogFilter, \
+    OVERFLOW_POLICIES, PROGRESS_MODES, OUTPUT_FORMATS
+
+STATES = ACTIVE_STATES + (JobState.finished, JobState.failed, JobState.killed)
 
 
 def add_logs_parser(subparsers):
     parser = subparsers.add_parser('logs', help="show logs")
-    parser.add_argument('id', help="experiment or job identifier (optional)", nargs='?')
+    parser.add_argument('ids', help="experiment or job identifiers (optional)", nargs='*')
+    parser.add_argument('-p', '--project', help="show logs of all on-going experiments of a project")
+    parser.add_argument('--in-state', help="show logs of all experiments in this state (can be repeated)",
+                        action='append', type=str.upper, choices=STATES)
+    parser.add_argument('--tail', type=int, metavar='N', help="only show the last N lines")
+    parser.add_argument('--since', metavar='TIME',
+                        help="only show lines since a time (e.g. 10m, 2h, 1d or 2017-01-31T12:00:00Z)")
+    parser.add_argument('--grep', action='append', metavar='PATTERN',
+                        help="only show lines matching a regular expression (repeatable)")
+    parser.add_argument('--exclude', action='append', metavar='PATTERN',
+                        help="hide lines matching a regular expression (repeatable)")
+    parser.add_argument('--job', action='append', metavar='NAME',
+                        help="only show logs of a job, e.g. train or 1.worker.0 (repeatable)")
+    parser.add_argument('--states', action='store_true', help="only show state changes")
+    parser.add_argument('-o', '--output', choices=OUTPUT_FORMATS, default='text',
+                        help="print messages as text (default) or as one JSON object per line")
+    parser.add_argument('--overflow', choices=OVERFLOW_POLICIES, default='coalesce',
+                        help="when output can't keep up: wait, drop the oldest messages "
+                             "or coalesce progress bar updates (default)")
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='auto',
+                        help="print every progress bar update, or only the last one of each line "
+                             "and one every few seconds (default if the output is not a terminal)")
     parser.set_defaults(run=run)
 
 
 def run(args):
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
+    since = None
+    if args.since:
+        try:
+            since = parse_since(args.since)
+        except ValueError as e:
+            handle_error(str(e))
+    try:
+        log_filter = LogFilter(grep=args.grep, exclude=args.exclude,
+                               jobs=args.job, states_only=args.states)
+    except re.error as e:
+        handle_error("Invalid pattern: %s" % e)
+    options = dict(tail=args.tail, since=since, log_filter=log_filter,
+                   overflow=args.overflow, progress=args.progress, output_format=args.output)
+
+    if args.project or args.in_state:
+        experiment_ids = unique(args.ids + select_experiments(client, args.project, args.in_state))
+        if not experiment_ids:
+            handle_error('No experiment logs to show!')
+        show_experiment_logs(client, experiment_ids, options)
+
+    elif len(args.ids) > 1:
+        show_experiment_logs(client, unique(args.ids), options)
 
-    if args.id:
-        if is_experiment_id(args.id):
-            experiment = call_api(lambda: client.get_experiment(args.id),
+    elif args.ids:
+        id = args.ids[0]
+        if is_experiment_id(id):
+            experiment = call_api(lambda: client.get_experiment(id),
                                   not_found=lambda: handle_error("Could not find experiment!"))
-            stream_experiment_log(experiment)
-        elif is_job_id(args.id):
-            job = call_api(lambda: client.get_job(args.id),
+            stream_experiment_log(experiment, **options)
+        elif is_job_id(id):
+            job = call_api(lambda: client.get_job(id),
                            not_found=lambda: handle_error("Could not find job!"))
-            stream_job_log(job)
+            stream_job_log(job, **options)
         else:
             handle_error("Can only show logs for jobs or experiments!")
 
@@ -32,4 +83,19 @@ def run(args):
         if not experiments:
             handle_error('No experiment logs to show!')
         experiment = call_api(lambda: client.get_experiment(experiments[0].short_id))
-        stream_experiment_log(experiment)
+        stream_experiment_log(experiment, **options)
+
+
+def show_experiment_logs(client, experiment_ids, options, jobs=16):
+    for experiment_id in experiment_ids:
+        if not is_experiment_id(experiment_id):
+            handle_error("Can only show logs of several experiments!")
+
+    def get_experiment(experiment_id):
+        return call_api(lambda: client.get_experiment(experiment_id),
+                        not_found=lambda: handle_error("Could not find experiment %s!" % experiment_id))
+
+    reserve_connections(min(jobs, len(experiment_ids)))
+    with ThreadPoolExecutor(max_workers=min(jobs, len(experiment_ids))) as executor:
+        experiments = list(executor.map(get_experiment, experiment_ids))
+    stream_experiment_logs(experiments, **options)
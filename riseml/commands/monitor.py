@@ -1,32 +1,73 @@
-from riseml.client import DefaultApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import DefaultApi
 from riseml.client.rest import ApiException
 
 from riseml.util import call_api, is_job_id, is_experiment_id
 from riseml.errors import handle_error, handle_http_error
-from riseml.monitor import monitor_job, monitor_experiment
+from riseml.monitor import monitor_job, monitor_experiment, replay_recording, \
+    job_monitor_url, experiment_monitor_url, get_experiment_jobs, stream_all_stats, \
+    stats_lock, stats_changed
+from riseml.recording import Recording
+from riseml.exporter import parse_address
+from riseml.cluster import ClusterStats, StreamMonitor, monitor_cluster, start_cluster_monitor, serve_stats
+from riseml.utilization import IdleDetector, show_idle_report, IDLE_THRESHOLD, IDLE_MINUTES
+
+
+def parse_speed(value):
+    return float(value[:-1] if value.endswith('x') else value)
 
 
 def add_monitor_parser(subparsers):
     parser = subparsers.add_parser('monitor', help="show monitor")
     parser.add_argument('id', help="experiment or job identifier (optional)", nargs='?')
     parser.add_argument('-g', '--gpu', help="detailed gpu stats", action="store_const", const=True)
+    # only one of them is run
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument('--record', metavar='FILE', help="record the stats to a file instead of showing them")
+    modes.add_argument('--replay', metavar='FILE', help="show recorded stats")
+    parser.add_argument('--speed', type=parse_speed, default=1, help="replay speed, e.g. 10x")
+    parser.add_argument('--export', metavar='FILE', help="export recorded stats (with --replay) to .csv or .npz")
+    modes.add_argument('--serve', metavar='[HOST]:PORT', type=parse_address,
+                       help="serve stats to Prometheus (of all running experiments if no id is given)")
+    modes.add_argument('--cluster', action='store_true',
+                       help="show the stats of all running experiments by node, user and project")
+    modes.add_argument('--idle-report', action='store_true',
+                       help="flag jobs that barely use their GPUs (of all running experiments if no id is given)")
+    parser.add_argument('--idle-threshold', type=float, default=IDLE_THRESHOLD, metavar='PERCENT',
+                        help="GPU utilization below which jobs are idle (default: %(default)s)")
+    parser.add_argument('--idle-minutes', type=float, default=IDLE_MINUTES, metavar='MINUTES',
+                        help="minutes below the threshold after which jobs are flagged (default: %(default)s)")
     parser.set_defaults(run=run)
 
 
 def run(args):
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    if args.replay:
+        replay(args)
+        return
+    if args.export:
+        handle_error("--export requires --replay")
+
+    client = DefaultApi(get_api_client())
+    if args.serve:
+        serve(client, args)
+        return
+    if args.cluster:
+        monitor_cluster(client)
+        return
+    if args.idle_report:
+        idle_report(client, args)
+        return
 
     if args.id:
         if is_experiment_id(args.id):
             experiment = call_api(lambda: client.get_experiment(args.id),
                                   not_found=lambda: handle_error("Could not find experiment %s" % args.id))
             monitor_experiment(experiment, detailed=args.gpu, 
-                               stream_meta={"experiment_id": experiment.short_id})
+                               stream_meta={"experiment_id": experiment.short_id}, record=args.record)
         elif is_job_id(args.id):
             job = call_api(lambda: client.get_job(args.id),
                            not_found=lambda: handle_error("Could not find job!"))
-            monitor_job(job, detailed=args.gpu)
+            monitor_job(job, detailed=args.gpu, record=args.record)
         else:
             handle_error("Id is neither an experiment id nor a job id!")
 
@@ -35,4 +76,63 @@ def run(args):
         if not experiments:
             handle_error('No experiments to monitor!')
         experiment = call_api(lambda: client.get_experiment(experiments[0].short_id))
-        monitor_experiment(experiment, detailed=args.gpu)
+        monitor_experiment(experiment, detailed=args.gpu, record=args.record)
+
+
+def replay(args):
+    try:
+        recording = Recording(args.replay)
+    except (IOError, ValueError) as e:
+        handle_error(str(e))
+    if not args.export:
+        replay_recording(recording, speed=args.speed, detailed=args.gpu)
+    elif args.export.endswith('.npz'):
+        try:
+            import numpy
+        except ImportError:
+            handle_error("Exporting to .npz requires NumPy (pip install 'riseml[numpy]')")
+        numpy.savez_compressed(args.export, **recording.to_numpy())
+    else:
+        with open(args.export, 'w', newline='') as f:
+            recording.write_csv(f)
+
+
+def get_streams(client, id):
+    """Returns the monitor stream of an experiment or job as (url, project, jobs)."""
+    if is_experiment_id(id):
+        experiment = call_api(lambda: client.get_experiment(id),
+                              not_found=lambda: handle_error("Could not find experiment %s" % id))
+        return experiment_monitor_url(experiment), experiment.project, get_experiment_jobs(experiment)
+    elif is_job_id(id):
+        job = call_api(lambda: client.get_job(id),
+                       not_found=lambda: handle_error("Could not find job!"))
+        return job_monitor_url(job), job.project, [job]
+    else:
+        handle_error("Id is neither an experiment id nor a job id!")
+
+
+def serve(client, args):
+    if args.id:
+        url, project, jobs = get_streams(client, args.id)
+        cluster_stats = ClusterStats()
+        cluster_stats.add_jobs(args.id, jobs, project.name)
+        stream_monitor = StreamMonitor(cluster_stats, {args.id: url})
+        stream_monitor.start()
+        # rather than serving no stats at all once it is over
+        serve_stats(args.serve, cluster_stats, until=stream_monitor.closed)
+        if stream_monitor.closed.is_set():
+            print('Monitor stream of %s closed' % args.id)
+    else:
+        # experiments started later are discovered
+        serve_stats(args.serve, start_cluster_monitor(client))
+
+
+def idle_report(client, args):
+    if args.id:
+        jobs_stats = stream_all_stats([get_streams(client, args.id)])
+        get_jobs_stats = lambda: jobs_stats
+    else:
+        cluster_stats = start_cluster_monitor(client)
+        get_jobs_stats = lambda: list(cluster_stats.jobs_stats.values())
+    show_idle_report(get_jobs_stats, IdleDetector(args.idle_threshold, args.idle_minutes),
+                     stats_lock, stats_changed)
@@ -4,7 +4,8 @@ from __future__ import print_function
 
 import json
 
-from riseml.client import DefaultApi, ApiClient
+from riseml.api import get_api_client, iter_items, prefetch
+from riseml.client import DefaultApi
 from riseml import util
 from riseml.errors import handle_error
 
@@ -20,8 +21,7 @@ def add_status_parser(subparsers):
 
 
 def run(args):
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
 
     if args.id and util.is_experiment_id(args.id):
         experiment = util.call_api(
@@ -44,7 +44,7 @@ def run(args):
             query_args['states'] = 'CREATED|PENDING|STARTING|BUILDING|RUNNING'
         else:
             query_args['count'] = args.num_last
-        experiments = util.call_api(lambda: client.get_experiments(**query_args))
+        experiments = prefetch(util.call_api(lambda: iter_items(client.get_experiments, **query_args)))
         show_experiments(experiments, all=args.all, collapsed=not args.long)
     elif not args.id:
         query_args = {'all_users': args.all_users}
@@ -52,7 +52,7 @@ def run(args):
             query_args['states'] = 'CREATED|PENDING|STARTING|BUILDING|RUNNING'
         else:
             query_args['count'] = args.num_last
-        experiments = util.call_api(lambda: client.get_experiments(**query_args))
+        experiments = prefetch(util.call_api(lambda: iter_items(client.get_experiments, **query_args)))
         show_experiments(experiments, all=args.all, collapsed=not args.long, users=args.all_users)
     else:
         handle_error("Id does not identify any RiseML entity!")
@@ -212,8 +212,8 @@ def show_experiment_group(group):
 
 def show_experiments(experiments, all=False, collapsed=True, users=False):
     headers, widths = _get_status_headers(collapsed, users)
-    rows = _get_experiment_rows(experiments, all, collapsed, users)
-    util.print_table(
+    rows = _iter_experiment_rows(experiments, all, collapsed, users)
+    util.print_table_stream(
         header=headers,
         min_widths=widths,
         rows=rows
@@ -232,7 +232,10 @@ def _get_status_headers(collapsed=False, users=False):
 
 
 def _get_experiment_rows(experiments, all=False, collapsed=True, users=False):
-    rows = []
+    return list(_iter_experiment_rows(experiments, all, collapsed, users))
+
+
+def _iter_experiment_rows(experiments, all=False, collapsed=True, users=False):
     for experiment in experiments:
         if not all and experiment.state in ['FINISHED', 'KILLED', 'FAILED']:
             continue
@@ -250,9 +253,8 @@ def _get_experiment_rows(experiments, all=False, collapsed=True, users=False):
         if not collapsed:
             values += ['', result(experiment)]
 
-        rows.append(values)
+        yield values
 
         if not collapsed and experiment.children:
-            rows += get_experiments_rows(experiment, with_user=users)
-
-    return rows
+            for row in get_experiments_rows(experiment, with_user=users):
+                yield row
@@ -1,5 +1,6 @@
 from collections import Counter
-from riseml.client import AdminApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import AdminApi
 from riseml.consts import VERSION
 from riseml.util import bytes_to_gib, print_table, TableRowDelimiter, call_api, format_float
 
@@ -135,8 +136,7 @@ def display_clusterinfos(clusterinfos):
 
 
 def run(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     nodes = call_api(lambda: client.get_nodes())
     if args.long:
         display_long(nodes)
@@ -6,9 +6,10 @@ import random
 import shutil
 
 from riseml.configs import load_config
-from riseml.client import AdminApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import AdminApi
 from riseml.util import bytes_to_gib, print_table, TableRowDelimiter, call_api
-from riseml.client import DefaultApi, ApiClient
+from riseml.client import DefaultApi
 from riseml.user import get_user
 from riseml.project import push_project
 
@@ -95,8 +96,7 @@ def add_system_test_parser(subparsers):
 
 
 def run(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     user = get_user()
     
     for i in range(args.num_jobs):
@@ -113,8 +113,7 @@ def start_job(user, nodename, job_config, stress_script):
     config_path = prepare_project_dir(job_config, stress_script)
     config = load_config(config_path)
     revision = push_project(user, PROJECT_NAME, config_path)
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
     node_selector = ''
     if nodename:
         node_selector = 'kubernetes.io/hostname: %s' % nodename
@@ -1,6 +1,7 @@
 import json
 
-from riseml.client import DefaultApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import DefaultApi
 
 from riseml import util
 from riseml.configs import load_config
@@ -24,8 +25,7 @@ def run_train(args):
 
     user = get_user()
     revision = push_project(user, project_name, args.config_file)
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
 
     experiment = call_api(lambda: client.create_experiment(
         project_name, revision,
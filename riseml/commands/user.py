@@ -6,6 +6,7 @@ import time
 from urllib3.exceptions import HTTPError
 
 from riseml.errors import handle_error
+from riseml.api import get_api_client
 from riseml.client import AdminApi, ApiClient
 from riseml.client.rest import ApiException
 from riseml.client_config import get_api_url, get_api_key, write_config, get_api_server, get_sync_url
@@ -217,8 +218,7 @@ def get_cluster_id(cluster_infos):
 
 
 def run_create(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     validate_username(args.username)
     validate_email(args.email)
     user = call_api(lambda: client.create_user(username=args.username, email=args.email))[0]
@@ -228,8 +228,7 @@ def run_create(args):
 
 
 def run_update(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     validate_username(args.username)
     validate_email(args.email)
     user = call_api(lambda: client.update_user(username=args.username, email=args.email))
@@ -238,8 +237,7 @@ def run_update(args):
 
 
 def run_list(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     users = call_api(lambda: client.get_users())
     rows = []
     for u in users:
@@ -254,8 +252,7 @@ def run_list(args):
 
 
 def run_display(args):
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     users = call_api(lambda: client.get_users(username=args.username))
     if not users:
         print('User %s not found.' % args.username)
@@ -277,8 +274,7 @@ def run_disable(args):
         user_exit()
     if choice.strip() != 'y':
         user_exit()
-    api_client = ApiClient()
-    client = AdminApi(api_client)
+    client = AdminApi(get_api_client())
     call_api(lambda: client.delete_user(username=args.username))
     print('User %s disabled.' % args.username)
 
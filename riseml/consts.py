@@ -1,8 +1,9 @@
 import os
 import sys
-from riseml.client.configuration import Configuration
 
 
 DEFAULT_CONFIG_NAME = 'riseml.yml'
 IS_BUNDLE = getattr(sys, 'frozen', False)
-VERSION = Configuration().packageVersion
\ No newline at end of file
+# must match packageVersion in swagger-codegen.json; kept as a literal so
+# that `riseml --version` doesn't need to import the API client
+VERSION = '1.0.2'
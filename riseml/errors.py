@@ -11,11 +11,15 @@ def handle_error(message, status_code=None, exit_code=1):
     sys.exit(exit_code)
 
 
-def handle_http_error(text, status_code):
+def get_http_error_message(text):
     try:
-        msg = json.loads(text)['message']
-    except (ValueError, KeyError):
-        msg = text
+        return json.loads(text)['message']
+    except (ValueError, KeyError, TypeError):
+        return text
+
+
+def handle_http_error(text, status_code):
+    msg = get_http_error_message(text)
     if 'feature_not_available' in msg:
         handle_feature_unavailable()
     else:
@@ -0,0 +1,152 @@
+"""
+Prometheus exporter for monitor streams.
+
+The metrics text is rebuilt from JobStats and GPUStats in a background
+thread when stats change, at most once per interval, and replaced by a
+single assignment. Scrapes only write out the current text, so they
+take no locks and cost no formatting. Jobs may come and go between
+renders; series of jobs that are gone are no longer exported.
+"""
+from __future__ import print_function
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# (metric, stat, help)
+JOB_METRICS = (
+    ('riseml_job_cpu_percent', 'cpu_percent', 'CPU utilization of the job, 100 per core.'),
+    ('riseml_job_memory_used_bytes', 'memory_used', 'Memory used by the job.'),
+    ('riseml_job_memory_limit_bytes', 'memory_limit', 'Memory limit of the job.'),
+)
+GPU_METRICS = (
+    ('riseml_gpu_utilization_percent', 'gpu_utilization', 'Utilization of the GPU.'),
+    ('riseml_gpu_memory_used_bytes', 'memory_used', 'GPU memory used.'),
+    ('riseml_gpu_memory_total_bytes', 'memory_total', 'GPU memory.'),
+    ('riseml_gpu_power_draw_watts', 'power_draw', 'Power draw of the GPU.'),
+    ('riseml_gpu_temperature_celsius', 'temperature', 'Temperature of the GPU.'),
+)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return ','.join('%s="%s"' % (name, escape_label(value)) for name, value in labels)
+
+
+def header(metric, help):
+    return ['# HELP %s %s' % (metric, help), '# TYPE %s gauge' % metric]
+
+
+class MetricsExporter(object):
+
+    def __init__(self, get_jobs_stats, lock, changed, interval=1):
+        """
+        `get_jobs_stats` returns the (JobStats, project name) of the jobs
+        to export; `lock` guards them, they are updated when `changed` is set.
+        """
+        self.get_jobs_stats = get_jobs_stats
+        self.lock = lock
+        self.changed = changed
+        self.interval = interval
+        # dict from job id -> labels, of the jobs last rendered
+        self._labels = {}
+        with lock:
+            self.text = self.render()
+
+    def _update_labels(self, jobs_stats):
+        labels = {}
+        for job_stats, project in jobs_stats:
+            job = job_stats.job
+            labels[job.id] = self._labels.get(job.id) or format_labels([('job', job.short_id),
+                                                                        ('project', project)])
+        self._labels = labels
+
+    def render(self):
+        jobs_stats = list(self.get_jobs_stats())
+        self._update_labels(jobs_stats)
+        lines = []
+        for metric, stat, help in JOB_METRICS:
+            lines += header(metric, help)
+            for job_stats, _ in jobs_stats:
+                value = job_stats.stats.get(stat)
+                if value is not None:
+                    lines.append('%s{%s} %r' % (metric, self._labels[job_stats.job.id], float(value)))
+        lines += header('riseml_job_state', 'State of the job.')
+        for job_stats, _ in jobs_stats:
+            lines.append('riseml_job_state{%s,state="%s"} 1' % (self._labels[job_stats.job.id],
+                                                                 escape_label(job_stats.job.state)))
+        for metric, stat, help in GPU_METRICS:
+            lines += header(metric, help)
+            for job_stats, _ in jobs_stats:
+                for device in job_stats.gpus:
+                    gpu_stats = job_stats.gpu_stats[device]
+                    value = gpu_stats.stats.get(stat)
+                    if value is not None:
+                        labels = format_labels([('gpu', gpu_stats.stats.get('device_bus_id', device)),
+                                                ('name', gpu_stats.stats.get('name', ''))])
+                        lines.append('%s{%s,%s} %r' % (metric, self._labels[job_stats.job.id],
+                                                       labels, float(value)))
+        return ('\n'.join(lines) + '\n').encode('utf8')
+
+    def _update(self):
+        while True:
+            self.changed.wait()
+            self.changed.clear()
+            with self.lock:
+                text = self.render()
+            self.text = text
+            time.sleep(self.interval)
+
+    def start(self):
+        thread = threading.Thread(target=self._update, daemon=True)
+        thread.start()
+
+
+class MetricsServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def parse_address(address):
+    """Returns the (host, port) of e.g. ':9100' or '127.0.0.1:9100'."""
+    host, _, port = address.rpartition(':')
+    return host, int(port)
+
+
+def metrics_handler(exporter):
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            text = exporter.text
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(text)))
+            self.end_headers()
+            self.wfile.write(text)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def serve_metrics(exporter, address, until=None):
+    """Serves the metrics of `exporter` until the event `until` is set."""
+    server = MetricsServer(address, metrics_handler(exporter))
+    if until is not None:
+        def shutdown():
+            until.wait()
+            server.shutdown()
+        threading.Thread(target=shutdown, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -1,4 +1,5 @@
-from riseml.client import DefaultApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import DefaultApi
 from riseml.client.rest import ApiException
 
 from riseml.errors import handle_http_error
@@ -6,8 +7,7 @@ from riseml.stream import stream_job_log
 
 
 def run_job(project_name, revision, kind, config):
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
 
     try:
         jobs = client.create_job(project_name, revision,
@@ -0,0 +1,313 @@
+"""
+Local cache of streamed log messages.
+
+Messages of a log stream are appended to gzip-compressed segments in
+~/.riseml/logs/<kind>/<id>. Every flush appends a gzip member to the last
+segment, in a background thread; a new segment is started once a segment
+holds SEGMENT_SIZE messages. index.json records the segments with the
+number, size and time range of their messages, so that a member partly
+appended before a crash is ignored and overwritten, the last time and number of messages at that time per job (to
+continue a stream without duplicates), and whether the stream was
+complete, i.e. closed by the server.
+
+Only one process writes a stream's cache at a time, others stream without
+it. Caches not used for MAX_AGE seconds are evicted, and the least recently
+used ones once all caches together exceed MAX_SIZE bytes.
+"""
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from riseml.client_config import get_config_file
+
+LOG_CACHE_DIR = 'logs'
+INDEX_FILE = 'index.json'
+SEGMENT_SIZE = 10000
+FLUSH_SIZE = 1000
+FLUSH_DELAY = 2
+LOCK_FILE = '.lock'
+MAX_SIZE = 512 * 1024 * 1024
+MAX_AGE = 30 * 24 * 60 * 60
+# eviction runs at most this often, recorded by the mtime of EVICTED_FILE
+EVICT_INTERVAL = 60 * 60
+EVICTED_FILE = '.evicted'
+
+
+def get_log_cache_root():
+    return os.path.join(os.path.dirname(get_config_file()), LOG_CACHE_DIR)
+
+
+def get_log_cache_dir(kind, id):
+    return os.path.join(get_log_cache_root(), kind, id)
+
+
+def lock(path):
+    """Returns an exclusive lock on a cache directory, or None if it is locked."""
+    try:
+        lock_file = open(os.path.join(path, LOCK_FILE), 'a')
+    except (IOError, OSError):
+        return None
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            lock_file.close()
+            return None
+    return lock_file
+
+
+def get_cache_usage(path):
+    """Returns the size of a cache directory and when it was last used."""
+    size = 0
+    used = os.stat(path).st_mtime
+    for entry in os.scandir(path):
+        stat = entry.stat()
+        size += stat.st_size
+        used = max(used, stat.st_mtime)
+    return size, used
+
+
+def evict(root=None, max_size=MAX_SIZE, max_age=MAX_AGE, now=None):
+    """Removes caches older than `max_age`, then the oldest above `max_size`."""
+    root = root or get_log_cache_root()
+    now = now or time.time()
+    caches = []
+    for kind in os.listdir(root):
+        kind_path = os.path.join(root, kind)
+        if not os.path.isdir(kind_path):
+            continue
+        for id in os.listdir(kind_path):
+            path = os.path.join(kind_path, id)
+            try:
+                caches.append((get_cache_usage(path), path))
+            except OSError:
+                pass
+    total = sum(size for (size, _), _ in caches)
+    for (size, used), path in sorted(caches, key=lambda cache: cache[0][1]):
+        if used > now - max_age and total <= max_size:
+            break
+        cache_lock = lock(path)
+        if cache_lock is None:
+            # in use
+            continue
+        with cache_lock:
+            shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def evict_periodically(root=None):
+    root = root or get_log_cache_root()
+    stamp = os.path.join(root, EVICTED_FILE)
+    try:
+        if time.time() - os.path.getmtime(stamp) < EVICT_INTERVAL:
+            return
+    except OSError:
+        pass
+    try:
+        with open(stamp, 'a'):
+            os.utime(stamp, None)
+        evict(root)
+    except OSError:
+        pass
+
+
+class LogCache(object):
+
+    def __init__(self, path, lock=None):
+        self.path = path
+        self._lock = lock
+        self.index = self._read_index()
+        # messages are appended by the receiving thread and written by a
+        # flusher thread, so that receiving doesn't wait for the disk
+        self._pending = []
+        self._pending_lock = threading.Condition()
+        self._write_lock = threading.RLock()
+        self._flusher = None
+        self._closed = False
+
+    @classmethod
+    def open(cls, kind, id):
+        """
+        Returns the cache of a stream, or None if it can't be written, e.g.
+        while another process writes it.
+        """
+        path = get_log_cache_dir(kind, id)
+        try:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            evict_periodically()
+        except OSError:
+            return None
+        cache_lock = lock(path)
+        if cache_lock is None:
+            return None
+        if not os.path.isdir(path):
+            # evicted by another process meanwhile
+            cache_lock.close()
+            return None
+        # the lock file records when the cache was used last
+        os.utime(cache_lock.name, None)
+        return cls(path, cache_lock)
+
+    @property
+    def complete(self):
+        return self.index['complete']
+
+    @property
+    def last_seen(self):
+        return {job_id: tuple(last) for job_id, last in self.index['jobs'].items()}
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.path, INDEX_FILE)) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {'segments': [], 'jobs': {}, 'complete': False}
+
+    def _write_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.index')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.index, f)
+            # a crash leaves the old or the new index, not an empty one
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+
+    def append(self, msg):
+        with self._pending_lock:
+            self._pending.append(msg)
+            if self._flusher is None and not self._closed:
+                self._flusher = threading.Thread(target=self._flush_when_due, daemon=True)
+                self._flusher.start()
+            elif len(self._pending) >= FLUSH_SIZE:
+                self._pending_lock.notify()
+
+    def _flush_when_due(self):
+        while True:
+            with self._pending_lock:
+                if self._closed:
+                    return
+                if len(self._pending) < FLUSH_SIZE:
+                    self._pending_lock.wait(FLUSH_DELAY)
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if pending:
+                self._write(pending)
+
+    def _write(self, pending):
+        segments = self.index['segments']
+        jobs = self.index['jobs']
+        while pending:
+            if not segments or segments[-1]['count'] >= SEGMENT_SIZE or 'size' not in segments[-1]:
+                segments.append({'name': '%06d.jsonl.gz' % len(segments), 'count': 0, 'size': 0,
+                                 'first_time': None, 'last_time': None})
+            segment = segments[-1]
+            batch = pending[:SEGMENT_SIZE - segment['count']]
+            del pending[:len(batch)]
+            data = gzip.compress(''.join(json.dumps(msg) + '\n' for msg in batch).encode('utf8'))
+            with open(os.path.join(self.path, segment['name']), 'ab') as f:
+                # drop what a crash left after the indexed members
+                f.truncate(segment['size'])
+                f.write(data)
+            segment['size'] += len(data)
+            times = [msg['time'] for msg in batch if 'time' in msg]
+            if segment['first_time'] is not None:
+                times += [segment['first_time'], segment['last_time']]
+            if times:
+                segment['first_time'], segment['last_time'] = min(times), max(times)
+            segment['count'] += len(batch)
+            for msg in batch:
+                if 'job_id' in msg and 'time' in msg:
+                    last_time, count = jobs.get(msg['job_id'], (None, 0))
+                    jobs[msg['job_id']] = (msg['time'], count + 1 if msg['time'] == last_time else 1)
+        self._write_index()
+
+    def close(self, complete=False):
+        with self._pending_lock:
+            self._closed = True
+            self._pending_lock.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._write_lock:
+            self.index['complete'] = complete
+            self.flush()
+            self._write_index()
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def clear(self):
+        with self._write_lock:
+            with self._pending_lock:
+                self._pending = []
+            self.index = {'segments': [], 'jobs': {}, 'complete': False}
+            for name in os.listdir(self.path):
+                if name != LOCK_FILE:
+                    os.remove(os.path.join(self.path, name))
+
+    def _read_segment(self, segment):
+        """
+        Returns the indexed messages of a segment; a crash may have left
+        a partly written member after them.
+        """
+        try:
+            with open(os.path.join(self.path, segment['name']), 'rb') as f:
+                data = f.read(segment['size']) if 'size' in segment else f.read()
+        except (IOError, OSError):
+            return []
+        lines = []
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+                for line in f:
+                    lines.append(line)
+        except (EOFError, OSError, zlib.error):
+            pass
+        lines = [line for line in lines if line.endswith(b'\n')][:segment['count']]
+        return [json.loads(line.decode('utf8')) for line in lines if line.strip()]
+
+    def messages(self, since=None, tail=None):
+        """
+        Yields the cached messages in stream order, only those from `since`
+        on (a unix timestamp) and only the last `tail` log lines (with the
+        state messages between them).
+        """
+        segments = [s for s in self.index['segments']
+                    if since is None or s['last_time'] is None or s['last_time'] >= since]
+        if tail is None:
+            for segment in segments:
+                for msg in self._read_segment(segment):
+                    if since is None or msg.get('time', since) >= since:
+                        yield msg
+            return
+        # read segments from the end until enough lines are found
+        selected = deque()
+        lines = 0
+        for segment in reversed(segments):
+            for msg in reversed(self._read_segment(segment)):
+                if since is not None and msg.get('time', since) < since:
+                    continue
+                if msg.get('type') == 'log':
+                    if lines == tail:
+                        break
+                    lines += 1
+                selected.appendleft(msg)
+            if lines == tail:
+                break
+        for msg in selected:
+            yield msg
+
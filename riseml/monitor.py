@@ -13,16 +13,28 @@ except ImportError:
     from io import StringIO
 import math
 import traceback
-import os
-import subprocess
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
 from collections import OrderedDict
 
 from riseml.errors import handle_error
 from riseml.client_config import get_stream_url
 from riseml.ansi import bold
+from riseml.terminal import Screen, Keyboard
+from riseml.recording import Recorder, Recording
+from riseml.client import Job, Project
 from riseml.util import bytes_to_gib, print_table, JobState, mib_to_gib, get_state_symbol
 
 stats_lock = threading.Lock()
+# set whenever stats were updated, to redraw the screen
+stats_changed = threading.Event()
+stream_closed = threading.Event()
+
+# number of updates kept per metric, about 5 minutes
+HISTORY_SIZE = 300
+SPARKLINE_WIDTH = 10
+SPARKS = u'\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588'
 monitor_stream = None
 
 
@@ -36,14 +48,46 @@ SORTED_STATES = { JobState.running:  0,
                   JobState.created:  3 }
 
 
-def sort_jobs_stats(jobs_stats):
-    def job_key(job_stats):
-        job = job_stats.job
-        try:
-         return (SORTED_STATES[job.state])
-        except KeyError:
-            return 99
-    return sorted(jobs_stats, key=job_key)
+def state_rank(state):
+    return SORTED_STATES.get(state, 99)
+
+
+class JobOrder(object):
+    """
+    Jobs stats ordered by state and then by their original order. A job is
+    only moved between the buckets of states when its state changes.
+    """
+
+    def __init__(self, jobs_stats):
+        self.jobs_stats = list(jobs_stats)
+        self._index = {js.job.id: i for i, js in enumerate(self.jobs_stats)}
+        # dict from state rank -> sorted indices of jobs_stats
+        self._buckets = {}
+        for i, job_stats in enumerate(self.jobs_stats):
+            self._buckets.setdefault(state_rank(job_stats.job.state), []).append(i)
+
+    def __len__(self):
+        return len(self.jobs_stats)
+
+    def update_job_state(self, job_stats, new_state):
+        old_rank, new_rank = state_rank(job_stats.job.state), state_rank(new_state)
+        job_stats.update_job_state(new_state)
+        if old_rank != new_rank:
+            i = self._index[job_stats.job.id]
+            bucket = self._buckets[old_rank]
+            del bucket[bisect_left(bucket, i)]
+            insort(self._buckets.setdefault(new_rank, []), i)
+
+    def iter_from(self, offset):
+        """Yields the jobs stats from position `offset` on."""
+        for rank in sorted(self._buckets):
+            bucket = self._buckets[rank]
+            if offset >= len(bucket):
+                offset -= len(bucket)
+                continue
+            for j in range(offset, len(bucket)):
+                yield self.jobs_stats[bucket[j]]
+            offset = 0
 
 
 def indent(text, spaces=2):
@@ -71,8 +115,62 @@ def formatted_getter(getter):
     return format_output
 
 
+class RingBuffer(object):
+    """Fixed-size history of a metric, overwriting the oldest values."""
+
+    def __init__(self, size=HISTORY_SIZE):
+        self._values = array('d', bytes(8 * size))
+        self._next = 0
+        self.count = 0
+
+    def append(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self.count = min(self.count + 1, len(self._values))
+
+    def values(self, last=None):
+        """Returns the (`last`) values, oldest first."""
+        count = self.count if last is None else min(last, self.count)
+        start = (self._next - count) % len(self._values)
+        if start + count <= len(self._values):
+            return self._values[start:start + count]
+        return self._values[start:] + self._values[:self._next]
+
+    def summary(self):
+        """Returns the min, mean and max of all values."""
+        values = self.values()
+        if values:
+            return min(values), sum(values) / len(values), max(values)
+
+
+def sparkline(values, upper):
+    if not values:
+        return ''
+    upper = max(upper, max(values)) or 1
+    last = len(SPARKS) - 1
+    return ''.join(SPARKS[int(round(value / upper * last))] for value in values)
+
+
+def format_history(history, upper, fmt='%.1f', transform=None):
+    """Returns a sparkline of the last values and their min/mean/max."""
+    if history is None or not history.count:
+        return '-'
+    summary = history.summary()
+    if transform:
+        summary = [transform(v) for v in summary]
+    return '{:>{w}} {}'.format(sparkline(history.values(SPARKLINE_WIDTH), upper),
+                               '/'.join(fmt % v for v in summary), w=SPARKLINE_WIDTH)
+
+
 class Stats():
 
+    def record(self, metric, value):
+        if value is not None:
+            history = self.history.get(metric)
+            if history is None:
+                history = self.history[metric] = RingBuffer()
+            history.append(value)
+
     def get(self, stat_name, fmt=None, transform=None):
         @formatted_getter
         def get(self):
@@ -88,16 +186,25 @@ class Stats():
 
 class GPUStats(Stats):
 
+    history_metrics = ('gpu_utilization', 'memory_used', 'power_draw', 'temperature')
+
     def __init__(self, device_name):
         self.device_name = device_name
         self.stats = {}
         self.timestamp = 0
+        # dict from metric -> RingBuffer
+        self.history = {}
 
     def update(self, stats, timestamp=None):
         if not timestamp:
             timestamp = stats.pop('timestamp')
         self.timestamp = timestamp
         self.stats.update(stats)
+        if stats.get('gpu_utilization') is not None:
+            # to window the history by time
+            self.record('timestamp', timestamp)
+        for metric in self.history_metrics:
+            self.record(metric, stats.get(metric))
 
 
 class JobStats(Stats):
@@ -110,6 +217,8 @@ class JobStats(Stats):
         self.gpu_stats = {}
         # sorted device names of all gpus
         self.gpus = []
+        # dict from metric -> RingBuffer
+        self.history = {}
 
     def update(self, stats, timestamp=None):
         if not timestamp:
@@ -117,7 +226,14 @@ class JobStats(Stats):
         if 'gpus' in stats:
             gpu_stats = stats.pop('gpus')
             self._update_gpu_stats(gpu_stats, timestamp)
+            gpu_percent = self.get('gpu_percent')
+            if gpu_percent is not None:
+                self.record('gpu_timestamp', timestamp)
+            self.record('gpu_percent', gpu_percent)
+            self.record('gpu_memory_used', self.get('gpu_memory_used'))
         self._update_stats(stats, timestamp)
+        self.record('cpu_percent', stats.get('cpu_percent'))
+        self.record('memory_used', stats.get('memory_used'))
 
     def update_job_state(self, new_state):
         self.job.state = new_state
@@ -209,15 +325,19 @@ def get_summary_infos(project_name, jobs_stats):
                          format_cpu(job_stats),
                          format_mem(job_stats),
                          format_gpu(job_stats),
-                         format_gpu_mem(job_stats)])
+                         format_gpu_mem(job_stats),
+                         format_history(job_stats.history.get('cpu_percent'),
+                                        100 * job.cpus, transform=lambda v: v / 100),
+                         format_history(job_stats.history.get('gpu_percent'),
+                                        100 * job.gpus, transform=lambda v: v / 100)])
         else:
             rows.append([job.short_id, project_name,
                          '%s%s' % (get_state_symbol(job.state), job.state)] + \
-                         ['', '', '', ''])
+                         ['', '', '', '', '', ''])
     print_table(
         header=['ID', 'PROJECT', 'STATE',
-                'CPU', 'MEM', 'GPU', 'GPU MEM'],
-        min_widths=[4, 8, 6, 10, 10, 3, 10],
+                'CPU', 'MEM', 'GPU', 'GPU MEM', 'CPU MIN/AVG/MAX', 'GPU MIN/AVG/MAX'],
+        min_widths=[4, 8, 6, 10, 10, 3, 10, 15, 15],
         rows=rows,
         file=output,
         column_spaces=2
@@ -282,16 +402,19 @@ def get_gpu_table(job_stats):
                format_gpu_mem(gpu_stats),
                format_gpu_pwr(gpu_stats),
                gpu_stats.get('temperature', '%dC'),
-               gpu_stats.get('device_bus_id', '%s')]
+               gpu_stats.get('device_bus_id', '%s'),
+               format_history(gpu_stats.history.get('gpu_utilization'), 100, fmt='%d%%'),
+               format_history(gpu_stats.history.get('memory_used'),
+                              gpu_stats.get('memory_total') or 0, transform=bytes_to_gib)]
         rows.append(row)
     for _ in range(job_stats.job.gpus - len(job_stats.gpus)):
-        row = ['N/A'] + ['' for _ in range(6)]
+        row = ['N/A'] + ['' for _ in range(8)]
         rows.append(row)
     if rows:
         print_table(
             header=['ID', 'NAME', 'UTIL', 'MEM',
-                    'POWER', 'TEMP', 'BUS ID'],
-            min_widths=[3, 8, 4, 6, 3, 3, 3],
+                    'POWER', 'TEMP', 'BUS ID', 'UTIL MIN/AVG/MAX', 'MEM MIN/AVG/MAX'],
+            min_widths=[3, 8, 4, 6, 3, 3, 3, 16, 15],
             rows=rows,
             bold_header=False,
             column_spaces=2,
@@ -329,35 +452,83 @@ def get_detailed_infos(jobs_stats):
 
 class StatsScreen():
 
-    def __init__(self, project, jobs_stats):
-        self.jobs_stats = jobs_stats
+    def __init__(self, project, job_order):
+        self.job_order = job_order
         self.project = project
         self.update_interval = 1
+        # redraws of bursts of updates are combined
+        self.min_update_interval = 0.1
+        # position of the first job shown, and number of jobs on a page
+        self.offset = 0
+        self.page_size = 1
+        self.scrollable = False
+        self.quit = False
+
+    def _on_key(self, key):
+        with stats_lock:
+            last = max(0, len(self.job_order) - self.page_size)
+            moves = {'down': 1, 'j': 1, 'up': -1, 'k': -1,
+                     'page_down': self.page_size, ' ': self.page_size,
+                     'page_up': -self.page_size, 'b': -self.page_size}
+            if key in moves:
+                self.offset = self.offset + moves[key]
+            elif key in ('home', 'g'):
+                self.offset = 0
+            elif key in ('end', 'G'):
+                self.offset = last
+            elif key == 'q':
+                self.quit = True
+            else:
+                return
+            self.offset = max(0, min(self.offset, last))
+        stats_changed.set()
+
+    def _visible_summary(self, rows):
+        # header, footer and the line below the output
+        self.page_size = max(1, rows - 3)
+        visible = list(islice(self.job_order.iter_from(self.offset), self.page_size))
+        return get_summary_infos(self.project.name, visible), len(visible)
+
+    def _visible_details(self, rows):
+        output = []
+        lines = 0
+        for job_stats in self.job_order.iter_from(self.offset):
+            info = get_detailed_info(job_stats)
+            lines += info.count('\n') + 2
+            if output and lines > rows - 2:
+                break
+            output.append(info)
+        self.page_size = max(1, len(output))
+        return '\n\n'.join(output), len(output)
+
+    def _footer(self, shown):
+        if shown == len(self.job_order) and not self.scrollable:
+            return ''
+        footer = 'jobs %d-%d of %d' % (self.offset + 1, self.offset + shown, len(self.job_order))
+        if self.scrollable:
+            footer += ' (j/k, space/b to scroll, q to quit)'
+        return '\n' + footer
 
     def _display(self, detailed):
-            while True:
-                with stats_lock:
-                    sorted_stats = sort_jobs_stats(self.jobs_stats)
-                    if detailed:
-                        stats_screen = get_detailed_infos(sorted_stats)
-                    else:
-                        stats_screen = get_summary_infos(self.project.name,
-                                                         sorted_stats)
-
-                os.system('cls' if os.name == 'nt' else 'clear')
-                print(self._fit_terminal(stats_screen.strip()))
-                sys.stdout.flush()
-                time.sleep(self.update_interval)
-
-    def _fit_terminal(self, output):
-        try:
-            rows, columns = subprocess.check_output(['stty', 'size']).split()
-            lines = output.split('\n')
-            output_lines = lines[:int(rows) - 1]
-            output_lines = [l[:int(columns) - 1] for l in output_lines]
-            return '\n'.join(output_lines)
-        except subprocess.CalledProcessError:
-            return output
+            screen = Screen(changed=stats_changed)
+            keyboard = Keyboard(self._on_key)
+            self.scrollable = keyboard.start()
+            try:
+                while not self.quit:
+                    with stats_lock:
+                        if detailed:
+                            stats_screen, shown = self._visible_details(screen.rows)
+                        else:
+                            stats_screen, shown = self._visible_summary(screen.rows)
+                        stats_screen = stats_screen.strip() + self._footer(shown)
+
+                    screen.render(stats_screen)
+                    if stream_closed.is_set():
+                        break
+                    time.sleep(self.min_update_interval)
+                    screen.wait(self.update_interval)
+            finally:
+                keyboard.stop()
 
     def display(self, detailed=False, stream_meta={}):
         try:
@@ -366,7 +537,24 @@ class StatsScreen():
             print_user_exit(stream_meta)
 
 
-def stream_stats(url, job_id_stats, stream_meta={}):
+def apply_message(msg, job_id_stats, job_order):
+    if msg['type'] == 'utilization':
+        stats = msg['data']
+        job_id = stats['job_id']
+        if job_id in job_id_stats:
+            with stats_lock:
+                job_stats = job_id_stats[job_id]
+                job_stats.update(stats)
+            stats_changed.set()
+    elif msg['type'] == 'state':
+        job_id = msg['job_id']
+        if job_id in job_id_stats:
+            with stats_lock:
+                job_order.update_job_state(job_id_stats[job_id], msg['state'])
+            stats_changed.set()
+
+
+def stream_stats(url, job_id_stats, job_order, stream_meta={}, recorder=None):
     global monitor_stream
     stream_connected = False
     job_ids = list(job_id_stats.keys())
@@ -374,19 +562,10 @@ def stream_stats(url, job_id_stats, stream_meta={}):
     def on_message(ws, message):
         try:
             msg = json.loads(message)
-            if msg['type'] == 'utilization':
-                stats = msg['data']
-                job_id = stats['job_id']
-                if job_id in job_id_stats:
-                    with stats_lock:
-                        job_stats = job_id_stats[job_id]
-                        job_stats.update(stats)
-            elif msg['type'] == 'state':
-                job_id = msg['job_id']
-                if job_id in job_id_stats:
-                    with stats_lock:
-                        job_stats = job_id_stats[job_id]
-                        job_stats.update_job_state(msg['state'])
+            if recorder is not None:
+                # before the stats are consumed by JobStats.update
+                recorder.record(msg)
+            apply_message(msg, job_id_stats, job_order)
         except Exception as e:
             handle_error(traceback.format_exc())
 
@@ -397,9 +576,10 @@ def stream_stats(url, job_id_stats, stream_meta={}):
             # all other Exception based stuff goes to `handle_error`
             handle_error(e)
 
-    def on_close(ws):
-        time.sleep(2)
-        os._exit(0)
+    def on_close(ws, *args):
+        # show the last stats and exit
+        stream_closed.set()
+        stats_changed.set()
 
     def on_open(ws):
         nonlocal stream_connected
@@ -434,22 +614,83 @@ def get_experiment_jobs(experiment, roles=('train', 'dist-tf-master',
    return jobs
 
 
-def monitor_job(job, detailed=False):
-    url = '%s/ws/jobs/%s/monitor' % (get_stream_url(), job.id)
-    monitor_jobs(url, job.project, [job],
-        detailed=detailed, stream_meta={"job_id": job.short_id})
+def job_monitor_url(job):
+    return '%s/ws/jobs/%s/monitor' % (get_stream_url(), job.id)
+
+
+def experiment_monitor_url(experiment):
+    return '%s/ws/experiments/%s/monitor' % (get_stream_url(), experiment.id)
+
+
+def monitor_job(job, detailed=False, record=None):
+    monitor_jobs(job_monitor_url(job), job.project, [job],
+        detailed=detailed, stream_meta={"job_id": job.short_id}, record=record)
 
 
-def monitor_experiment(experiment, detailed=False, stream_meta={}):
-    url = '%s/ws/experiments/%s/monitor' % (get_stream_url(), experiment.id)
+def monitor_experiment(experiment, detailed=False, stream_meta={}, record=None):
     jobs = get_experiment_jobs(experiment)
-    monitor_jobs(url, experiment.project, jobs,
-        detailed=detailed, stream_meta={"experiment_id": experiment.short_id})
+    monitor_jobs(experiment_monitor_url(experiment), experiment.project, jobs,
+        detailed=detailed, stream_meta={"experiment_id": experiment.short_id}, record=record)
 
 
-def monitor_jobs(url, project, jobs, detailed=False, stream_meta={}):
+def stream_all_stats(streams):
+    """Streams the stats of (url, project, jobs) tuples, returns the JobStats of all jobs."""
+    jobs_stats = []
+    for url, project, jobs in streams:
+        stream_jobs_stats = [JobStats(j) for j in jobs]
+        job_id_stats = OrderedDict({js.job.id: js for js in stream_jobs_stats})
+        stream_stats(url, job_id_stats, JobOrder(stream_jobs_stats))
+        jobs_stats += stream_jobs_stats
+    return jobs_stats
+
+
+def monitor_jobs(url, project, jobs, detailed=False, stream_meta={}, record=None):
     jobs_stats = [JobStats(j) for j in jobs]
     job_id_stats = OrderedDict({js.job.id: js for js in jobs_stats})
-    stream_stats(url, job_id_stats, stream_meta)
-    screen = StatsScreen(project, jobs_stats)
+    job_order = JobOrder(jobs_stats)
+    if record:
+        recorder = Recorder(record, project, jobs)
+        stream_stats(url, job_id_stats, job_order, stream_meta, recorder=recorder)
+        record_stream(recorder, stream_meta)
+        return
+    stream_stats(url, job_id_stats, job_order, stream_meta)
+    screen = StatsScreen(project, job_order)
     screen.display(detailed, stream_meta)
+
+
+def record_stream(recorder, stream_meta):
+    print('Recording to %s, press Ctrl-C to stop' % recorder.path)
+    try:
+        while not stream_closed.wait(1):
+            print('\r%d messages' % recorder.count, end='')
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    recorder.close()
+    print('\rRecorded %d messages to %s' % (recorder.count, recorder.path))
+
+
+def replay_recording(recording, speed=1, detailed=False):
+    """Shows a recording on the monitor screen, `speed` times faster."""
+    jobs = [Job(id=job['id'], short_id=job['short_id'], state=job['state'],
+                cpus=job['cpus'], mem=job['mem'], gpus=job['gpus'])
+            for job in recording.jobs]
+    jobs_stats = [JobStats(j) for j in jobs]
+    job_id_stats = OrderedDict({js.job.id: js for js in jobs_stats})
+    job_order = JobOrder(jobs_stats)
+
+    def play():
+        start = None
+        for received, msg in recording.messages():
+            if start is None:
+                start = (received, time.time())
+            delay = start[1] + (received - start[0]) / speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            apply_message(msg, job_id_stats, job_order)
+        stream_closed.set()
+        stats_changed.set()
+
+    player = threading.Thread(target=play, daemon=True)
+    player.start()
+    StatsScreen(Project(name=recording.project), job_order).display(detailed)
@@ -9,7 +9,8 @@ import requests
 from riseml.util import get_rsync_path, get_readable_size
 from riseml.configs import create_config, get_project_name, get_project_root
 from riseml.errors import handle_error, handle_http_error
-from riseml.client import DefaultApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import DefaultApi
 from riseml.client_config import get_git_url, get_sync_url
 from riseml.project_template import project_template
 from riseml.util import bytes_to_mib
@@ -19,10 +20,9 @@ try:
 except ImportError:
     from urlparse import urlparse
 
-try:
-    stdout = sys.stdout.buffer
-except AttributeError:
-    stdout = sys.stdout
+def get_binary_stdout():
+    # looked up when called, commands run by the agent replace sys.stdout
+    return getattr(sys.stdout, 'buffer', sys.stdout)
 
 
 def create_project(config_file):
@@ -30,8 +30,7 @@ def create_project(config_file):
     create_config(config_file, project_template)
 
     name = get_project_name(config_file)
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
     project = client.create_project(name)[0]
     print("project created: %s (%s)" % (project.name, project.id))
 
@@ -93,6 +92,7 @@ def sync_project(project_root, sync_path):
                             cwd=project_root,
                             stdout=subprocess.PIPE,
                             stderr=subprocess.STDOUT)
+    stdout = get_binary_stdout()
     for buf in proc.stdout:
         stdout.write(buf)
         stdout.flush()
@@ -160,8 +160,7 @@ def get_project_size(sync_cmd, project_root):
 
 
 def get_project(name):
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
     for project in client.get_repositories():
         if project.name == name:
             return project
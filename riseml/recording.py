@@ -0,0 +1,236 @@
+"""
+Recordings of monitor streams.
+
+A recording starts with MAGIC, followed by blocks of a kind byte, the
+length of the zlib-compressed payload and the payload:
+
+- b'M' (metadata, JSON): the project, the jobs and GPUs seen since the
+  previous metadata block and state changes
+- b'S' (samples): the number of rows and one little-endian array per
+  column of SAMPLE_COLUMNS, one row per job or GPU utilization sample
+
+Samples refer to jobs and GPUs by their position in the job and GPU
+tables of the metadata blocks. Blocks are written every FLUSH_SIZE rows
+or FLUSH_DELAY seconds, so an interrupted recording loses little.
+"""
+import csv
+import heapq
+import json
+import math
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+MAGIC = b'RISEML-MONITOR-1\n'
+BLOCK_HEADER = struct.Struct('<cI')
+ROW_COUNT = struct.Struct('<I')
+METRICS = ('cpu_percent', 'cpu_count', 'memory_used', 'memory_limit',
+           'gpu_utilization', 'memory_total', 'power_draw', 'power_limit', 'temperature')
+SAMPLE_COLUMNS = (('time', 'd'), ('job', 'H'), ('gpu', 'h')) + tuple((metric, 'd') for metric in METRICS)
+FLUSH_SIZE = 4096
+FLUSH_DELAY = 5
+
+
+def new_columns():
+    return {name: array(typecode) for name, typecode in SAMPLE_COLUMNS}
+
+
+class Recorder(object):
+    """Appends utilization and state messages of a monitor stream to a recording."""
+
+    def __init__(self, path, project, jobs):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._jobs = {}
+        self._gpus = {}
+        self._metadata = {'project': project.name, 'jobs': [], 'gpus': [], 'states': []}
+        self._columns = new_columns()
+        self._flushed_at = time.time()
+        # messages are recorded by the stream thread
+        self._lock = threading.Lock()
+        for job in jobs:
+            self._jobs[job.id] = len(self._jobs)
+            self._metadata['jobs'].append({'id': job.id, 'short_id': job.short_id, 'state': job.state,
+                                           'cpus': job.cpus, 'mem': job.mem, 'gpus': job.gpus})
+
+    def record(self, msg, received=None):
+        received = received or time.time()
+        with self._lock:
+            if msg['type'] == 'utilization':
+                stats = msg['data']
+                job = self._jobs.get(stats['job_id'])
+                if job is None:
+                    return
+                job_stats = dict(stats)
+                if stats.get('percpu_percent'):
+                    job_stats['cpu_count'] = len(stats['percpu_percent'])
+                self._add_row(received, job, -1, job_stats)
+                for device, gpu_stats in sorted((stats.get('gpus') or {}).items()):
+                    self._add_row(received, job, self._get_gpu(job, device, gpu_stats), gpu_stats)
+            elif msg['type'] == 'state':
+                job = self._jobs.get(msg['job_id'])
+                if job is None:
+                    return
+                self._metadata['states'].append([received, job, msg['state']])
+            else:
+                return
+            self.count += 1
+            if len(self._columns['time']) >= FLUSH_SIZE or received - self._flushed_at > FLUSH_DELAY:
+                self._flush()
+
+    def _get_gpu(self, job, device, gpu_stats):
+        gpu = self._gpus.get((job, device))
+        if gpu is None:
+            gpu = self._gpus[(job, device)] = len(self._gpus)
+            self._metadata['gpus'].append({'job': job, 'device': device, 'name': gpu_stats.get('name'),
+                                           'device_bus_id': gpu_stats.get('device_bus_id')})
+        return gpu
+
+    def _add_row(self, received, job, gpu, stats):
+        columns = self._columns
+        columns['time'].append(received)
+        columns['job'].append(job)
+        columns['gpu'].append(gpu)
+        for metric in METRICS:
+            value = stats.get(metric)
+            columns[metric].append(float('nan') if value is None else value)
+
+    def _write_block(self, kind, payload):
+        payload = zlib.compress(payload)
+        self._file.write(BLOCK_HEADER.pack(kind, len(payload)) + payload)
+
+    def _flush(self):
+        self._flushed_at = time.time()
+        metadata = self._metadata
+        if any(metadata[key] for key in ('jobs', 'gpus', 'states')):
+            self._write_block(b'M', json.dumps(metadata).encode('utf8'))
+            self._metadata = {'jobs': [], 'gpus': [], 'states': []}
+        count = len(self._columns['time'])
+        if count:
+            payload = [ROW_COUNT.pack(count)]
+            for name, _ in SAMPLE_COLUMNS:
+                column = self._columns[name]
+                if sys.byteorder == 'big':
+                    column.byteswap()
+                payload.append(column.tobytes())
+            self._write_block(b'S', b''.join(payload))
+            self._columns = new_columns()
+        self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.close()
+
+
+def read_blocks(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("%s is not a monitor recording" % path)
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                break
+            kind, length = BLOCK_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                # the recording was interrupted
+                break
+            yield kind, zlib.decompress(payload)
+
+
+class Recording(object):
+    """A recording read into memory."""
+
+    def __init__(self, path):
+        self.project = None
+        self.jobs = []
+        self.gpus = []
+        self.states = []
+        self.columns = new_columns()
+        for kind, payload in read_blocks(path):
+            if kind == b'M':
+                metadata = json.loads(payload.decode('utf8'))
+                self.project = metadata.get('project', self.project)
+                self.jobs += metadata['jobs']
+                self.gpus += metadata['gpus']
+                self.states += metadata['states']
+            elif kind == b'S':
+                self._read_samples(payload)
+
+    def _read_samples(self, payload):
+        count, = ROW_COUNT.unpack_from(payload)
+        offset = ROW_COUNT.size
+        for name, typecode in SAMPLE_COLUMNS:
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(payload[offset:offset + size])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            self.columns[name].extend(column)
+            offset += size
+
+    def __len__(self):
+        return len(self.columns['time'])
+
+    def _samples(self):
+        # a job row is followed by the rows of its GPUs
+        columns = self.columns
+        msg = None
+        for i in range(len(self)):
+            gpu = columns['gpu'][i]
+            stats = {metric: columns[metric][i] for metric in METRICS
+                     if not math.isnan(columns[metric][i])}
+            if gpu < 0:
+                if msg is not None:
+                    yield msg
+                job = self.jobs[columns['job'][i]]
+                if 'cpu_count' in stats:
+                    # only the number of cpus is recorded
+                    count = int(stats.pop('cpu_count'))
+                    stats['percpu_percent'] = [stats.get('cpu_percent', 0) / count] * count
+                stats.update(job_id=job['id'], timestamp=columns['time'][i])
+                msg = (columns['time'][i], {'type': 'utilization', 'data': stats})
+            elif msg is not None:
+                gpu = self.gpus[gpu]
+                stats.update(name=gpu['name'], device_bus_id=gpu['device_bus_id'])
+                msg[1]['data'].setdefault('gpus', {})[gpu['device']] = stats
+        if msg is not None:
+            yield msg
+
+    def messages(self):
+        """Yields the recorded messages with the time they were received."""
+        states = ((received, {'type': 'state', 'job_id': self.jobs[job]['id'], 'state': state})
+                  for received, job, state in self.states)
+        return heapq.merge(self._samples(), states, key=lambda message: message[0])
+
+    def _job_names(self):
+        return [job['short_id'] for job in self.jobs]
+
+    def write_csv(self, file):
+        writer = csv.writer(file)
+        writer.writerow(['time', 'job', 'gpu'] + list(METRICS))
+        columns = self.columns
+        jobs = self._job_names()
+        for i in range(len(self)):
+            gpu = columns['gpu'][i]
+            writer.writerow([columns['time'][i], jobs[columns['job'][i]],
+                             self.gpus[gpu]['device'] if gpu >= 0 else ''] +
+                            ['' if math.isnan(columns[metric][i]) else columns[metric][i]
+                             for metric in METRICS])
+
+    def to_numpy(self):
+        """
+        Returns the columns as NumPy arrays, with the job and GPU tables;
+        requires the numpy extra.
+        """
+        import numpy
+        arrays = {name: numpy.array(column) for name, column in self.columns.items()}
+        arrays['jobs'] = numpy.array(self._job_names())
+        arrays['gpus'] = numpy.array([gpu['device'] for gpu in self.gpus])
+        return arrays
@@ -1,24 +1,297 @@
 from __future__ import print_function
 
 import re
+import heapq
 import json
+import logging
+import random
 import sys
+import threading
+import time
 import websocket
+from collections import deque
+from time import monotonic
 import stringcase
 
 from riseml.errors import handle_error
-from riseml.client_config import get_stream_url
+from riseml.client_config import get_stream_url, get_log_cache_enabled
+from riseml.log_cache import LogCache
 from riseml.ansi import COLOR_CODES, color_string
 from . import util
 
 ANSI_ESCAPE_REGEX = re.compile(r'\x1b\[(\d+)m')
 TENSORBOARD_STARTING_REGEX = re.compile(r'(TensorBoard ([^\s]+) at )(http://[^:]+:\d+[^\s]*)')
+FINAL_STATES = (util.JobState.finished, util.JobState.failed, util.JobState.killed)
+OVERFLOW_POLICIES = ('block', 'drop', 'coalesce')
+PROGRESS_MODES = ('auto', 'all', 'sampled')
+OUTPUT_FORMATS = ('text', 'ndjson')
+encode_json = json.JSONEncoder(separators=(',', ':'), check_circular=False).encode
+# seconds between sampled progress bar updates
+PROGRESS_INTERVAL = 10
+# the server replays the history of a stream in one burst when it connects:
+# with --tail, it is over after a gap of this many seconds between messages
+REPLAY_IDLE = 0.5
+# seconds to wait for the replay to start
+REPLAY_WAIT = 3
+# seconds to wait for stopped streams to close
+STOP_TIMEOUT = 5
+
+
+class BufferedWriter(object):
+    """
+    Collects output and writes it in batches: once `max_size` characters
+    are buffered, or `max_delay` seconds after the first buffered write, so
+    that output also appears when the stream goes idle.
+    """
+
+    def __init__(self, file=None, max_size=2 ** 16, max_delay=0.05):
+        self.file = file or sys.stdout
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._buffer = []
+        self._size = 0
+        self._lock = threading.Condition()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_when_due, daemon=True)
+        self._flusher.start()
+
+    def write(self, text, time=None):
+        # `time` of the message is only used by ReorderingWriter
+        with self._lock:
+            self._buffer.append(text)
+            self._size += len(text)
+            if self._size >= self.max_size:
+                self._flush()
+            elif len(self._buffer) == 1:
+                self._lock.notify()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._closed = True
+            self._lock.notify()
+
+    def _flush(self):
+        if self._buffer:
+            text = ''.join(self._buffer)
+            try:
+                self.file.write(text)
+            except UnicodeEncodeError:
+                encoding = getattr(self.file, 'encoding', None) or 'ascii'
+                self.file.write(text.encode(encoding, 'replace').decode(encoding))
+            self.file.flush()
+            del self._buffer[:]
+            self._size = 0
+
+    def _flush_when_due(self):
+        with self._lock:
+            while not self._closed:
+                if not self._buffer:
+                    self._lock.wait()
+                else:
+                    self._lock.wait(self.max_delay)
+                    self._flush()
+
+
+class ReorderingWriter(BufferedWriter):
+    """
+    Output shared by several log streams: messages are held for `window`
+    seconds and written ordered by their time, so that lines of streams
+    received slightly out of order are merged by time.
+    """
+
+    def __init__(self, file=None, window=0.5, max_held=10000):
+        self.window = window
+        self.max_held = max_held
+        self._held = []
+        self._seq = 0
+        super(ReorderingWriter, self).__init__(file, max_delay=window)
+
+    def write(self, text, time=None):
+        with self._lock:
+            # messages without time (errors) go first
+            heapq.heappush(self._held, (float('-inf') if time is None else time,
+                                        self._seq, monotonic(), text))
+            self._seq += 1
+            if len(self._held) > self.max_held:
+                self._flush(monotonic())
+            elif len(self._held) == 1:
+                self._lock.notify()
+
+    def flush(self):
+        # a printer of one stream flushes on reconnects and errors: lines
+        # other streams may still precede stay held until they are due
+        with self._lock:
+            self._flush(monotonic() - self.window)
+
+    def _flush(self, before=None):
+        while self._held and (before is None or self._held[0][2] <= before):
+            self._buffer.append(heapq.heappop(self._held)[3])
+        super(ReorderingWriter, self)._flush()
+
+    def _flush_when_due(self):
+        with self._lock:
+            while not self._closed:
+                if not self._held:
+                    self._lock.wait()
+                else:
+                    self._lock.wait(self.window / 2)
+                    self._flush(monotonic() - self.window)
+
+
+class MessageQueue(object):
+    """
+    Bounded queue between receiving and printing messages. When it is
+    full, `put` waits for the printer ('block'), drops the oldest message
+    ('drop') or replaces the last queued message of the job by the new
+    one if both are progress bar updates, i.e. lines with '\r'
+    ('coalesce', waiting otherwise).
+    """
+
+    def __init__(self, maxsize=10000, policy='coalesce'):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.coalesced = 0
+        self.dropped = 0
+        # entries are [msg] lists, so that a queued message can be replaced
+        self._entries = deque()
+        self._last_entry = {}
+        self._lock = threading.Condition()
+        self._closed = False
+
+    def put(self, msg):
+        with self._lock:
+            while len(self._entries) >= self.maxsize and not self._closed:
+                if self.policy == 'drop':
+                    self._pop()
+                    self.dropped += 1
+                elif self.policy == 'coalesce' and self._coalesce(msg):
+                    return
+                else:
+                    self._lock.wait()
+            if self._closed:
+                return
+            entry = [msg]
+            self._entries.append(entry)
+            if 'job_id' in msg:
+                self._last_entry[msg['job_id']] = entry
+            self._lock.notify_all()
+
+    def get(self):
+        """Returns the next message, or None once the queue is closed and empty."""
+        with self._lock:
+            while not self._entries and not self._closed:
+                self._lock.wait()
+            if not self._entries:
+                return None
+            self._lock.notify_all()
+            return self._pop()
+
+    def close(self, discard=False):
+        with self._lock:
+            self._closed = True
+            if discard:
+                self._entries.clear()
+                self._last_entry.clear()
+            self._lock.notify_all()
+
+    def _pop(self):
+        entry = self._entries.popleft()
+        job_id = entry[0].get('job_id')
+        if self._last_entry.get(job_id) is entry:
+            del self._last_entry[job_id]
+        return entry[0]
+
+    def _coalesce(self, msg):
+        if msg['type'] != 'log' or '\r' not in msg['line']:
+            return False
+        entry = self._last_entry.get(msg['job_id'])
+        if entry is None or entry[0]['type'] != 'log' or '\r' not in entry[0]['line']:
+            return False
+        entry[0] = msg
+        self.coalesced += 1
+        return True
+
+
+class LogFilter(object):
+    """
+    Selects the messages to print by their raw line and job, so that
+    rejected messages are never formatted.
+    """
+
+    def __init__(self, grep=None, exclude=None, jobs=None, states_only=False):
+        self.grep = self._compile(grep)
+        self.exclude = self._compile(exclude)
+        self.jobs = jobs
+        self.states_only = states_only
+
+    @staticmethod
+    def _compile(patterns):
+        # raises re.error for invalid patterns
+        if patterns:
+            return re.compile('|'.join('(?:%s)' % pattern for pattern in patterns))
+
+    def compile(self, ids_to_name):
+        """Returns a predicate for the messages of a stream."""
+        job_ids = None
+        if self.jobs:
+            job_ids = {id for id, name in ids_to_name.items()
+                       if any(name == job or name.endswith('.' + job) for job in self.jobs)}
+        grep = self.grep.search if self.grep else None
+        exclude = self.exclude.search if self.exclude else None
+        states_only = self.states_only
+
+        def accepts(msg):
+            msg_type = msg['type']
+            if msg_type == 'error':
+                return True
+            if job_ids is not None and msg['job_id'] not in job_ids:
+                return False
+            if msg_type != 'log':
+                return True
+            if states_only:
+                return False
+            line = msg['line']
+            return (grep is None or grep(line) is not None) and \
+                (exclude is None or exclude(line) is None)
+        return accepts
+
+
+class TailBuffer(object):
+    """The last `size` log lines of a stream, with the state messages between them."""
+
+    def __init__(self, size):
+        self.size = size
+        self.messages = deque()
+        self.lines = 0
+
+    def append(self, msg):
+        self.messages.append(msg)
+        if msg.get('type') == 'log':
+            self.lines += 1
+            while self.lines > self.size:
+                if self.messages.popleft().get('type') == 'log':
+                    self.lines -= 1
+
 
 class LogPrinter(object):
-    def __init__(self, url, ids_to_name, stream_meta=None):
+    def __init__(self, url, ids_to_name, stream_meta=None, cache=None, since=None,
+                 log_filter=None, output=None, overflow='coalesce', queue_size=10000,
+                 progress='auto', output_format='text'):
         self.url = url
         self.ids_to_name = ids_to_name
         self.stream_meta = stream_meta or {}
+        self.cache = cache
+        self.since = since
+        self.accepts = log_filter.compile(ids_to_name) if log_filter is not None else None
+        # only write messages to the cache
+        self.quiet = False
+        # the server closed the stream
+        self.finished = False
 
         self.job_ids_color = {
             id: list(COLOR_CODES.keys())[(i + 1) % len(COLOR_CODES)]
@@ -27,56 +300,300 @@ class LogPrinter(object):
 
         self.job_ids_last_color_used = {}
         self.indentation = max([len(name) for _, name in self.ids_to_name.items()]) + 1
+        self.prefixes = {}
+        # an output shared with other printers is closed by its owner
+        self.output = output or BufferedWriter()
+        self._owns_output = output is None
+        # while streaming, messages are printed by a separate thread, so
+        # that slow output doesn't stall receiving
+        self.overflow = overflow
+        self.queue_size = queue_size
+        self._queue = None
+        self._renderer = None
+        # progress bars (lines with '\r') are reduced to their last update
+        # when the output is not a terminal, except for one update every
+        # PROGRESS_INTERVAL seconds
+        # ndjson: messages as received, with the job name
+        self.json_output = output_format == 'ndjson'
+        if self.json_output:
+            progress = 'all'
+            self.json_job_names = {id: '{"job":%s,' % json.dumps(name)
+                                   for id, name in ids_to_name.items()}
+        elif progress == 'auto':
+            isatty = getattr(self.output.file, 'isatty', None)
+            progress = 'all' if isatty is not None and isatty() else 'sampled'
+        self.sample_progress = progress == 'sampled'
+        self.progress_printed = {}
+        self.progress_pending = {}
+        self.last_seen = cache.last_seen if cache is not None else {}
+        self.replayed = {}
+        # with --tail, the history replayed by the server is held back
+        self._tail = None
+        self._tail_lock = threading.RLock()
+        self._replaying = False
+        self._interrupted = False
+        self._opened = False
+        self._connected = False
+        self._stopped = False
+        self._timestamp = (None, None)
+
+    def stream(self, max_delay=30):
+        # lost connections are reported below, unless debugging
+        logger = logging.getLogger('websocket')
+        if logger.getEffectiveLevel() > logging.DEBUG:
+            logger.setLevel(logging.CRITICAL)
+        attempt = 0
+        if not self.quiet:
+            self._queue = MessageQueue(self.queue_size, self.overflow)
+            self._renderer = threading.Thread(target=self._render, daemon=True)
+            self._renderer.start()
+        if self._tail is not None:
+            self._last_received = monotonic()
+            threading.Thread(target=self._watch_replay, daemon=True).start()
+        while not self._stopped:
+            self._error = None
+            self._done = False
+            self._received = False
+            ws_app = self._ws_app = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            # FIXME: {'Authorization': os.environ.get('RISEML_APIKEY')}
+            try:
+                ws_app.run_forever()
+            except KeyboardInterrupt:
+                break
+            finally:
+                self._connected = False
+            if self._done or self._stopped:
+                break
+            if self._received:
+                attempt = 0
+            delay = min(max_delay, 2 ** attempt) * random.uniform(0.5, 1.5)
+            attempt += 1
+            self.output.flush()
+            sys.stderr.write('Lost connection to log stream ({}), reconnecting in {:.1f}s...\n'.format(
+                self._error or 'closed', delay))
+            try:
+                time.sleep(delay)
+            except KeyboardInterrupt:
+                self._on_error(None, KeyboardInterrupt())
+                break
+        if not self._interrupted:
+            # the stream ended before its replay was over
+            self._release_tail()
+        self._stop_rendering()
+        if self._queue is not None and (self._queue.coalesced or self._queue.dropped):
+            sys.stderr.write('Output was too slow: {} progress updates coalesced, {} messages dropped\n'.format(
+                self._queue.coalesced, self._queue.dropped))
+        if self.cache is not None:
+            self.cache.close(complete=self.finished)
+
+    def _render(self):
+        try:
+            while True:
+                msg = self._queue.get()
+                if msg is None:
+                    break
+                self.print_message(msg)
+        except Exception:
+            # don't block the receiver
+            self._queue.close(discard=True)
+            raise
 
-    def stream(self):
-        ws_app = websocket.WebSocketApp(
-            self.url,
-            on_message=self._on_message,
-            on_error=self._on_error,
-            on_close=self._on_close
-        )
-        # FIXME: {'Authorization': os.environ.get('RISEML_APIKEY')}
-        ws_app.run_forever()
+    def _stop_rendering(self, discard=False):
+        if self._renderer is not None:
+            self._queue.close(discard)
+            self._renderer.join()
+            self._renderer = None
+
+    def stop(self):
+        """Stops `stream` from another thread."""
+        self._stopped = True
+        if getattr(self, '_ws_app', None) is not None:
+            self._ws_app.close()
+
+    def close(self):
+        self.print_pending_progress()
+        if self._owns_output:
+            self.output.close()
+
+    def print_cached(self, tail=None):
+        for msg in self.cache.messages(self.since, tail):
+            self.print_message(msg)
+        self.output.flush()
+
+    def keep_tail(self, tail, cached=()):
+        """
+        Holds back the history replayed by the server when `stream` connects
+        and prints only its last `tail` log lines, following the `cached`
+        messages, once the replay caught up.
+        """
+        self._tail = TailBuffer(tail)
+        for msg in cached:
+            self._tail.append(msg)
+
+    def _hold_back(self, msg):
+        with self._tail_lock:
+            if self._tail is None or msg['type'] not in ('log', 'state'):
+                return False
+            # the server's timestamps can't be compared with the local
+            # clock, the replay is over after a gap between messages
+            received = monotonic()
+            gap = received - self._last_received
+            self._last_received = received
+            if self._replaying and gap > REPLAY_IDLE:
+                self._release_tail()
+                return False
+            self._replaying = True
+            self._tail.append(msg)
+            return True
+
+    def _release_tail(self):
+        with self._tail_lock:
+            if self._tail is None:
+                return
+            for msg in self._tail.messages:
+                self._deliver(msg)
+            self._tail = None
+
+    def _watch_replay(self):
+        while self._tail is not None and not self._stopped:
+            time.sleep(0.1)
+            idle = REPLAY_IDLE if self._replaying else REPLAY_WAIT
+            if self._connected and monotonic() - self._last_received > idle:
+                self._release_tail()
+
+    def _deliver(self, msg):
+        if self._queue is not None:
+            self._queue.put(msg)
+        else:
+            self.print_message(msg)
 
     def _on_message(self, _, message):
+        self._received = True
         msg = json.loads(message)
+
+        if msg['type'] in ('log', 'state'):
+            if not self._is_new(msg):
+                return
+            if self.cache is not None:
+                self.cache.append(msg)
+
+        if self.quiet and msg['type'] != 'error':
+            return
+        if self._tail is not None and self._hold_back(msg):
+            return
+        self._deliver(msg)
+
+    def print_message(self, msg):
         msg_type = msg['type']
+        if self.since is not None and msg.get('time', self.since) < self.since:
+            return
+        if self.accepts is not None and not self.accepts(msg):
+            return
 
-        if msg_type == 'log':
+        if self.json_output:
+            self.print_json_message(msg)
+        elif msg_type == 'log':
             self.print_log_message(msg)
         elif msg_type == 'state':
             self.print_state_message(msg)
         elif msg_type == 'error':
             self.print_error_message(msg)
 
+    def _is_new(self, msg):
+        # a reconnected stream starts from the beginning again: skip messages
+        # up to the last time seen for the job, and as many messages with
+        # that time as were already printed
+        job_id, msg_time = msg['job_id'], msg['time']
+        last_time, count = self.last_seen.get(job_id, (None, 0))
+        if last_time is None or msg_time > last_time:
+            self.last_seen[job_id] = (msg_time, 1)
+            self.replayed[job_id] = 1
+            return True
+        if msg_time < last_time:
+            return False
+        replayed = self.replayed[job_id] = self.replayed.get(job_id, 0) + 1
+        if replayed <= count:
+            return False
+        self.last_seen[job_id] = (msg_time, count + 1)
+        return True
+
+    def _on_open(self, _):
+        self._opened = True
+        self._last_received = monotonic()
+        # the wait for the first message is not a gap in the replay
+        self._replaying = False
+        self._connected = True
+        self.replayed = {}
+
     def _on_error(self, _, error):
         if isinstance(error, (KeyboardInterrupt, SystemExit)):
+            self._stop_rendering(discard=True)
+        self.output.flush()
+        if isinstance(error, (KeyboardInterrupt, SystemExit)):
+            self._done = True
+            self._interrupted = True
             any_id = self.stream_meta.get('experiment_id') or self.stream_meta.get('job_id')
-            print()  # newline after ^C
+            # keep json output parseable
+            file = sys.stderr if self.json_output else sys.stdout
+            print(file=file)  # newline after ^C
             if self.stream_meta.get('experiment_id'):
-                print('Experiment will continue in background')
+                print('Experiment will continue in background', file=file)
             else:
-                print('Job will continue in background')
+                print('Job will continue in background', file=file)
             if any_id:
-                print('Type `riseml logs %s` to connect to log stream again' % any_id)
+                print('Type `riseml logs %s` to connect to log stream again' % any_id, file=file)
+        elif self._opened and isinstance(error, (websocket.WebSocketConnectionClosedException,
+                                                 websocket.WebSocketTimeoutException,
+                                                 OSError)):
+            # the stream was up before: reconnect
+            self._error = error.__class__.__name__
         else:
             # all other Exception based stuff goes to `handle_error`
             handle_error(error)
 
-    def _on_close(self, _):
-        sys.exit(0)
+    def _on_close(self, _, *args):
+        # newer websocket-client versions pass the close status and reason;
+        # anything but a normal close from the server is reconnected
+        status = args[0] if args else None
+        if status == 1000 or (status is None and self._error is None):
+            self._done = True
+            self.finished = True
 
     def _message_prefix(self, msg):
-        job_name = self.ids_to_name[msg['job_id']]
-        color = self.job_ids_color[msg['job_id']]
-        prefix = "{}| ".format(job_name.ljust(self.indentation))
+        job_id = msg['job_id']
+        prefix = self.prefixes.get(job_id)
+        if prefix is None:
+            job_name = self.ids_to_name[job_id]
+            color = self.job_ids_color[job_id]
+            prefix = "{}| ".format(job_name.ljust(self.indentation))
+            prefix = self.prefixes[job_id] = color_string(prefix, color=color)
+        return prefix
 
-        return color_string(prefix, color=color)
+    def _str_timestamp(self, timestamp):
+        # many messages share the same second
+        second = int(timestamp)
+        if self._timestamp[0] != second:
+            self._timestamp = (second, util.str_timestamp(second))
+        return self._timestamp[1]
 
     def print_log_message(self, msg):
         if msg['job_id'] not in self.ids_to_name:
             return
         line = msg['line']
+        if self.sample_progress:
+            if '\r' in line:
+                msg = self._sample_progress(msg)
+                if msg is None:
+                    return
+                line = msg['line']
+            elif msg['job_id'] in self.progress_pending:
+                self.print_pending_progress(msg['job_id'])
         if 'tensorboard' in self.ids_to_name[msg['job_id']] \
             and self.stream_meta.get("tensorboard_job"):
             line = re.sub(TENSORBOARD_STARTING_REGEX,
@@ -84,58 +601,168 @@ class LogPrinter(object):
                                 util.tensorboard_job_url(self.stream_meta.get("tensorboard_job"))
                             ),
                             line)
+        prefix = "%s[%s] " % (self._message_prefix(msg), self._str_timestamp(msg['time']))
+        output = []
         for partial_line in line.split('\r'):
             last_color = self.job_ids_last_color_used.get(msg['job_id'], 0)
-            line_text = "[%s] %s" % (util.str_timestamp(msg['time']),
-                                    color_string(partial_line, ansi_code=last_color))
+            output.append(prefix + color_string(partial_line, ansi_code=last_color))
+
+            if '\x1b' in partial_line:
+                used_colors = ANSI_ESCAPE_REGEX.findall(partial_line)
+                if used_colors:
+                    self.job_ids_last_color_used[msg['job_id']] = used_colors[-1]
+        self.output.write('\r'.join(output) + '\r\n', msg['time'])
 
-            output = "%s%s" % (self._message_prefix(msg), line_text)
-            sys.stdout.write(output)
-            sys.stdout.write('\r')
+    def _sample_progress(self, msg):
+        # keep the last update of the line, and print it only if the last
+        # update of the job was printed PROGRESS_INTERVAL seconds ago
+        job_id = msg['job_id']
+        msg = dict(msg, line=msg['line'].rstrip('\r').rsplit('\r', 1)[-1])
+        printed = self.progress_printed.get(job_id)
+        if printed is not None and msg['time'] - printed < PROGRESS_INTERVAL:
+            self.progress_pending[job_id] = msg
+            return None
+        self.progress_pending.pop(job_id, None)
+        self.progress_printed[job_id] = msg['time']
+        return msg
 
-            used_colors = ANSI_ESCAPE_REGEX.findall(partial_line)
-            if used_colors:
-                self.job_ids_last_color_used[msg['job_id']] = used_colors[-1]
-        sys.stdout.write('\n')
+    def print_pending_progress(self, job_id=None):
+        for job_id in [job_id] if job_id is not None else list(self.progress_pending):
+            msg = self.progress_pending.pop(job_id, None)
+            if msg is not None:
+                self.progress_printed[job_id] = msg['time']
+                self.print_log_message(msg)
 
     def print_state_message(self, msg):
         if msg['job_id'] not in self.ids_to_name:
             return
-        time = util.str_timestamp(msg['time'])
+        if msg['job_id'] in self.progress_pending:
+            self.print_pending_progress(msg['job_id'])
+        time = self._str_timestamp(msg['time'])
         state = "[%s] --> %s" % (time, msg['state'])
-        output = "%s%s" % (self._message_prefix(msg),
-                           color_string(state, color="bold_white"))
-        print(output)
+        output = ["%s%s\n" % (self._message_prefix(msg),
+                              color_string(state, color="bold_white"))]
         for key in ['reason', 'message', 'exit_code']:
             if msg.get(key, None) is not None:
                 message = "[{}] {}: {}".format(time, stringcase.titlecase(key), msg[key])
-                print("{}{}".format(self._message_prefix(msg), color_string(message, color="bold_white")))
+                output.append("{}{}\n".format(self._message_prefix(msg), color_string(message, color="bold_white")))
+        self.output.write(''.join(output), msg['time'])
+
+    def print_json_message(self, msg):
+        text = encode_json(msg)
+        job_id = msg.get('job_id')
+        if job_id is not None:
+            job = self.json_job_names.get(job_id)
+            if job is None:
+                return
+            # add the job name without copying the message
+            text = job + text[1:]
+        self.output.write(text + '\n', msg.get('time'))
 
     def print_error_message(self, msg):
-        print(color_string("Error: {}".format(msg['error']), color="red"))
+        self.output.write(color_string("Error: {}".format(msg['error']), color="red") + '\n')
+
+
+def show_log(printer, finished, tail=None):
+    """
+    Prints a log stream: a complete cached log of a finished experiment or
+    job from disk, otherwise the cached log followed by the live stream.
+    """
+    cache = printer.cache
+    if cache is not None:
+        if cache.complete and not finished:
+            # e.g. restarted since the log was cached
+            cache.clear()
+            printer.last_seen = {}
+        if finished and not cache.complete and (tail is not None or printer.since is not None):
+            # fetch the rest of the log first to select from all of it
+            printer.quiet = True
+            printer.stream()
+        if finished and (cache.complete or printer.quiet):
+            printer.print_cached(tail)
+            printer.close()
+            return
+    if tail is not None:
+        # the stream replays the whole log, only its last lines are shown
+        printer.keep_tail(tail, list(cache.messages(printer.since, tail)) if cache is not None else ())
+    elif cache is not None:
+        printer.print_cached()
+    printer.stream()
+    printer.close()
+
+
+def open_log_cache(kind, id):
+    if get_log_cache_enabled():
+        return LogCache.open(kind, id)
+
 
-def stream_job_log(job):
+def stream_job_log(job, tail=None, **options):
+    # options are passed to LogPrinter
     ids_to_name = {job.id: job.short_id}
     url = '%s/ws/jobs/%s/stream' % (get_stream_url(), job.id)
     meta = {"job_id": job.short_id}
     if util.is_tensorboard_job(job):
         meta["tensorboard_job"] = job
-    LogPrinter(url, ids_to_name, stream_meta=meta).stream()
+    printer = LogPrinter(url, ids_to_name, stream_meta=meta,
+                         cache=open_log_cache('jobs', job.id), **options)
+    show_log(printer, job.state in FINAL_STATES, tail)
 
 
-def stream_experiment_log(experiment):
-    def add_experiment_to_log(experiment):
+def add_experiment_to_log(ids_to_name, experiment):
+    for experiment in [experiment] + list(experiment.children or []):
         ids_to_name[experiment.id] = experiment.short_id
         for job in experiment.jobs:
             ids_to_name[job.id] = '{}.{}'.format(experiment.short_id, job.name)
 
-    url = '%s/ws/experiments/%s/stream' % (get_stream_url(), experiment.id)
-    ids_to_name = {}
-    add_experiment_to_log(experiment)
-    for child_experiment in experiment.children:
-        add_experiment_to_log(child_experiment)
 
+def experiment_log_printer(experiment, ids_to_name, **options):
+    url = '%s/ws/experiments/%s/stream' % (get_stream_url(), experiment.id)
     meta = {"experiment_id": experiment.short_id}
     if util.has_tensorboard(experiment):
         meta["tensorboard_job"] = util.tensorboard_job(experiment)
-    LogPrinter(url, ids_to_name, stream_meta=meta).stream()
+    return LogPrinter(url, ids_to_name, stream_meta=meta,
+                      cache=open_log_cache('experiments', experiment.id), **options)
+
+
+def stream_experiment_log(experiment, tail=None, **options):
+    ids_to_name = {}
+    add_experiment_to_log(ids_to_name, experiment)
+    printer = experiment_log_printer(experiment, ids_to_name, **options)
+    show_log(printer, experiment.state in FINAL_STATES, tail)
+
+
+def stream_experiment_logs(experiments, tail=None, window=0.5, **options):
+    """
+    Shows the logs of several experiments in one view: every experiment
+    is streamed by its own thread into an output ordering the messages
+    of all streams by time within `window` seconds.
+    """
+    ids_to_name = {}
+    for experiment in experiments:
+        add_experiment_to_log(ids_to_name, experiment)
+    output = ReorderingWriter(window=window)
+    printers = []
+    threads = []
+    for experiment in experiments:
+        printer = experiment_log_printer(experiment, ids_to_name, output=output, **options)
+        thread = threading.Thread(target=show_log, daemon=True,
+                                  args=(printer, experiment.state in FINAL_STATES, tail))
+        thread.start()
+        printers.append(printer)
+        threads.append(thread)
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        for printer in printers:
+            printer.stop()
+        # let the printers finish writing their log caches
+        deadline = monotonic() + STOP_TIMEOUT
+        for thread in threads:
+            thread.join(max(0, deadline - monotonic()))
+        output.close()
+        print(file=sys.stderr)  # newline after ^C
+        print('Experiments will continue in background', file=sys.stderr)
+        return
+    output.close()
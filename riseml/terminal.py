@@ -0,0 +1,120 @@
+from __future__ import print_function
+
+import os
+import shutil
+import signal
+import sys
+import threading
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+from riseml.ansi import truncate
+
+CURSOR_HOME = '\x1b[H'
+CLEAR_SCREEN = '\x1b[2J'
+CLEAR_LINE = '\x1b[K'
+CLEAR_BELOW = '\x1b[J'
+
+KEY_SEQUENCES = {
+    '\x1b[A': 'up',
+    '\x1b[B': 'down',
+    '\x1b[5~': 'page_up',
+    '\x1b[6~': 'page_down',
+    '\x1b[H': 'home',
+    '\x1b[F': 'end',
+}
+
+
+def move_to(row):
+    return '\x1b[%d;1H' % (row + 1)
+
+
+class Screen(object):
+    """
+    Renders full-screen output: the first frame clears the screen, later
+    frames only rewrite the lines that changed. The terminal size is
+    read without spawning processes and updated on SIGWINCH, which also
+    wakes up `wait`.
+    """
+
+    def __init__(self, file=None, changed=None):
+        self.file = file or sys.stdout
+        self.changed = changed or threading.Event()
+        self._lines = None
+        self._update_size()
+        if hasattr(signal, 'SIGWINCH') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGWINCH, self._on_resize)
+
+    def _update_size(self):
+        self.columns, self.rows = shutil.get_terminal_size()
+
+    def _on_resize(self, signum, frame):
+        self._update_size()
+        self._lines = None
+        self.changed.set()
+
+    def wait(self, timeout=None):
+        """Waits until `changed` is set (or the terminal is resized)."""
+        self.changed.wait(timeout)
+        self.changed.clear()
+
+    def render(self, text):
+        lines = [truncate(line, self.columns - 1)
+                 for line in text.split('\n')[:self.rows - 1]]
+        if self._lines is None:
+            output = [CURSOR_HOME, CLEAR_SCREEN, '\n'.join(lines)]
+        else:
+            output = [move_to(i) + line + CLEAR_LINE
+                      for i, line in enumerate(lines)
+                      if i >= len(self._lines) or self._lines[i] != line]
+            if len(lines) < len(self._lines):
+                output.append(move_to(len(lines)) + CLEAR_BELOW)
+            if not output:
+                return
+        # leave the cursor below the output
+        output.append(move_to(len(lines)))
+        self._lines = lines
+        self.file.write(''.join(output))
+        self.file.flush()
+
+
+class Keyboard(object):
+    """
+    Reads keys from the terminal without waiting for enter and passes
+    them to `on_key`, e.g. 'q' or 'page_down' (see KEY_SEQUENCES).
+    """
+
+    def __init__(self, on_key, file=None):
+        self.on_key = on_key
+        self.file = file or sys.stdin
+        self._attributes = None
+
+    def start(self):
+        """Returns whether keys can be read."""
+        if termios is None or not self.file.isatty():
+            return False
+        fd = self.file.fileno()
+        self._attributes = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        thread = threading.Thread(target=self._read, args=(fd,), daemon=True)
+        thread.start()
+        return True
+
+    def stop(self):
+        if self._attributes is not None:
+            termios.tcsetattr(self.file.fileno(), termios.TCSADRAIN, self._attributes)
+            self._attributes = None
+
+    def _read(self, fd):
+        while True:
+            keys = os.read(fd, 32).decode('utf8', 'replace')
+            if not keys:
+                break
+            if keys in KEY_SEQUENCES:
+                self.on_key(KEY_SEQUENCES[keys])
+            else:
+                for key in keys:
+                    self.on_key(key)
@@ -1,10 +1,10 @@
-from riseml.client import DefaultApi, ApiClient
+from riseml.api import get_api_client
+from riseml.client import DefaultApi
 from riseml.util import call_api
 
 
 def get_user():
-    api_client = ApiClient()
-    client = DefaultApi(api_client)
+    client = DefaultApi(get_api_client())
 
     user = call_api(lambda: client.get_user())[0]
 
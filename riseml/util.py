@@ -8,6 +8,7 @@ import platform
 import webbrowser
 from urllib3.exceptions import LocationValueError, HTTPError
 from datetime import datetime
+from itertools import islice
 
 from riseml.client.rest import ApiException
 from riseml.consts import IS_BUNDLE
@@ -34,6 +35,10 @@ class JobState(object):
     killed   = 'KILLED'
 
 
+ACTIVE_STATES = (JobState.created, JobState.pending, JobState.building,
+                 JobState.starting, JobState.running)
+
+
 class TableElement():
     pass
 
@@ -45,11 +50,7 @@ class TableRowDelimiter(TableElement):
         return 'TableRowDelimiter ({})'.format(self.symbol)
 
 
-def print_table(header, rows, min_widths=None,
-                file=sys.stdout, bold_header=True,
-                column_spaces=1, indent=0):
-
-    indent_str = ' ' * indent
+def get_column_widths(header, rows, min_widths=None):
     n_columns = len(header)
 
     if not min_widths:
@@ -80,26 +81,36 @@ def print_table(header, rows, min_widths=None,
             if item_len > widths[i]:
                 widths[i] = item_len
 
-    table_width = sum(widths) + (n_columns - 1) * column_spaces
+    return widths
 
-    # see https://stackoverflow.com/questions/14140756/python-s-str-format-fill-characters-and-ansi-colors
-    def ansi_ljust(s, width):
-        needed = width - len(strip_color(s))
-        if needed > 0:
-            return s + ' ' * needed
-        else:
-            return s
+
+# see https://stackoverflow.com/questions/14140756/python-s-str-format-fill-characters-and-ansi-colors
+def ansi_ljust(s, width):
+    needed = width - len(strip_color(s))
+    if needed > 0:
+        return s + ' ' * needed
+    else:
+        return s
+
+
+def print_table_rows(header, rows, widths, file=None, bold_header=True,
+                     column_spaces=1, indent=0):
+    # sys.stdout is looked up when called, commands run by the agent replace it
+    file = file or sys.stdout
+    indent_str = ' ' * indent
+    table_width = sum(widths) + (len(widths) - 1) * column_spaces
 
     def render_line(columns):
         sep = ' ' * column_spaces
         return sep.join([ansi_ljust(str(c), widths[i]) for i, c in enumerate(columns)])
 
     # print header
-    if not bold_header:
-        emph = lambda x: x
-    else:
-        emph = bold
-    print(indent_str + emph(render_line(header)), file=file)
+    if header is not None:
+        if not bold_header:
+            emph = lambda x: x
+        else:
+            emph = bold
+        print(indent_str + emph(render_line(header)), file=file)
 
     # print rows
     for row in rows:
@@ -109,6 +120,34 @@ def print_table(header, rows, min_widths=None,
             print(indent_str + render_line(row), file=file)
 
 
+def print_table(header, rows, min_widths=None,
+                file=None, bold_header=True,
+                column_spaces=1, indent=0):
+    widths = get_column_widths(header, rows, min_widths)
+    print_table_rows(header, rows, widths, file=file, bold_header=bold_header,
+                     column_spaces=column_spaces, indent=indent)
+
+
+def print_table_stream(header, rows, min_widths=None,
+                       file=None, bold_header=True,
+                       column_spaces=1, indent=0, sample_size=100):
+    """
+    Prints a table from an iterable of rows while it is consumed.
+
+    Column widths are fitted to the first `sample_size` rows; later rows
+    are printed as they come and may exceed the width of their columns.
+    """
+    file = file or sys.stdout
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    widths = get_column_widths(header, sample, min_widths)
+    print_table_rows(header, sample, widths, file=file, bold_header=bold_header,
+                     column_spaces=column_spaces, indent=indent)
+    file.flush()
+    print_table_rows(None, rows, widths, file=file,
+                     column_spaces=column_spaces, indent=indent)
+
+
 def get_since_str(timestamp):
     if not timestamp:
         return '-'
@@ -134,6 +173,29 @@ def str_timestamp(timestamp):
     return datetime.utcfromtimestamp(int(timestamp)).strftime('%Y-%m-%dT%H:%M:%SZ')
 
 
+DURATION_REGEX = re.compile(r'^(\d+)([smhd])$')
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_since(value):
+    """
+    Returns the unix timestamp of a duration before now (e.g. 10m, 2h),
+    a UTC timestamp as printed in logs or a unix timestamp.
+    """
+    match = DURATION_REGEX.match(value)
+    if match:
+        return time.time() - int(match.group(1)) * DURATION_UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        since = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+    except ValueError:
+        raise ValueError("Invalid time: %s (use e.g. 10m, 2h, 1d or 2017-01-31T12:00:00Z)" % value)
+    return (since - datetime(1970, 1, 1)).total_seconds()
+
+
 def mib_to_gib(value):
     return float(value) * (10 ** 6) / (1024 ** 3)
 
@@ -209,6 +271,21 @@ def call_api(api_fn, not_found=None):
         ))
 
 
+def select_experiments(client, project=None, states=None):
+    """Returns the ids of experiments in `states` (default: ACTIVE_STATES), optionally of a project."""
+    states = states or ACTIVE_STATES
+    # count=0 lists all experiments, not only the server's default page
+    experiments = call_api(lambda: client.get_experiments(states='|'.join(states), count=0))
+    return [experiment.id for experiment in experiments
+            if experiment.state in states and
+            (project is None or experiment.project.name == project)]
+
+
+def unique(ids):
+    seen = set()
+    return [i for i in ids if not (i in seen or seen.add(i))]
+
+
 def is_job_id(id):
     return JOB_ID_REGEX.match(id) is not None
 
@@ -0,0 +1,199 @@
+"""
+Rolling-window GPU utilization statistics and detection of idle GPUs.
+
+Stats are computed over the histories kept by GPUStats and JobStats in
+ring buffers, vectorized with NumPy if it is installed.
+"""
+from __future__ import print_function
+
+import math
+import time
+from bisect import bisect_left, bisect_right
+from io import StringIO
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from riseml.ansi import bold
+from riseml.terminal import Screen
+from riseml.util import print_table, JobState
+
+# seconds
+WINDOW = 60
+PERCENTILES = (5, 50, 95)
+IDLE_THRESHOLD = 10
+IDLE_MINUTES = 10
+
+
+def as_array(values):
+    """
+    Returns an array('d'), e.g. the copy of a window made by
+    RingBuffer.values, as a NumPy array sharing its buffer.
+    """
+    if numpy is not None:
+        return numpy.frombuffer(values, dtype=numpy.float64)
+    return values
+
+
+def percentiles(values, qs=PERCENTILES):
+    """Returns the percentiles `qs` of `values`, interpolated linearly like NumPy."""
+    if numpy is not None:
+        return [float(p) for p in numpy.percentile(values, qs)]
+    values = sorted(values)
+    result = []
+    for q in qs:
+        position = (len(values) - 1) * q / 100.
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        result.append(values[lower] + (values[upper] - values[lower]) * (position - lower))
+    return result
+
+
+def mean(values):
+    if numpy is not None:
+        return float(numpy.mean(values))
+    return sum(values) / float(len(values))
+
+
+def window_size(times, seconds):
+    """Returns the number of `times` at most `seconds` before the last one."""
+    return len(times) - bisect_left(times, times[-1] - seconds)
+
+
+def gpu_window_stats(gpu_stats, seconds=WINDOW):
+    """
+    Returns the mean and PERCENTILES of the utilization of a GPU in the
+    last `seconds`, with the mean fraction of its memory that was unused
+    (memory_headroom) and of the power limit that was drawn (power_ratio),
+    or None without stats.
+    """
+    times = gpu_stats.history.get('timestamp')
+    utilization = gpu_stats.history.get('gpu_utilization')
+    if times is None or utilization is None:
+        return None
+    count = window_size(times.values(), seconds)
+    utilization = as_array(utilization.values(count))
+    stats = {'samples': len(utilization), 'mean': mean(utilization)}
+    stats.update(zip(['p%d' % q for q in PERCENTILES], percentiles(utilization)))
+    memory_used = gpu_stats.history.get('memory_used')
+    memory_total = gpu_stats.stats.get('memory_total')
+    if memory_used is not None and memory_total:
+        stats['memory_headroom'] = 1 - mean(as_array(memory_used.values(count))) / memory_total
+    power_draw = gpu_stats.history.get('power_draw')
+    power_limit = gpu_stats.stats.get('power_limit')
+    if power_draw is not None and power_limit:
+        stats['power_ratio'] = mean(as_array(power_draw.values(count))) / power_limit
+    return stats
+
+
+class IdleDetector(object):
+    """
+    Tracks since when jobs use less than `threshold` percent of their
+    requested GPUs; GPUs without stats count as unused. Jobs are idle
+    after `minutes` of that.
+    """
+
+    def __init__(self, threshold=IDLE_THRESHOLD, minutes=IDLE_MINUTES):
+        self.threshold = threshold
+        self.duration = minutes * 60
+        # dict from job id -> time of the last sample checked
+        self.last_seen = {}
+        # dict from job id -> time of the first sample below the threshold
+        self.idle_since = {}
+
+    def update(self, job_stats):
+        """Checks the samples of a job that arrived since the last update."""
+        job = job_stats.job
+        times = job_stats.history.get('gpu_timestamp')
+        if not job.gpus or times is None:
+            return
+        times = times.values()
+        start = bisect_right(times, self.last_seen.get(job.id, -math.inf))
+        if start == len(times):
+            return
+        usage = job_stats.history['gpu_percent'].values(len(times) - start)
+        times = times[start:]
+        self.last_seen[job.id] = times[-1]
+        busy = [i for i, percent in enumerate(usage) if percent / job.gpus >= self.threshold]
+        if not busy:
+            self.idle_since.setdefault(job.id, times[0])
+        elif busy[-1] + 1 < len(times):
+            self.idle_since[job.id] = times[busy[-1] + 1]
+        else:
+            self.idle_since.pop(job.id, None)
+
+    def idle_for(self, job_id):
+        """Returns the seconds a job has been below the threshold, or None."""
+        if job_id in self.idle_since:
+            return self.last_seen[job_id] - self.idle_since[job_id]
+
+    def is_idle(self, job_id):
+        idle_for = self.idle_for(job_id)
+        return idle_for is not None and idle_for >= self.duration
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return '-'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return '%dh%02dm' % (hours, minutes) if hours else '%dm%02ds' % (minutes, seconds)
+
+
+def get_idle_report(jobs_stats, detector, seconds=WINDOW):
+    def format_percent(stats, key, scale=1):
+        if stats is None or key not in stats:
+            return '-'
+        return '%d%%' % round(stats[key] * scale)
+
+    rows = []
+    running = [js for js in jobs_stats if js.job.gpus and js.job.state == JobState.running]
+    for job_stats in running:
+        detector.update(job_stats)
+    # idle jobs first, the longest idle on top
+    running.sort(key=lambda js: (not detector.is_idle(js.job.id), -(detector.idle_for(js.job.id) or 0)))
+    for job_stats in running:
+        job = job_stats.job
+        idle = format_duration(detector.idle_for(job.id))
+        if detector.is_idle(job.id):
+            idle = bold('IDLE %s' % idle)
+        for i in range(max(job.gpus, len(job_stats.gpus))):
+            first = i == 0
+            row = [job.short_id if first else '', job.gpus if first else '', idle if first else '', i]
+            if i < len(job_stats.gpus):
+                stats = gpu_window_stats(job_stats.gpu_stats[job_stats.gpus[i]], seconds)
+                row += [format_percent(stats, 'mean'),
+                        '/'.join(format_percent(stats, 'p%d' % q) for q in PERCENTILES),
+                        format_percent(stats, 'memory_headroom', 100),
+                        format_percent(stats, 'power_ratio', 100)]
+            else:
+                row += ['N/A', '', '', '']
+            rows.append(row)
+    output = StringIO()
+    print('%d of %d jobs used less than %g%% of their GPUs for %g minutes (stats of the last %ds)' % (
+        sum(1 for js in running if detector.is_idle(js.job.id)), len(running),
+        detector.threshold, detector.duration / 60., seconds), file=output)
+    print(file=output)
+    print_table(
+        header=['ID', 'GPUS', 'IDLE', 'GPU', 'UTIL', 'P%d/P%d/P%d' % PERCENTILES, 'MEM FREE', 'POWER'],
+        min_widths=[4, 4, 6, 3, 4, 11, 8, 5],
+        rows=rows,
+        file=output,
+        column_spaces=2
+    )
+    return output.getvalue()
+
+
+def show_idle_report(get_jobs_stats, detector, lock, changed):
+    """Shows the idle report of the JobStats returned by `get_jobs_stats` until ^C."""
+    screen = Screen(changed=changed)
+    try:
+        while True:
+            with lock:
+                report = get_idle_report(get_jobs_stats(), detector)
+            screen.render(report.strip())
+            time.sleep(1)
+            screen.wait(1)
+    except KeyboardInterrupt:
+        print()
@@ -8,6 +8,8 @@ VERSION = "1.0.2"
 
 
 REQUIRES = ["urllib3 >= 1.15", "six >= 1.10", "certifi", "python-dateutil"]
+# optional: vectorized utilization stats and exporting recordings to .npz
+EXTRAS_REQUIRE = {"numpy": ["numpy"]}
 
 setup(
     name=NAME,
@@ -22,6 +24,7 @@ setup(
         ]
     },
     install_requires=REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     packages=find_packages(),
     include_package_data=True,
     long_description="""\
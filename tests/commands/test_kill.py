@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+
+from riseml.client.rest import ApiException
+from riseml.commands import kill
+
+
+class TestKill(unittest.TestCase):
+
+    def test_expand_ids(self):
+        self.assertEqual(kill.expand_ids(['3', '10-12', '.bob.4-5', '7.1-2']),
+                         ['3', '10', '11', '12', '.bob.4', '.bob.5', '7.1', '7.2'])
+
+    def test_expand_ids_rejects_jobs(self):
+        with self.assertRaises(SystemExit):
+            kill.expand_ids(['1.train'])
+
+    @mock.patch.object(kill.time, 'sleep')
+    def test_retry_on_transient_errors(self, sleep):
+        client = mock.Mock()
+        client.kill_experiment.side_effect = [ApiException(status=503), ApiException(status=502), 'killed']
+        self.assertEqual(kill.try_kill_experiment(client, '1', False, retries=3), 'killed')
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch.object(kill.time, 'sleep')
+    def test_no_retry_on_not_found(self, sleep):
+        client = mock.Mock()
+        client.kill_experiment.side_effect = ApiException(status=404)
+        with self.assertRaises(kill.KillError):
+            kill.try_kill_experiment(client, '1', False, retries=3)
+        sleep.assert_not_called()
@@ -0,0 +1,34 @@
+import argparse
+import unittest
+from unittest import mock
+
+from riseml.client import Experiment, Project
+from riseml.commands import logs
+
+
+class TestLogs(unittest.TestCase):
+
+    def parse(self, *argv):
+        parser = argparse.ArgumentParser()
+        logs.add_logs_parser(parser.add_subparsers())
+        return parser.parse_args(('logs',) + argv)
+
+    def test_in_state_and_states_are_distinct(self):
+        args = self.parse('--in-state', 'finished', '--in-state', 'RUNNING', '--states')
+        self.assertEqual(args.in_state, ['FINISHED', 'RUNNING'])
+        self.assertTrue(args.states)
+        self.assertIsNone(self.parse().in_state)
+
+    @mock.patch.object(logs, 'get_api_client')
+    @mock.patch.object(logs, 'DefaultApi')
+    @mock.patch.object(logs, 'stream_experiment_logs')
+    def test_run_in_state(self, stream_experiment_logs, DefaultApi, _):
+        client = DefaultApi.return_value
+        client.get_experiments.return_value = [
+            Experiment(id=id, state=state, project=Project(name='p'))
+            for id, state in [('1', 'RUNNING'), ('2', 'FINISHED'), ('3', 'RUNNING')]]
+        client.get_experiment.side_effect = lambda id: id
+        logs.run(self.parse('--in-state', 'running', '--states', '3'))
+        experiments, = stream_experiment_logs.call_args[0]
+        self.assertEqual(experiments, ['3', '1'])
+        self.assertTrue(stream_experiment_logs.call_args[1]['log_filter'].states_only)
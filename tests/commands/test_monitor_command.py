@@ -0,0 +1,35 @@
+import argparse
+import unittest
+from unittest import mock
+
+from riseml.client import ApiClient, DefaultApi
+from riseml.commands import monitor
+
+
+class TestIdleReport(unittest.TestCase):
+
+    @mock.patch('riseml.cluster.ClusterMonitor.start')
+    @mock.patch.object(monitor, 'show_idle_report')
+    def test_all_running_experiments(self, show_idle_report, start):
+        api_client = ApiClient()
+        with mock.patch.object(api_client, 'call_api', return_value=[]):
+            monitor.idle_report(DefaultApi(api_client),
+                                argparse.Namespace(id=None, idle_threshold=5, idle_minutes=1))
+        start.assert_called_once_with()
+        get_jobs_stats, detector = show_idle_report.call_args[0][:2]
+        self.assertEqual(get_jobs_stats(), [])
+        self.assertEqual((detector.threshold, detector.duration), (5, 60))
+
+
+class TestMonitorParser(unittest.TestCase):
+
+    def parse(self, *argv):
+        parser = argparse.ArgumentParser()
+        monitor.add_monitor_parser(parser.add_subparsers())
+        return parser.parse_args(('monitor',) + argv)
+
+    def test_modes_are_exclusive(self):
+        self.assertEqual(self.parse('1', '--record', 'stats.jsonl').record, 'stats.jsonl')
+        for mode in (['--serve', ':9100'], ['--cluster'], ['--idle-report'], ['--replay', 'stats.jsonl']):
+            with self.assertRaises(SystemExit), mock.patch('sys.stderr'):
+                self.parse('--record', 'stats.jsonl', *mode)
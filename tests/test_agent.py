@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from riseml import agent
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@unittest.skipUnless(agent.is_agent_supported(), 'agent not supported')
+class TestAgent(unittest.TestCase):
+
+    def test_message_with_fds(self):
+        a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        r, w = os.pipe()
+        with a, b:
+            agent.send_message(a, {'type': 'run', 'argv': ['status']}, fds=[w])
+            message, fds = agent.recv_message(b, max_fds=3)
+            self.assertEqual(message, {'type': 'run', 'argv': ['status']})
+            self.assertEqual(len(fds), 1)
+            os.write(fds[0], b'x')
+            self.assertEqual(os.read(r, 1), b'x')
+            for fd in fds + [r, w]:
+                os.close(fd)
+
+    def test_closed_connection(self):
+        a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        a.close()
+        with b:
+            self.assertEqual(agent.recv_message(b), (None, []))
+
+    def test_relayed_error(self):
+        import urllib3
+        url = 'http://localhost:31213/api/user'
+        error = agent._relayed_error({'error': 'MaxRetryError', 'message': 'refused'}, url)
+        self.assertIsInstance(error, urllib3.exceptions.MaxRetryError)
+        self.assertEqual(error.pool.port, 31213)
+        error = agent._relayed_error({'error': 'ValueError', 'message': 'x'}, url)
+        self.assertIsInstance(error, urllib3.exceptions.HTTPError)
+
+
+EXPERIMENTS = [{'id': str(i), 'short_id': str(i), 'state': 'RUNNING', 'type': 'Experiment', 'created_at': 0,
+                'project': {'name': 'project-%d' % i}, 'user': {'username': 'u'}, 'children': [], 'jobs': []}
+               for i in range(1, 151)]
+
+CONFIG = """current-context: default
+contexts:
+  - name: default
+    context:
+      cluster: default
+      user: default
+      environment: test
+      agent: true
+clusters:
+  - name: default
+    cluster:
+      api-server: http://127.0.0.1:%d
+      sync-server: rsync://127.0.0.1:1/sync
+      cluster-id: test
+users:
+- name: default
+  user:
+    api-key: key
+"""
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = json.dumps(EXPERIMENTS if self.path.startswith('/api/experiments') else []).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipUnless(agent.is_agent_supported(), 'agent not supported')
+class TestAgentCommands(unittest.TestCase):
+
+    def setUp(self):
+        server = HTTPServer(('127.0.0.1', 0), ApiHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, home)
+        os.mkdir(os.path.join(home, '.riseml'))
+        with open(os.path.join(home, '.riseml', 'config'), 'w') as f:
+            f.write(CONFIG % server.server_address[1])
+        self.env = dict(os.environ, HOME=home, PYTHONPATH=ROOT, RISEML_AGENT='1')
+        # the agent's stdout is block-buffered, as it is for users
+        self.env.pop('PYTHONUNBUFFERED', None)
+        self.socket = os.path.join(home, '.riseml', agent.AGENT_SOCKET)
+        self.addCleanup(self.riseml, 'agent', 'stop')
+
+    def riseml(self, *argv):
+        return subprocess.check_output([sys.executable, '-m', 'riseml'] + list(argv),
+                                       env=self.env, stderr=subprocess.STDOUT, timeout=60).decode('utf8')
+
+    def test_table_output(self):
+        # tables must not be written to the agent's stdout; print_table_stream
+        # only flushes it after the first 100 rows
+        for _ in range(2):
+            output = self.riseml('status')
+            self.assertTrue(os.path.exists(self.socket))
+            for experiment in EXPERIMENTS:
+                self.assertIn(experiment['project']['name'], output)
+
+    def test_exit_code(self):
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            self.riseml('kill', 'x')
+        self.assertEqual(cm.exception.returncode, 1)
+        self.assertIn('Can only kill experiments', cm.exception.output.decode('utf8'))
+        self.assertTrue(os.path.exists(self.socket))
+
+    def test_concurrent_starts(self):
+        env = dict(self.env, RISEML_AGENT='0')
+        agents = [subprocess.Popen([sys.executable, '-m', 'riseml', 'agent', 'serve'], env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                  for _ in range(4)]
+        outputs = []
+        for process in agents:
+            try:
+                outputs.append(process.communicate(timeout=3)[0].decode('utf8'))
+            except subprocess.TimeoutExpired:
+                outputs.append(None)
+        # the one agent left running owns the socket
+        self.assertEqual(outputs.count(None), 1, outputs)
+        self.assertEqual(outputs.count('agent is already running\n'), 3, outputs)
+        running = agents[outputs.index(None)]
+        self.assertEqual(self.status()['pid'], running.pid)
+        self.riseml('agent', 'stop')
+        running.communicate(timeout=10)
+
+    def status(self):
+        sock = agent.connect(self.socket)
+        with sock:
+            agent.send_message(sock, {'type': 'status'})
+            return agent.recv_message(sock)[0]
@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+
+from riseml import api
+from riseml.client import Configuration
+
+
+class TestConnectionStats(unittest.TestCase):
+
+    def test_no_pools(self):
+        with mock.patch.object(Configuration(), 'pool_manager', None):
+            self.assertIsNone(api.get_connection_stats())
+
+    def test_stats_summed_over_pools(self):
+        pools = {'a': mock.Mock(num_requests=5, num_connections=1),
+                 'b': mock.Mock(num_requests=2, num_connections=2)}
+        pool_manager = mock.Mock(pools=pools)
+        with mock.patch.object(Configuration(), 'pool_manager', pool_manager):
+            stats = api.get_connection_stats()
+        self.assertEqual(stats, {'requests': 7, 'connections': 3})
+        self.assertEqual(api.format_connection_stats(stats),
+                         '7 requests over 3 connections (4 reused)')
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_items_in_order(self):
+        self.assertEqual(list(api.prefetch(iter(range(100)), size=3)), list(range(100)))
+
+    def test_errors_are_raised(self):
+        def items():
+            yield 1
+            raise ValueError('broken')
+        prefetched = api.prefetch(items())
+        self.assertEqual(next(prefetched), 1)
+        with self.assertRaises(ValueError):
+            next(prefetched)
@@ -0,0 +1,96 @@
+import json
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from riseml.client import ApiClient, models
+
+
+class Response(object):
+
+    def __init__(self, data):
+        self.data = json.dumps(data)
+
+
+class TestDeserialize(unittest.TestCase):
+
+    def test_nested_models(self):
+        data = [{'id': '1', 'cpus': 2, 'exit_code': None,
+                 'project': {'name': 'p'},
+                 'children': [{'id': '2', 'children': [None, {'id': '3'}]}]}]
+        jobs = ApiClient().deserialize(Response(data), 'list[Job]')
+        self.assertIsInstance(jobs[0], models.Job)
+        self.assertEqual(jobs[0].cpus, 2.0)
+        self.assertIsInstance(jobs[0].cpus, float)
+        self.assertIsNone(jobs[0].exit_code)
+        self.assertEqual(jobs[0].project.name, 'p')
+        self.assertIsNone(jobs[0].children[0].children[0])
+        self.assertEqual(jobs[0].children[0].children[1].id, '3')
+
+    def test_dict_and_primitives(self):
+        client = ApiClient()
+        self.assertEqual(client.deserialize(Response({'a': 1, 'b': None}), 'dict(str, str)'),
+                         {'a': '1', 'b': None})
+        self.assertEqual(client.deserialize(Response('5'), 'int'), 5)
+
+    def test_concurrent_compilation(self):
+        # threads sharing a client must not see deserializers being compiled
+        data = {'id': '1', 'project': {'name': 'p'}, 'jobs': [{'id': '2', 'children': [{'id': '3'}]}]}
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        for _ in range(20):
+            client = ApiClient()
+            barrier = threading.Barrier(16)
+
+            def deserialize(_):
+                barrier.wait()
+                return client.deserialize(Response(data), 'Experiment')
+
+            with ThreadPoolExecutor(16) as executor:
+                for experiment in executor.map(deserialize, range(16)):
+                    self.assertIsInstance(experiment, models.Experiment)
+                    self.assertEqual(experiment.project.name, 'p')
+                    self.assertEqual(experiment.jobs[0].children[0].id, '3')
+
+
+class StreamedResponse(object):
+
+    def __init__(self, data):
+        self.data = data.encode('utf8')
+        self.released = self.closed = False
+
+    def stream(self, amt):
+        for i in range(0, len(self.data), amt):
+            yield self.data[i:i + amt]
+
+    def release_conn(self):
+        self.released = True
+
+    def close(self):
+        self.closed = True
+
+
+class TestDeserializeStream(unittest.TestCase):
+
+    def test_items_across_chunks(self):
+        data = json.dumps([{'id': str(i), 'name': u'jöb', 'exit_code': 1234} for i in range(5)] + [None])
+        for chunk_size in (1, 3, 7, 1024):
+            response = StreamedResponse(' ' + data + '\n')
+            jobs = list(ApiClient().deserialize_stream(response, 'list[Job]', chunk_size))
+            self.assertEqual([job.id for job in jobs[:-1]], ['0', '1', '2', '3', '4'])
+            self.assertEqual(jobs[0].name, u'jöb')
+            self.assertEqual(jobs[4].exit_code, 1234)
+            self.assertIsNone(jobs[-1])
+            self.assertTrue(response.released)
+
+    def test_empty_list(self):
+        response = StreamedResponse('[]')
+        self.assertEqual(list(ApiClient().deserialize_stream(response, 'list[int]', 1)), [])
+
+    def test_truncated_list(self):
+        response = StreamedResponse('[1, 2, 3')
+        with self.assertRaises(ValueError):
+            list(ApiClient().deserialize_stream(response, 'list[int]', 2))
+        self.assertTrue(response.closed)
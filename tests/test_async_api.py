@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from riseml.async_api import AsyncDefaultApi
+
+
+def run(api, calls):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(asyncio.gather(*calls()))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+        api.close()
+
+
+class TestAsyncApi(unittest.TestCase):
+
+    def test_operations_are_awaitable(self):
+        api = AsyncDefaultApi(api_client=mock.Mock(), max_concurrency=4)
+        api.api = mock.Mock()
+        api.api.get_job.side_effect = lambda job_id: 'job %s' % job_id
+        jobs = run(api, lambda: [api.get_job('1'), api.get_job('2')])
+        self.assertEqual(jobs, ['job 1', 'job 2'])
+
+    def test_concurrency_is_limited(self):
+        api = AsyncDefaultApi(api_client=mock.Mock(), max_concurrency=3)
+        api.api = mock.Mock()
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def kill_experiment(experiment_id):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+        api.api.kill_experiment.side_effect = kill_experiment
+        run(api, lambda: [api.kill_experiment(str(i)) for i in range(12)])
+        self.assertEqual(in_flight[1], 3)
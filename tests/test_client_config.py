@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from riseml import client_config
+
+
+class TestClientConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.env = mock.patch.dict(os.environ, {'HOME': self.home})
+        self.env.start()
+        client_config._cached_context = None
+
+    def tearDown(self):
+        self.env.stop()
+        client_config._cached_context = None
+        shutil.rmtree(self.home)
+
+    def test_config_is_parsed_once(self):
+        client_config.write_config('key', 'localhost:31213', 'localhost:31876', 'cid')
+        client_config._cached_context = None
+        with mock.patch.object(client_config.yaml, 'safe_load',
+                               wraps=client_config.yaml.safe_load) as safe_load:
+            client_config.get_api_url()
+            client_config.get_api_key()
+            client_config.get_cluster_id()
+            client_config.get_environment()
+            self.assertEqual(safe_load.call_count, 1)
+
+    def test_config_reloaded_on_mtime_change(self):
+        client_config.write_config('key', 'localhost:31213', 'localhost:31876', 'cid')
+        self.assertEqual(client_config.get_api_key(), 'key')
+        config_file = client_config.get_config_file()
+        with open(config_file) as f:
+            config = f.read()
+        with open(config_file, 'w') as f:
+            f.write(config.replace('api-key: key', 'api-key: other'))
+        stat = os.stat(config_file)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(client_config.get_api_key(), 'other')
+
+    def test_write_config_swaps_context(self):
+        self.assertEqual(client_config.get_api_key(), '')
+        client_config.write_config('key', 'localhost:31213', 'localhost:31876', 'cid')
+        with mock.patch.object(client_config, 'read_config') as read_config:
+            self.assertEqual(client_config.get_api_key(), 'key')
+            self.assertEqual(client_config.get_api_server(), 'http://localhost:31213')
+            read_config.assert_not_called()
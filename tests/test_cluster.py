@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import unittest
+from unittest import mock
+
+from riseml import aiows, cluster
+from riseml.client import ApiClient, DefaultApi, Experiment, GPU, Job, Node, Project, User
+from riseml.client.rest import ApiException
+
+
+def experiment(id, username, project, jobs):
+    return Experiment(id=id, state='RUNNING', user=User(username=username),
+                      project=Project(name=project), jobs=jobs, children=[])
+
+
+def job(id, node=None, gpus=0):
+    return Job(id=id, short_id=id, role='train', state='RUNNING', cpus=2, mem=1000, gpus=gpus,
+               node_selectors='kubernetes.io/hostname: %s' % node if node else None)
+
+
+def utilization(job_id, cpu_percent, gpus=None):
+    return {'type': 'utilization',
+            'data': {'job_id': job_id, 'timestamp': 1, 'cpu_percent': cpu_percent, 'gpus': gpus or {}}}
+
+
+async def accept(reader, writer):
+    request = await reader.readuntil(b'\r\n\r\n')
+    key = [line.split(b': ')[1] for line in request.split(b'\r\n')
+           if line.lower().startswith(b'sec-websocket-key')][0]
+    accept = base64.b64encode(hashlib.sha1(key + aiows.GUID).digest())
+    writer.write(b'HTTP/1.1 101 Switching Protocols\r\nSec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+
+
+def text_frame(text):
+    return b'\x81' + struct.pack('!B', len(text)) + text.encode('utf8')
+
+
+class TestClusterStats(unittest.TestCase):
+
+    def test_aggregate(self):
+        stats = cluster.ClusterStats({'0000:00:1E.0': 'gpu-node'})
+        stats.add_experiment(experiment('e1', 'alice', 'p1', [job('j1', node='node1'), job('j2', gpus=1)]))
+        stats.add_experiment(experiment('e2', 'bob', 'p1', [job('j3', node='node1')]))
+        stats.apply(utilization('j1', 100))
+        stats.apply(utilization('j2', 50, {'gpu0': {'gpu_utilization': 80, 'memory_used': 1, 'memory_total': 2,
+                                                    'device_bus_id': '0000:00:1E.0'}}))
+        stats.apply({'type': 'state', 'job_id': 'j3', 'state': 'FINISHED'})
+        self.assertFalse(stats.apply(utilization('unknown', 100)))
+
+        by_node = stats.aggregate('node')
+        self.assertEqual(list(by_node), ['gpu-node', 'node1'])
+        self.assertEqual(by_node['node1'].jobs, 1)
+        self.assertEqual(by_node['gpu-node'].gpus_used, 0.8)
+        by_project = stats.aggregate('project')
+        self.assertEqual(by_project['p1'].cpus_used, 1.5)
+        self.assertEqual(by_project['p1'].cpus_requested, 4)
+        self.assertEqual(list(stats.aggregate('user')), ['alice'])
+
+        stats.remove_experiment('e1')
+        self.assertEqual(list(stats.jobs_stats), ['j3'])
+
+
+class TestStartClusterMonitor(unittest.TestCase):
+
+    def start(self, call_api):
+        api_client = ApiClient()
+        with mock.patch.object(api_client, 'call_api', side_effect=call_api) as call, \
+                mock.patch.object(cluster.ClusterMonitor, 'start'):
+            stats = cluster.start_cluster_monitor(DefaultApi(api_client))
+        return stats, call
+
+    def test_nodes_are_listed_by_admin_api(self):
+        nodes = [Node(hostname='node1', gpus=[GPU(id='0000:00:1E.0')])]
+        stats, call = self.start(lambda path, *args, **kwargs: nodes if path == '/nodes' else None)
+        self.assertEqual(call.call_args[0][:2], ('/nodes', 'GET'))
+        self.assertEqual(stats.gpu_nodes, {'0000:00:1E.0': 'node1'})
+
+    def test_without_nodes(self):
+        def forbidden(*args, **kwargs):
+            raise ApiException(status=403)
+        stats, _ = self.start(forbidden)
+        self.assertEqual(stats.gpu_nodes, {})
+
+
+class TestStreamMonitor(unittest.TestCase):
+
+    @mock.patch.object(cluster, 'RECONNECT_DELAY', 0)
+    def test_reconnect_until_closed(self):
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            await accept(reader, writer)
+            writer.write(text_frame(json.dumps(utilization('j1', 10 * len(connections)))))
+            if len(connections) > 1:
+                writer.write(b'\x88\x02' + struct.pack('!H', aiows.CLOSE_NORMAL))
+            await writer.drain()
+            # the first connection drops without a close frame
+            writer.close()
+
+        stats = cluster.ClusterStats()
+        stats.add_jobs('j1', [job('j1')], 'p1')
+        applied = []
+        apply = stats.apply
+        stats.apply = lambda msg: applied.append(msg['data']['cpu_percent']) or apply(msg)
+
+        async def run():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            url = 'ws://127.0.0.1:%d/ws' % server.sockets[0].getsockname()[1]
+            monitor = cluster.StreamMonitor(stats, {'j1': url})
+            await asyncio.wait_for(monitor.run(), 10)
+            server.close()
+            return monitor
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        monitor = loop.run_until_complete(run())
+        self.assertTrue(monitor.closed.is_set())
+        self.assertEqual(applied, [10, 20])
+        self.assertEqual(list(stats.jobs_stats), [])
+
+
+class TestWebSocket(unittest.TestCase):
+
+    def test_recv(self):
+        async def handle(reader, writer):
+            await accept(reader, writer)
+            writer.write(b'\x01\x03abc' + b'\x80\x03def')  # fragmented text message
+            writer.write(b'\x89\x01p')  # ping
+            writer.write(b'\x81\x7e' + struct.pack('!H', 200) + b'x' * 200)
+            writer.write(b'\x88\x02' + struct.pack('!H', 1000))
+            pong = await reader.readexactly(2 + 4 + 1)
+            writer.close()
+            return pong[0]
+
+        async def run():
+            handled = asyncio.get_event_loop().create_future()
+            server = await asyncio.start_server(
+                lambda reader, writer: handled.set_result(asyncio.ensure_future(handle(reader, writer))),
+                '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            ws = await aiows.connect('ws://127.0.0.1:%d/ws' % port)
+            messages = [await ws.recv() for _ in range(3)]
+            server.close()
+            return messages, await (await handled)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        messages, pong = loop.run_until_complete(run())
+        self.assertEqual(messages, ['abcdef', 'x' * 200, None])
+        self.assertEqual(pong, 0x80 | aiows.OPCODE_PONG)
+
+    def test_mask_payload(self):
+        self.assertEqual(aiows.mask_payload(b'\x01\x02\x03\x04', b'\x01\x02\x03\x04\x05'),
+                         b'\x00\x00\x00\x00\x04')
@@ -0,0 +1,65 @@
+import threading
+import unittest
+from urllib.request import urlopen
+
+from riseml import exporter, monitor
+
+
+class Job(object):
+
+    def __init__(self, id, short_id, state):
+        self.id = id
+        self.short_id = short_id
+        self.state = state
+
+
+def exporter_for(jobs_stats):
+    return exporter.MetricsExporter(lambda: [(js, 'my "project"') for js in jobs_stats],
+                                    threading.Lock(), threading.Event())
+
+
+class TestMetricsExporter(unittest.TestCase):
+
+    def test_render(self):
+        job_stats = monitor.JobStats(Job('id1', 'abc', 'RUNNING'))
+        job_stats.update({'cpu_percent': 150, 'memory_used': 1024, 'memory_limit': 2048,
+                          'gpus': {'gpu0': {'gpu_utilization': 90, 'memory_used': 10, 'memory_total': 20,
+                                            'name': 'Tesla K80', 'device_bus_id': '0000:00:1E.0'}}},
+                         timestamp=1)
+        lines = exporter_for([job_stats]).render().decode('utf8').split('\n')
+        labels = 'job="abc",project="my \\"project\\""'
+        self.assertIn('riseml_job_cpu_percent{%s} 150.0' % labels, lines)
+        self.assertIn('riseml_job_state{%s,state="RUNNING"} 1' % labels, lines)
+        self.assertIn('riseml_gpu_utilization_percent{%s,gpu="0000:00:1E.0",name="Tesla K80"} 90.0' % labels,
+                      lines)
+        self.assertIn('# TYPE riseml_gpu_temperature_celsius gauge', lines)
+        self.assertFalse([line for line in lines if line.startswith('riseml_gpu_temperature_celsius')])
+
+    def test_removed_jobs_are_dropped(self):
+        jobs_stats = [monitor.JobStats(Job('id1', 'abc', 'RUNNING')), monitor.JobStats(Job('id2', 'def', 'RUNNING'))]
+        metrics = exporter_for(jobs_stats)
+        jobs_stats.pop(0)
+        text = metrics.render().decode('utf8')
+        self.assertNotIn('job="abc"', text)
+        self.assertIn('job="def"', text)
+        self.assertEqual(list(metrics._labels), ['id2'])
+
+    def test_serve(self):
+        metrics = exporter_for([monitor.JobStats(Job('id1', 'abc', 'PENDING'))])
+        server = exporter.MetricsServer(('127.0.0.1', 0), exporter.metrics_handler(metrics))
+        self.addCleanup(server.server_close)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        response = urlopen('http://127.0.0.1:%d/metrics' % server.server_address[1])
+        self.assertEqual(response.headers['Content-Type'], exporter.CONTENT_TYPE)
+        self.assertEqual(response.read(), metrics.text)
+
+    def test_serve_until(self):
+        until = threading.Event()
+        until.set()
+        # returns at once
+        exporter.serve_metrics(exporter_for([]), ('127.0.0.1', 0), until)
+
+    def test_parse_address(self):
+        self.assertEqual(exporter.parse_address(':9100'), ('', 9100))
+        self.assertEqual(exporter.parse_address('127.0.0.1:9100'), ('127.0.0.1', 9100))
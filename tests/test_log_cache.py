@@ -0,0 +1,132 @@
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from riseml import log_cache
+from riseml.log_cache import LogCache
+
+
+def log(job_id, time, line):
+    return {'type': 'log', 'job_id': job_id, 'time': time, 'line': line}
+
+
+class TestLogCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def test_append_and_reopen(self):
+        cache = LogCache(self.path)
+        for i in range(5):
+            cache.append(log('j1', 10 + i // 2, str(i)))
+        cache.close(complete=True)
+
+        cache = LogCache(self.path)
+        self.assertTrue(cache.complete)
+        self.assertEqual(cache.last_seen, {'j1': (12, 1)})
+        self.assertEqual([m['line'] for m in cache.messages()], ['0', '1', '2', '3', '4'])
+
+    def test_segments(self):
+        with mock.patch.object(log_cache, 'SEGMENT_SIZE', 3):
+            cache = LogCache(self.path)
+            for i in range(8):
+                cache.append(log('j1', i, str(i)))
+            cache.close()
+            self.assertEqual([s['count'] for s in cache.index['segments']], [3, 3, 2])
+            self.assertEqual([m['line'] for m in cache.messages(tail=4)], ['4', '5', '6', '7'])
+            self.assertEqual([m['line'] for m in cache.messages(since=6)], ['6', '7'])
+            self.assertEqual([m['line'] for m in cache.messages(since=2, tail=1)], ['7'])
+
+    def test_tail_keeps_state_messages(self):
+        cache = LogCache(self.path)
+        cache.append(log('j1', 1, 'a'))
+        cache.append({'type': 'state', 'job_id': 'j1', 'time': 2, 'state': 'FINISHED'})
+        cache.close()
+        self.assertEqual([m['type'] for m in cache.messages(tail=1)], ['log', 'state'])
+
+    def test_clear(self):
+        cache = LogCache(self.path)
+        cache.append(log('j1', 1, 'a'))
+        cache.close(complete=True)
+        cache.clear()
+        self.assertFalse(cache.complete)
+        self.assertEqual(list(cache.messages()), [])
+        self.assertEqual(LogCache(self.path).last_seen, {})
+
+    def test_written_by_flusher(self):
+        cache = LogCache(self.path)
+        writers = []
+        write = cache._write
+        cache._write = lambda pending: writers.append(threading.current_thread()) or write(pending)
+        with mock.patch.object(log_cache, 'FLUSH_SIZE', 2):
+            for i in range(4):
+                cache.append(log('j1', i, str(i)))
+            cache._flusher.join(0.5)
+        self.assertTrue(writers)
+        self.assertNotIn(threading.current_thread(), writers)
+        cache.close()
+
+    def test_partly_written_member(self):
+        cache = LogCache(self.path)
+        cache.append(log('j1', 1, 'a'))
+        cache.close()
+        segment = cache.index['segments'][0]
+        # a crash while appending a member, before the index was written
+        with open(os.path.join(self.path, segment['name']), 'ab') as f:
+            f.write(gzip.compress(b'{"type": "log", "line": "b"}\n')[:-6])
+        cache = LogCache(self.path)
+        self.assertEqual([m['line'] for m in cache.messages()], ['a'])
+        cache.append(log('j1', 2, 'c'))
+        cache.close()
+        self.assertEqual([m['line'] for m in LogCache(self.path).messages()], ['a', 'c'])
+
+    def test_truncated_segment_without_size(self):
+        cache = LogCache(self.path)
+        cache.append(log('j1', 1, 'a'))
+        cache.append(log('j1', 2, 'b'))
+        cache.close()
+        segment = cache.index['segments'][0]
+        del segment['size']
+        path = os.path.join(self.path, segment['name'])
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data + gzip.compress(b'{"line": "c"}\n')[:-3])
+        self.assertEqual([m['line'] for m in cache.messages()], ['a', 'b'])
+
+
+class TestEviction(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def cache(self, id, size, used):
+        path = os.path.join(self.root, 'jobs', id)
+        os.makedirs(path)
+        with open(os.path.join(path, 'segment'), 'wb') as f:
+            f.write(b'x' * size)
+        for name in os.listdir(path) + ['.']:
+            os.utime(os.path.join(path, name), (used, used))
+        return path
+
+    def test_evicts_old_and_least_recently_used(self):
+        old = self.cache('old', 10, used=100)
+        lru = self.cache('lru', 50, used=1000)
+        recent = self.cache('recent', 50, used=2000)
+        log_cache.evict(self.root, max_size=60, max_age=1500, now=2000)
+        self.assertEqual([os.path.exists(p) for p in (old, lru, recent)], [False, False, True])
+
+    def test_locked_caches_are_kept(self):
+        path = self.cache('locked', 10, used=100)
+        lock = log_cache.lock(path)
+        self.addCleanup(lock.close)
+        if log_cache.fcntl is not None:
+            self.assertIsNone(log_cache.lock(path))
+        log_cache.evict(self.root, max_age=1, now=2000)
+        self.assertTrue(os.path.exists(path))
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADED_MODULES = """
+import sys
+import riseml.__main__ as main
+sys.argv = ['riseml'] + sys.argv[1:]
+try:
+    main.main()
+except SystemExit:
+    pass
+print(' '.join(sorted(sys.modules)))
+"""
+
+
+class TestMain(unittest.TestCase):
+
+    def loaded_modules(self, *argv):
+        env = dict(os.environ, HOME=tempfile.mkdtemp(), PYTHONPATH=ROOT)
+        out = subprocess.check_output([sys.executable, '-c', LOADED_MODULES] + list(argv),
+                                      env=env, stderr=subprocess.DEVNULL)
+        return set(out.decode('utf8').split())
+
+    def test_version_does_not_load_commands(self):
+        modules = self.loaded_modules('--version')
+        self.assertNotIn('riseml.client', modules)
+        self.assertFalse([m for m in modules if m.startswith('riseml.commands.')])
+
+    def test_only_selected_command_is_loaded(self):
+        modules = self.loaded_modules('status', '-h')
+        self.assertIn('riseml.commands.status', modules)
+        self.assertNotIn('riseml.commands.logs', modules)
+        self.assertNotIn('websocket', modules)
+        self.assertNotIn('rollbar', modules)
+
+    def test_version_matches_client(self):
+        from riseml.consts import VERSION
+        from riseml.client import Configuration
+        self.assertEqual(VERSION, Configuration().packageVersion)
+
+    def test_commands_are_bundled(self):
+        # riseml.spec bundles the submodules of riseml.commands, since they
+        # are imported by name
+        import pkgutil
+        import riseml.commands
+        from riseml.commands import COMMANDS
+        submodules = {'.' + name for _, name, _ in pkgutil.iter_modules(riseml.commands.__path__)}
+        self.assertFalse({module for module, _, _ in COMMANDS.values()} - submodules)
+        with open(os.path.join(ROOT, 'riseml.spec')) as f:
+            self.assertIn("collect_submodules('riseml.commands')", f.read())
@@ -0,0 +1,22 @@
+import unittest
+
+from riseml.client import models
+
+
+class TestModels(unittest.TestCase):
+
+    def test_maps_are_shared(self):
+        self.assertIs(models.Job().swagger_types, models.Job.swagger_types)
+        self.assertFalse(hasattr(models.Job(), '__dict__'))
+
+    def test_eq(self):
+        self.assertEqual(models.Project(id='1', name='p'), models.Project(id='1', name='p'))
+        self.assertNotEqual(models.Project(id='1', name='p'), models.Project(id='1', name='q'))
+        self.assertNotEqual(models.Project(id='1'), models.User(id='1'))
+        self.assertNotEqual(models.Project(), None)
+
+    def test_to_dict(self):
+        job = models.Job(id='1', project=models.Project(name='p'), children=[models.Job(id='2')])
+        data = job.to_dict()
+        self.assertEqual(data['project']['name'], 'p')
+        self.assertEqual(data['children'][0]['id'], '2')
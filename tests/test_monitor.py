@@ -0,0 +1,40 @@
+import unittest
+
+from riseml import monitor
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_keeps_last_values(self):
+        history = monitor.RingBuffer(size=3)
+        self.assertIsNone(history.summary())
+        for value in range(5):
+            history.append(value)
+        self.assertEqual(list(history.values()), [2, 3, 4])
+        self.assertEqual(list(history.values(2)), [3, 4])
+        self.assertEqual(history.summary(), (2, 3, 4))
+
+    def test_sparkline(self):
+        self.assertEqual(monitor.sparkline([0, 50, 100], 100), u'▁▅█')
+        self.assertEqual(monitor.sparkline([0, 200], 100), u'▁█')
+
+
+class TestJobOrder(unittest.TestCase):
+
+    def test_orders_by_state_and_moves_changed_jobs(self):
+        jobs_stats = [monitor.JobStats(Job('j%d' % i, state))
+                      for i, state in enumerate(['PENDING', 'RUNNING', 'FINISHED', 'RUNNING'])]
+        order = monitor.JobOrder(jobs_stats)
+        ids = lambda offset=0: [js.job.id for js in order.iter_from(offset)]
+        self.assertEqual(ids(), ['j1', 'j3', 'j0', 'j2'])
+        order.update_job_state(jobs_stats[0], 'RUNNING')
+        order.update_job_state(jobs_stats[3], 'KILLED')
+        self.assertEqual(ids(), ['j0', 'j1', 'j2', 'j3'])
+        self.assertEqual(ids(3), ['j3'])
+
+
+class Job(object):
+
+    def __init__(self, id, state):
+        self.id = id
+        self.state = state
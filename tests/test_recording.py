@@ -0,0 +1,55 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from riseml import recording
+from riseml.client import Job, Project
+
+
+class TestRecording(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'stats.rec')
+
+    def record(self, messages):
+        recorder = recording.Recorder(self.path, Project(name='mnist'),
+                                      [Job(id='j1', short_id='1.train', state='RUNNING', cpus=2, mem=1024, gpus=1)])
+        for received, msg in messages:
+            recorder.record(msg, received)
+        recorder.close()
+        return recording.Recording(self.path)
+
+    def test_round_trip(self):
+        gpu = {'name': 'K80', 'device_bus_id': '0:1', 'gpu_utilization': 80, 'memory_used': 10}
+        utilization = {'type': 'utilization',
+                       'data': {'job_id': 'j1', 'timestamp': 1, 'cpu_percent': 150, 'percpu_percent': [75, 75],
+                                'gpus': {'gpu0': gpu}}}
+        state = {'type': 'state', 'job_id': 'j1', 'state': 'FINISHED'}
+        with mock.patch.object(recording, 'FLUSH_SIZE', 2):
+            rec = self.record([(10, utilization), (11, utilization), (12, state), (13, {'type': 'other'})])
+
+        self.assertEqual(rec.project, 'mnist')
+        self.assertEqual(len(rec), 4)
+        messages = list(rec.messages())
+        self.assertEqual([(received, msg['type']) for received, msg in messages],
+                         [(10, 'utilization'), (11, 'utilization'), (12, 'state')])
+        data = messages[0][1]['data']
+        self.assertEqual(data['percpu_percent'], [75, 75])
+        self.assertEqual(data['gpus'], {'gpu0': dict(gpu, gpu_utilization=80.0, memory_used=10.0)})
+
+        out = io.StringIO()
+        rec.write_csv(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[1], '10.0,1.train,,150.0,2.0,,,,,,,')
+        self.assertEqual(lines[2], '10.0,1.train,gpu0,,,10.0,,80.0,,,,')
+
+    def test_not_a_recording(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'data')
+        with self.assertRaises(ValueError):
+            recording.Recording(self.path)
@@ -0,0 +1,189 @@
+import io
+import json
+import time
+import unittest
+from unittest import mock
+
+from riseml import ansi, stream
+
+
+class TestBufferedWriter(unittest.TestCase):
+
+    def test_flush_on_size(self):
+        out = io.StringIO()
+        writer = stream.BufferedWriter(out, max_size=10, max_delay=60)
+        writer.write('12345')
+        self.assertEqual(out.getvalue(), '')
+        writer.write('67890')
+        self.assertEqual(out.getvalue(), '1234567890')
+        writer.close()
+
+    def test_flush_when_idle(self):
+        out = io.StringIO()
+        writer = stream.BufferedWriter(out, max_delay=0.01)
+        writer.write('line\n')
+        for _ in range(100):
+            if out.getvalue():
+                break
+            time.sleep(0.01)
+        self.assertEqual(out.getvalue(), 'line\n')
+        writer.close()
+
+
+class TestReorderingWriter(unittest.TestCase):
+
+    def test_orders_by_time_within_window(self):
+        out = io.StringIO()
+        writer = stream.ReorderingWriter(out, window=60)
+        for text, time in [('b', 2), ('a', 1), ('error', None), ('c', 3)]:
+            writer.write(text, time)
+        self.assertEqual(out.getvalue(), '')
+        writer.close()
+        self.assertEqual(out.getvalue(), 'errorabc')
+
+    def test_flush_writes_only_due_messages(self):
+        out = io.StringIO()
+        writer = stream.ReorderingWriter(out, window=60)
+        writer.write('b', 2)
+        writer.flush()
+        self.assertEqual(out.getvalue(), '')
+        writer.write('a', 1)
+        writer.close()
+        self.assertEqual(out.getvalue(), 'ab')
+
+
+class TestLogPrinter(unittest.TestCase):
+
+    def test_log_message(self):
+        out = io.StringIO()
+        with mock.patch.object(ansi, 'COLORS_DISABLED', True), \
+                mock.patch('sys.stdout', out):
+            printer = stream.LogPrinter('ws://localhost', {'j1': '1.train'}, progress='all')
+            printer.print_log_message({'job_id': 'j1', 'time': 0, 'line': 'a\rb'})
+            printer.print_state_message({'job_id': 'j1', 'time': 0, 'state': 'RUNNING'})
+            printer.output.close()
+        self.assertEqual(out.getvalue(),
+                         '1.train | [1970-01-01T00:00:00Z] a\r'
+                         '1.train | [1970-01-01T00:00:00Z] b\r\n'
+                         '1.train | [1970-01-01T00:00:00Z] --> RUNNING\n')
+
+
+    def test_sampled_progress(self):
+        out = io.StringIO()
+        with mock.patch.object(ansi, 'COLORS_DISABLED', True), \
+                mock.patch('sys.stdout', out):
+            printer = stream.LogPrinter('ws://localhost', {'j1': '1'})
+            for time, line in [(0, '0%\r1%'), (1, '2%\r3%'), (2, '4%\r'), (3, 'done'),
+                               (20, '0%'), (21, '0%\r50%\r')]:
+                printer.print_log_message({'job_id': 'j1', 'time': time, 'line': line})
+            printer.close()
+        self.assertEqual([line.split('] ')[1] for line in out.getvalue().splitlines()],
+                         ['1%', '4%', 'done', '0%', '50%'])
+
+
+class TestLogPrinterReconnect(unittest.TestCase):
+
+    def setUp(self):
+        self.printer = stream.LogPrinter('ws://localhost', {'j1': '1.train', 'j2': '1.tb'})
+        self.addCleanup(self.printer.output.close)
+
+    def test_replayed_messages_are_skipped(self):
+        first = [('j1', 1), ('j1', 2), ('j1', 2), ('j2', 1)]
+        replay = first + [('j1', 2), ('j1', 3), ('j2', 1)]
+        self.printer._on_open(None)
+        self.assertTrue(all(self.printer._is_new({'job_id': j, 'time': t}) for j, t in first))
+        self.printer._on_open(None)
+        new = [(j, t) for j, t in replay if self.printer._is_new({'job_id': j, 'time': t})]
+        self.assertEqual(new, [('j1', 2), ('j1', 3), ('j2', 1)])
+
+    def test_reconnect_unless_closed_normally(self):
+        self.printer._error = 'WebSocketConnectionClosedException'
+        self.printer._done = False
+        self.printer._on_close(None, None, None)
+        self.assertFalse(self.printer._done)
+        self.printer._on_close(None, 1000, '')
+        self.assertTrue(self.printer._done)
+
+
+class TestTail(unittest.TestCase):
+
+    def test_tail_buffer(self):
+        tail = stream.TailBuffer(2)
+        for msg in [{'type': 'state'}, {'type': 'log', 'line': 'a'}, {'type': 'state'},
+                    {'type': 'log', 'line': 'b'}, {'type': 'log', 'line': 'c'}]:
+            tail.append(msg)
+        self.assertEqual([msg.get('line') for msg in tail.messages], [None, 'b', 'c'])
+
+    def test_replay_is_held_back(self):
+        out = io.StringIO()
+        with mock.patch.object(ansi, 'COLORS_DISABLED', True), \
+                mock.patch('sys.stdout', out):
+            printer = stream.LogPrinter('ws://localhost', {'j1': '1'}, progress='all')
+            printer.keep_tail(1, [{'type': 'log', 'job_id': 'j1', 'time': 1, 'line': 'cached'}])
+            # timestamps are far ahead of the local clock, the replay ends with a gap
+            received = [0, 10, 10.1, 11]
+            with mock.patch.object(stream, 'monotonic', lambda: received.pop(0)):
+                printer._on_open(None)
+                for time, line in [(2e9, 'old'), (2e9 + 1, 'last'), (2e9 + 2, 'live')]:
+                    printer._on_message(None, json.dumps({'type': 'log', 'job_id': 'j1', 'time': time,
+                                                          'line': line}))
+            printer.output.close()
+        self.assertEqual([line.split('] ')[1] for line in out.getvalue().splitlines()], ['last', 'live'])
+
+
+class TestLogFilter(unittest.TestCase):
+
+    def accepted(self, log_filter, messages):
+        accepts = log_filter.compile({'j1': '1.train', 'j2': '1.worker.0'})
+        return [msg.get('line', msg.get('state')) for msg in messages if accepts(msg)]
+
+    def test_filters(self):
+        messages = [{'type': 'log', 'job_id': 'j1', 'line': 'loss=0.1'},
+                    {'type': 'log', 'job_id': 'j1', 'line': 'WARNING loss=nan'},
+                    {'type': 'log', 'job_id': 'j2', 'line': 'step 1'},
+                    {'type': 'state', 'job_id': 'j2', 'state': 'RUNNING'}]
+        self.assertEqual(self.accepted(stream.LogFilter(grep=['loss', 'step'], exclude=['nan']), messages),
+                         ['loss=0.1', 'step 1', 'RUNNING'])
+        self.assertEqual(self.accepted(stream.LogFilter(jobs=['worker.0']), messages),
+                         ['step 1', 'RUNNING'])
+        self.assertEqual(self.accepted(stream.LogFilter(states_only=True), messages), ['RUNNING'])
+
+
+class TestMessageQueue(unittest.TestCase):
+
+    def log(self, line, job_id='j1'):
+        return {'type': 'log', 'job_id': job_id, 'line': line}
+
+    def drain(self, queue):
+        queue.close()
+        return [msg['line'] for msg in iter(queue.get, None)]
+
+    def test_drop_oldest(self):
+        queue = stream.MessageQueue(maxsize=2, policy='drop')
+        for line in 'abc':
+            queue.put(self.log(line))
+        self.assertEqual(queue.dropped, 1)
+        self.assertEqual(self.drain(queue), ['b', 'c'])
+
+    def test_coalesce_progress_updates(self):
+        queue = stream.MessageQueue(maxsize=2, policy='coalesce')
+        queue.put(self.log('step 1'))
+        queue.put(self.log('10%\r20%'))
+        queue.put(self.log('30%\r40%'))
+        self.assertEqual(queue.coalesced, 1)
+        self.assertEqual(self.drain(queue), ['step 1', '30%\r40%'])
+
+
+class TestJsonOutput(unittest.TestCase):
+
+    def test_ndjson(self):
+        out = io.StringIO()
+        printer = stream.LogPrinter('ws://localhost', {'j1': '1.train'},
+                                    output=stream.BufferedWriter(out), output_format='ndjson')
+        printer._on_message(None, '{"type": "log", "job_id": "j1", "time": 1, "line": "\\u001b[32ma\\rb"}')
+        printer._on_message(None, '{"type": "log", "job_id": "j2", "time": 1, "line": "c"}')
+        printer._on_message(None, '{"type": "error", "error": "failed"}')
+        printer.output.close()
+        self.assertEqual(out.getvalue(),
+                         '{"job":"1.train","type":"log","job_id":"j1","time":1,"line":"\\u001b[32ma\\rb"}\n'
+                         '{"type":"error","error":"failed"}\n')
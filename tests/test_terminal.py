@@ -0,0 +1,30 @@
+import io
+import os
+import unittest
+from unittest import mock
+
+from riseml import terminal
+
+
+class TestScreen(unittest.TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+        with mock.patch('shutil.get_terminal_size', return_value=os.terminal_size((10, 4))):
+            self.screen = terminal.Screen(self.out)
+
+    def rendered(self, text):
+        self.out.seek(0)
+        self.out.truncate()
+        self.screen.render(text)
+        return self.out.getvalue()
+
+    def test_first_frame_clears_and_fits_terminal(self):
+        self.assertEqual(self.rendered('a\n0123456789\nc\nd'),
+                         '\x1b[H\x1b[2Ja\n012345678\nc\x1b[4;1H')
+
+    def test_only_changed_lines_are_rewritten(self):
+        self.screen.render('a\nb\nc')
+        self.assertEqual(self.rendered('a\nx\nc'), '\x1b[2;1Hx\x1b[K\x1b[4;1H')
+        self.assertEqual(self.rendered('a\nx\nc'), '')
+        self.assertEqual(self.rendered('a'), '\x1b[2;1H\x1b[J\x1b[2;1H')
@@ -0,0 +1,54 @@
+import io
+import time
+import unittest
+
+from riseml import util
+
+
+class TestPrintTable(unittest.TestCase):
+
+    def test_stream_matches_table_within_sample(self):
+        rows = [['1', 'short'], ['2', 'a longer value']]
+        table, stream = io.StringIO(), io.StringIO()
+        util.print_table(['ID', 'NAME'], rows, file=table, bold_header=False)
+        util.print_table_stream(['ID', 'NAME'], iter(rows), file=stream, bold_header=False)
+        self.assertEqual(table.getvalue(), stream.getvalue())
+
+    def test_stream_keeps_widths_after_sample(self):
+        out = io.StringIO()
+        rows = iter([['1', 'a'], ['2', 'much longer'], ['3', 'b']])
+        util.print_table_stream(['ID', 'NAME'], rows, min_widths=[2, 5], file=out,
+                                bold_header=False, sample_size=1)
+        self.assertEqual(out.getvalue().splitlines(),
+                         ['ID NAME ', '1  a    ', '2  much longer', '3  b    '])
+
+
+class TestParseSince(unittest.TestCase):
+
+    def test_formats(self):
+        self.assertEqual(util.parse_since('2017-01-31T12:00:00Z'), 1485864000)
+        self.assertEqual(util.parse_since('1485864000'), 1485864000)
+        self.assertAlmostEqual(util.parse_since('2h'), time.time() - 7200, delta=5)
+        with self.assertRaises(ValueError):
+            util.parse_since('yesterday')
+
+
+class PagedClient(object):
+    """Lists experiments like the API server: the last `count`, by default 20, 0 for all."""
+
+    def __init__(self, experiments):
+        self.experiments = experiments
+
+    def get_experiments(self, states=None, count=20):
+        experiments = [e for e in self.experiments if states is None or e.state in states.split('|')]
+        return experiments[-count:] if count else experiments
+
+
+class TestSelectExperiments(unittest.TestCase):
+
+    def test_more_than_one_page(self):
+        from riseml.client import Experiment, Project
+        experiments = [Experiment(id=str(i), state='RUNNING' if i % 2 else 'FINISHED',
+                                  project=Project(name='p%d' % (i % 3))) for i in range(100)]
+        selected = util.select_experiments(PagedClient(experiments), project='p0')
+        self.assertEqual(selected, [str(i) for i in range(100) if i % 2 and i % 3 == 0])
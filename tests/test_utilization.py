@@ -0,0 +1,57 @@
+import unittest
+
+from riseml import monitor, utilization
+
+
+class Job(object):
+
+    def __init__(self, id, gpus):
+        self.id = id
+        self.short_id = id
+        self.gpus = gpus
+        self.state = 'RUNNING'
+
+
+def gpu(utilization, memory_used=25):
+    return {'gpu_utilization': utilization, 'memory_used': memory_used, 'memory_total': 100,
+            'power_draw': 50, 'power_limit': 200, 'device_bus_id': '0000:00:1E.0'}
+
+
+class TestUtilization(unittest.TestCase):
+
+    def test_percentiles(self):
+        self.assertEqual(utilization.percentiles([4, 1, 3, 2], (0, 5, 50, 100)), [1, 1.15, 2.5, 4])
+
+    def test_gpu_window_stats(self):
+        gpu_stats = monitor.GPUStats('gpu0')
+        for t in range(1, 101):
+            gpu_stats.update(gpu(t), timestamp=t)
+        stats = utilization.gpu_window_stats(gpu_stats, seconds=9)
+        self.assertEqual(stats['samples'], 10)
+        self.assertEqual(stats['mean'], 95.5)
+        self.assertEqual(stats['p50'], 95.5)
+        self.assertEqual(stats['memory_headroom'], 0.75)
+        self.assertEqual(stats['power_ratio'], 0.25)
+
+    def test_idle_detector(self):
+        job_stats = monitor.JobStats(Job('j1', gpus=2))
+        detector = utilization.IdleDetector(threshold=10, minutes=1)
+        for t, percent in [(1, 50), (2, 15), (3, 50)]:
+            job_stats.update({'gpus': {'gpu0': gpu(percent)}}, timestamp=t)
+        detector.update(job_stats)
+        # 15% of one GPU is 7.5% of the two requested GPUs
+        self.assertEqual(detector.idle_for('j1'), None)
+        for t in range(4, 70):
+            job_stats.update({'gpus': {'gpu0': gpu(0)}}, timestamp=t)
+            if t == 30:
+                detector.update(job_stats)
+                self.assertFalse(detector.is_idle('j1'))
+        detector.update(job_stats)
+        self.assertEqual(detector.idle_for('j1'), 65)
+        self.assertTrue(detector.is_idle('j1'))
+        report = utilization.get_idle_report([job_stats], detector)
+        self.assertIn('1 of 1 jobs', report)
+        self.assertIn('IDLE 1m05s', report)
+        job_stats.update({'gpus': {'gpu0': gpu(100)}}, timestamp=70)
+        detector.update(job_stats)
+        self.assertFalse(detector.is_idle('j1'))